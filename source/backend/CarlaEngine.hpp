@@ -1015,6 +1015,15 @@ public:
      */
     void setCallback(const EngineCallbackFunc func, void* const ptr) noexcept;
 
+#ifndef BUILD_BRIDGE_ALTERNATIVE_ARCH
+    /*!
+     * Mark a plugin's state as changed, for changes that have no callback (like custom data).
+     * OSC clients use this to know which plugins need to be sent again on reconnect.
+     * May be called by plugins.
+     */
+    void pluginStateChanged(const uint pluginId) noexcept;
+#endif
+
     // -------------------------------------------------------------------
     // Callback
 
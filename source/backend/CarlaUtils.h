@@ -200,6 +200,18 @@ CARLA_EXPORT void carla_pipe_client_idle(CarlaPipeClientHandle handle);
  */
 CARLA_EXPORT bool carla_pipe_client_is_running(CarlaPipeClientHandle handle);
 
+/*!
+ * Handle pending messages until none is left or @a timeLimit milliseconds have passed.
+ * Returns the number of messages handled, 0 while readable means the other side closed the pipe.
+ */
+CARLA_EXPORT uint carla_pipe_client_idle_for(CarlaPipeClientHandle handle, uint timeLimit);
+
+/*!
+ * Get the file descriptor the pipe client reads from, to be watched by an event loop.
+ * Returns -1 if not supported on the current platform.
+ */
+CARLA_EXPORT int carla_pipe_client_get_read_fd(CarlaPipeClientHandle handle);
+
 /*!
  * TODO.
  */
@@ -235,6 +247,12 @@ CARLA_EXPORT bool carla_pipe_client_flush(CarlaPipeClientHandle handle);
  */
 CARLA_EXPORT bool carla_pipe_client_flush_and_unlock(CarlaPipeClientHandle handle);
 
+/*!
+ * Write a complete message, which may span several lines, and flush it.
+ * The pipe is locked for the whole operation, so this replaces a lock, write_msg and flush_and_unlock sequence.
+ */
+CARLA_EXPORT bool carla_pipe_client_send_msg(CarlaPipeClientHandle handle, const char* msg);
+
 /*!
  * TODO.
  */
@@ -1301,6 +1301,40 @@ float CarlaEngine::getOutputPeak(const uint pluginId, const bool isLeft) const n
 // -----------------------------------------------------------------------
 // Callback
 
+#ifndef BUILD_BRIDGE_ALTERNATIVE_ARCH
+static bool isPluginStateChangeCallback(const EngineCallbackOpcode action) noexcept
+{
+    switch (action)
+    {
+    case ENGINE_CALLBACK_PLUGIN_ADDED:
+    case ENGINE_CALLBACK_PLUGIN_RENAMED:
+    case ENGINE_CALLBACK_PARAMETER_VALUE_CHANGED:
+    case ENGINE_CALLBACK_PARAMETER_DEFAULT_CHANGED:
+    case ENGINE_CALLBACK_PARAMETER_MIDI_CC_CHANGED:
+    case ENGINE_CALLBACK_PARAMETER_MIDI_CHANNEL_CHANGED:
+    case ENGINE_CALLBACK_OPTION_CHANGED:
+    case ENGINE_CALLBACK_PROGRAM_CHANGED:
+    case ENGINE_CALLBACK_MIDI_PROGRAM_CHANGED:
+    case ENGINE_CALLBACK_UPDATE:
+    case ENGINE_CALLBACK_RELOAD_INFO:
+    case ENGINE_CALLBACK_RELOAD_PARAMETERS:
+    case ENGINE_CALLBACK_RELOAD_PROGRAMS:
+    case ENGINE_CALLBACK_RELOAD_ALL:
+        return true;
+    default:
+        return false;
+    }
+}
+#endif
+
+#ifndef BUILD_BRIDGE_ALTERNATIVE_ARCH
+void CarlaEngine::pluginStateChanged(const uint pluginId) noexcept
+{
+    if (pluginId < pData->curPluginCount)
+        pData->plugins[pluginId].stateVersion = ++pData->lastStateVersion;
+}
+#endif
+
 void CarlaEngine::callback(const bool sendHost, const bool sendOsc,
                            const EngineCallbackOpcode action, const uint pluginId,
                            const int value1, const int value2, const int value3,
@@ -1315,6 +1349,12 @@ void CarlaEngine::callback(const bool sendHost, const bool sendOsc,
                     action, EngineCallbackOpcode2Str(action), pluginId, value1, value2, value3, valuef, valueStr);
 #endif
 
+#ifndef BUILD_BRIDGE_ALTERNATIVE_ARCH
+    // keep track of plugin changes, even while no OSC client is around, so reconnects can skip unchanged plugins
+    if (isPluginStateChangeCallback(action))
+        pluginStateChanged(pluginId);
+#endif
+
     if (sendHost && pData->callback != nullptr)
     {
         if (action == ENGINE_CALLBACK_IDLE)
@@ -394,6 +394,7 @@ CarlaEngine::ProtectedData::ProtectedData(CarlaEngine* const engine) noexcept
       timeInfo(),
 #ifndef BUILD_BRIDGE_ALTERNATIVE_ARCH
       plugins(nullptr),
+      lastStateVersion(0),
       xruns(0),
       dspLoad(0.0f),
 #endif
@@ -482,6 +483,8 @@ bool CarlaEngine::ProtectedData::init(const char* const clientName)
 #ifndef BUILD_BRIDGE_ALTERNATIVE_ARCH
     plugins = new EnginePluginData[maxPluginNumber];
     carla_zeroStructs(plugins, maxPluginNumber);
+    // seed from current time, so versions from a previous engine run are never mistaken for current ones
+    lastStateVersion = static_cast<uint64_t>(std::time(nullptr)) << 24;
     xruns = 0;
     dspLoad = 0.0f;
 #endif
@@ -560,6 +563,7 @@ void CarlaEngine::ProtectedData::doPluginRemove(const uint pluginId) noexcept
         plugin->setId(i);
 
         plugins[i].plugin = plugin;
+        plugins[i].stateVersion = plugins[i+1].stateVersion;
         carla_zeroFloats(plugins[i].peaks, 4);
     }
 
@@ -567,6 +571,7 @@ void CarlaEngine::ProtectedData::doPluginRemove(const uint pluginId) noexcept
 
     // reset last plugin (now removed)
     plugins[id].plugin = nullptr;
+    plugins[id].stateVersion = 0;
     carla_zeroFloats(plugins[id].peaks, 4);
 }
 
@@ -583,11 +588,15 @@ void CarlaEngine::ProtectedData::doPluginsSwitch(const uint idA, const uint idB)
     CarlaPlugin* const pluginB(plugins[idB].plugin);
     CARLA_SAFE_ASSERT_RETURN(pluginB != nullptr,);
 
+    const uint64_t stateVersionA = plugins[idA].stateVersion;
+
     pluginA->setId(idB);
     plugins[idA].plugin = pluginB;
+    plugins[idA].stateVersion = plugins[idB].stateVersion;
 
     pluginB->setId(idA);
     plugins[idB].plugin = pluginA;
+    plugins[idB].stateVersion = stateVersionA;
 }
 #endif
 
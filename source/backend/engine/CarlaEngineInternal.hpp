@@ -206,6 +206,7 @@ struct EngineNextAction {
 struct EnginePluginData {
     CarlaPlugin* plugin;
     float peaks[4];
+    uint64_t stateVersion; // changes every time the plugin state changes, used for OSC resync
 };
 
 // -----------------------------------------------------------------------
@@ -251,6 +252,7 @@ struct CarlaEngine::ProtectedData {
     EnginePluginData plugins[1];
 #else
     EnginePluginData* plugins;
+    uint64_t lastStateVersion;
     uint32_t xruns;
     float dspLoad;
 #endif
@@ -28,6 +28,7 @@
 #include "CarlaBase64Utils.hpp"
 #include "CarlaBinaryUtils.hpp"
 #include "CarlaMathUtils.hpp"
+#include "CarlaShmUtils.hpp"
 #include "CarlaStateUtils.hpp"
 
 #include "CarlaExternalUI.hpp"
@@ -68,6 +69,32 @@ CARLA_BACKEND_START_NAMESPACE
 static const uint32_t kNumInParams = 100;
 static const uint32_t kNumOutParams = 110;
 
+// -----------------------------------------------------------------------
+// Shared memory table with peaks and output parameter values, read by the carla-plugin UI
+
+#define CARLA_ENGINE_NATIVE_UI_SHM_MAGIC   0x43524C50 /* "CRLP" */
+#define CARLA_ENGINE_NATIVE_UI_SHM_VERSION 1
+
+struct CarlaEngineNativeUiShmData {
+    // constant after creation
+    uint32_t magic;
+    uint32_t version;
+    uint32_t maxPlugins;
+    uint32_t maxParameters;
+
+    // odd while the engine is writing, only changes when something below changed
+    uint32_t generation;
+    uint32_t pluginCount;
+
+    // in1, in2, out1, out2 for each plugin
+    float peaks[MAX_PATCHBAY_PLUGINS][4];
+
+    // first output parameters of each plugin, any others are still sent through the pipe
+    uint32_t parameterOutputs[MAX_PATCHBAY_PLUGINS];
+    uint32_t parameterIndexes[MAX_PATCHBAY_PLUGINS][MAX_DEFAULT_PARAMETERS];
+    float    parameterValues[MAX_PATCHBAY_PLUGINS][MAX_DEFAULT_PARAMETERS];
+};
+
 // -----------------------------------------------------------------------
 
 #ifdef USE_JUCE_MESSAGE_THREAD
@@ -177,10 +204,16 @@ public:
           fIsActive(false),
           fIsRunning(false),
           fUiServer(this),
-          fOptionsForced(false)
+          fOptionsForced(false),
+          fUiShm(),
+          fUiShmFilename(),
+          fUiShmData(nullptr),
+          fUiShmActive(false)
     {
         carla_debug("CarlaEngineNative::CarlaEngineNative()");
 
+        carla_shm_init(fUiShm);
+
         carla_zeroFloats(fParameters, kNumInParams+kNumOutParams);
 
 #ifdef USE_JUCE_MESSAGE_THREAD
@@ -250,6 +283,8 @@ public:
         //runPendingRtEvents();
         close();
 
+        uiServerClearSharedTable();
+
         pData->graph.destroy();
 
 #ifdef USE_JUCE_MESSAGE_THREAD
@@ -361,6 +396,15 @@ public:
         pHost->dispatcher(pHost->handle, NATIVE_HOST_OPCODE_RELOAD_ALL, 0, 0, nullptr, 0.0f);
     }
 
+    // the UI mapped the shared table, peaks and output parameters stop going through the pipe
+    void enableSharedTableFromUI()
+    {
+        CARLA_SAFE_ASSERT_RETURN(fUiShmData != nullptr,);
+
+        fUiShmData->pluginCount = 0;
+        fUiShmActive = true;
+    }
+
 protected:
     // -------------------------------------------------------------------
 
@@ -664,6 +708,169 @@ protected:
         fUiServer.flushMessages();
     }
 
+    // Separators used inside PLUGIN_DATA_ payloads, never valid inside plugin strings
+    static const char kPluginDataFieldSep  = '\x1f';
+    static const char kPluginDataRecordSep = '\x1e';
+
+    static void uiServerWritePluginDataString(MemoryOutputStream& out, const char* const str)
+    {
+        if (str == nullptr)
+            return;
+
+        for (const char* s = str; *s != '\0'; ++s)
+        {
+            switch (*s)
+            {
+            case '\n':
+                out << '\r';
+                break;
+            case kPluginDataFieldSep:
+            case kPluginDataRecordSep:
+                out << ' ';
+                break;
+            default:
+                out << *s;
+                break;
+            }
+        }
+    }
+
+    // Sends plugin info, parameters and programs as a single length-prefixed message.
+    // Everything is serialized into one line so the UI side reads and decodes a whole plugin at once.
+    void uiServerSendPluginData(CarlaPlugin* const plugin)
+    {
+        char tmpBuf[STR_MAX];
+        carla_zeroChars(tmpBuf, STR_MAX);
+
+        const uint pluginId(plugin->getId());
+
+        MemoryOutputStream out(4096);
+
+        {
+            const CarlaScopedLocale csl;
+
+            // info, 17 fields
+            std::snprintf(tmpBuf, sizeof(tmpBuf), "%i\x1f%i\x1f%i\x1f" P_INT64 "\x1f%i\x1f%i\x1f",
+                          plugin->getType(), plugin->getCategory(), plugin->getHints(), plugin->getUniqueId(),
+                          plugin->getOptionsAvailable(), plugin->getOptionsEnabled());
+            out << tmpBuf;
+
+            uiServerWritePluginDataString(out, plugin->getFilename());
+            out << kPluginDataFieldSep;
+            uiServerWritePluginDataString(out, plugin->getName());
+            out << kPluginDataFieldSep;
+            uiServerWritePluginDataString(out, plugin->getIconName());
+            out << kPluginDataFieldSep;
+
+            plugin->getRealName(tmpBuf);
+            uiServerWritePluginDataString(out, tmpBuf);
+            out << kPluginDataFieldSep;
+
+            plugin->getLabel(tmpBuf);
+            uiServerWritePluginDataString(out, tmpBuf);
+            out << kPluginDataFieldSep;
+
+            plugin->getMaker(tmpBuf);
+            uiServerWritePluginDataString(out, tmpBuf);
+            out << kPluginDataFieldSep;
+
+            plugin->getCopyright(tmpBuf);
+            uiServerWritePluginDataString(out, tmpBuf);
+
+            std::snprintf(tmpBuf, sizeof(tmpBuf), "\x1f%i\x1f%i\x1f%i\x1f%i\x1e",
+                          plugin->getAudioInCount(), plugin->getAudioOutCount(),
+                          plugin->getMidiInCount(), plugin->getMidiOutCount());
+            out << tmpBuf;
+
+            // internal parameter values
+            for (int32_t i=PARAMETER_ACTIVE; i>PARAMETER_MAX; --i)
+            {
+                std::snprintf(tmpBuf, sizeof(tmpBuf), i == PARAMETER_ACTIVE ? "%f" : "\x1f%f",
+                              static_cast<double>(plugin->getInternalParameterValue(i)));
+                out << tmpBuf;
+            }
+            out << kPluginDataRecordSep;
+
+            // parameter counts, then one record per parameter
+            uint32_t ins, outs, count;
+            plugin->getParameterCountInfo(ins, outs);
+            count = plugin->getParameterCount();
+
+            std::snprintf(tmpBuf, sizeof(tmpBuf), "%i\x1f%i\x1f%i", ins, outs, count);
+            out << tmpBuf;
+
+            for (uint32_t i=0; i<count; ++i)
+            {
+                const ParameterData& paramData(plugin->getParameterData(i));
+                const ParameterRanges& paramRanges(plugin->getParameterRanges(i));
+
+                std::snprintf(tmpBuf, sizeof(tmpBuf), "\x1e%i\x1f%i\x1f%i\x1f%i\x1f",
+                              paramData.type, paramData.hints, paramData.midiChannel, paramData.midiCC);
+                out << tmpBuf;
+
+                plugin->getParameterName(i, tmpBuf);
+                uiServerWritePluginDataString(out, tmpBuf);
+                out << kPluginDataFieldSep;
+
+                plugin->getParameterUnit(i, tmpBuf);
+                uiServerWritePluginDataString(out, tmpBuf);
+
+                // one at a time, "%f" of a large value alone can take ~50 chars
+                const float values[7] = {
+                    paramRanges.def, paramRanges.min, paramRanges.max,
+                    paramRanges.step, paramRanges.stepSmall, paramRanges.stepLarge,
+                    plugin->getParameterValue(i)
+                };
+
+                for (uint j=0; j<7; ++j)
+                {
+                    std::snprintf(tmpBuf, sizeof(tmpBuf), "\x1f%f", static_cast<double>(values[j]));
+                    out << tmpBuf;
+                }
+            }
+        }
+
+        // programs, count and current followed by all names
+        uint32_t count = plugin->getProgramCount();
+        std::snprintf(tmpBuf, sizeof(tmpBuf), "\x1e%i\x1f%i", count, plugin->getCurrentProgram());
+        out << tmpBuf;
+
+        for (uint32_t i=0; i<count; ++i)
+        {
+            plugin->getProgramName(i, tmpBuf);
+            out << kPluginDataFieldSep;
+            uiServerWritePluginDataString(out, tmpBuf);
+        }
+
+        // midi programs, count and current followed by bank, program and name of each
+        count = plugin->getMidiProgramCount();
+        std::snprintf(tmpBuf, sizeof(tmpBuf), "\x1e%i\x1f%i", count, plugin->getCurrentMidiProgram());
+        out << tmpBuf;
+
+        for (uint32_t i=0; i<count; ++i)
+        {
+            const MidiProgramData& mpData(plugin->getMidiProgramData(i));
+
+            std::snprintf(tmpBuf, sizeof(tmpBuf), "\x1f%i\x1f%i\x1f", mpData.bank, mpData.program);
+            out << tmpBuf;
+            uiServerWritePluginDataString(out, mpData.name);
+        }
+
+        const std::size_t payloadSize(out.getDataSize());
+        out << '\n';
+
+        const CarlaMutexLocker cml(fUiServer.getPipeLock());
+
+        std::snprintf(tmpBuf, sizeof(tmpBuf), "PLUGIN_DATA_%i:" P_SIZE "\n", pluginId, payloadSize);
+        if (! fUiServer.writeMessage(tmpBuf))
+            return;
+
+        if (! fUiServer.writeMessage(static_cast<const char*>(out.getData()), out.getDataSize()))
+            return;
+
+        fUiServer.flushMessages();
+    }
+
     void uiServerCallback(const EngineCallbackOpcode action, const uint pluginId,
                           const int value1, const int value2, const int value3,
                           const float valuef, const char* const valueStr)
@@ -724,9 +931,7 @@ protected:
             if (plugin != nullptr && plugin->isEnabled())
             {
                 CARLA_SAFE_ASSERT_BREAK(plugin->getId() == pluginId);
-                uiServerSendPluginInfo(plugin);
-                uiServerSendPluginParameters(plugin);
-                uiServerSendPluginPrograms(plugin);
+                uiServerSendPluginData(plugin);
                 uiServerSendPluginProperties(plugin);
             }
             break;
@@ -784,6 +989,146 @@ protected:
         return nullptr;
     }
 
+    // Creates the shared table on first use, it is kept until the engine is destroyed.
+    // The UI only gets its name here, the table is used once the UI confirms it mapped it.
+    void uiServerSendSharedTable()
+    {
+        CARLA_SAFE_ASSERT_RETURN(fUiServer.isPipeRunning(),);
+
+        fUiShmActive = false;
+
+        if (fUiShmData == nullptr)
+        {
+            char tmpFileBase[64];
+            std::strcpy(tmpFileBase, "/crlplg_ui_XXXXXX");
+
+            fUiShm = carla_shm_create_temp(tmpFileBase);
+            CARLA_SAFE_ASSERT_RETURN(carla_is_shm_valid(fUiShm),);
+
+            if (! carla_shm_map<CarlaEngineNativeUiShmData>(fUiShm, fUiShmData))
+            {
+                carla_shm_close(fUiShm);
+                carla_shm_init(fUiShm);
+                return;
+            }
+
+            carla_zeroStruct(*fUiShmData);
+            fUiShmData->magic         = CARLA_ENGINE_NATIVE_UI_SHM_MAGIC;
+            fUiShmData->version       = CARLA_ENGINE_NATIVE_UI_SHM_VERSION;
+            fUiShmData->maxPlugins    = MAX_PATCHBAY_PLUGINS;
+            fUiShmData->maxParameters = MAX_DEFAULT_PARAMETERS;
+
+            fUiShmFilename = tmpFileBase;
+        }
+
+        const CarlaMutexLocker cml(fUiServer.getPipeLock());
+
+        if (! fUiServer.writeAndFixMessage("shm-table"))
+            return;
+        if (! fUiServer.writeAndFixMessage(fUiShmFilename))
+            return;
+
+        fUiServer.flushMessages();
+    }
+
+    void uiServerClearSharedTable()
+    {
+        fUiShmActive = false;
+
+        if (fUiShmData != nullptr)
+        {
+            carla_shm_unmap(fUiShm, fUiShmData);
+            fUiShmData = nullptr;
+        }
+
+        if (carla_is_shm_valid(fUiShm))
+        {
+            carla_shm_close(fUiShm);
+            carla_shm_init(fUiShm);
+        }
+
+        fUiShmFilename.clear();
+    }
+
+    bool uiServerSharedTableChanged(const uint32_t pluginCount) const noexcept
+    {
+        const CarlaEngineNativeUiShmData* const shmData(fUiShmData);
+
+        if (shmData->pluginCount != pluginCount)
+            return true;
+
+        for (uint32_t i=0; i < pluginCount; ++i)
+        {
+            const EnginePluginData& plugData(pData->plugins[i]);
+            const CarlaPlugin* const plugin(plugData.plugin);
+
+            if (std::memcmp(shmData->peaks[i], plugData.peaks, sizeof(float)*4) != 0)
+                return true;
+
+            uint32_t outputs = 0;
+
+            for (uint32_t j=0, count=plugin->getParameterCount(); j < count && outputs < MAX_DEFAULT_PARAMETERS; ++j)
+            {
+                if (! plugin->isParameterOutput(j))
+                    continue;
+
+                if (outputs >= shmData->parameterOutputs[i] || shmData->parameterIndexes[i][outputs] != j)
+                    return true;
+                if (carla_isNotEqual(shmData->parameterValues[i][outputs], plugin->getParameterValue(j)))
+                    return true;
+
+                ++outputs;
+            }
+
+            if (outputs != shmData->parameterOutputs[i])
+                return true;
+        }
+
+        return false;
+    }
+
+    // seqlock write, the generation is left untouched if nothing changed so the UI can skip reading
+    void uiServerUpdateSharedTable()
+    {
+        CarlaEngineNativeUiShmData* const shmData(fUiShmData);
+        CARLA_SAFE_ASSERT_RETURN(shmData != nullptr,);
+
+        const uint32_t pluginCount = std::min(pData->curPluginCount, MAX_PATCHBAY_PLUGINS);
+
+        if (! uiServerSharedTableChanged(pluginCount))
+            return;
+
+        shmData->generation = shmData->generation + 1;
+        __sync_synchronize();
+
+        shmData->pluginCount = pluginCount;
+
+        for (uint32_t i=0; i < pluginCount; ++i)
+        {
+            const EnginePluginData& plugData(pData->plugins[i]);
+            const CarlaPlugin* const plugin(plugData.plugin);
+
+            carla_copyFloats(shmData->peaks[i], plugData.peaks, 4);
+
+            uint32_t outputs = 0;
+
+            for (uint32_t j=0, count=plugin->getParameterCount(); j < count && outputs < MAX_DEFAULT_PARAMETERS; ++j)
+            {
+                if (! plugin->isParameterOutput(j))
+                    continue;
+
+                shmData->parameterIndexes[i][outputs] = j;
+                shmData->parameterValues[i][outputs]  = plugin->getParameterValue(j);
+                ++outputs;
+            }
+
+            shmData->parameterOutputs[i] = outputs;
+        }
+
+        __sync_synchronize();
+        shmData->generation = shmData->generation + 1;
+    }
+
     void uiServerInfo()
     {
         CARLA_SAFE_ASSERT_RETURN(fIsRunning,);
@@ -1309,6 +1654,7 @@ protected:
 
             uiServerInfo();
             uiServerOptions();
+            uiServerSendSharedTable();
             uiServerCallback(ENGINE_CALLBACK_ENGINE_STARTED,
                              pData->curPluginCount,
                              pData->options.processMode,
@@ -1456,32 +1802,42 @@ protected:
         fUiServer.flushMessages();
 
         // ------------------------------------------------------------------------------------------------------------
-        // send peaks and param outputs for all plugins
+        // send peaks and param outputs for all plugins, the shared table takes them when the UI uses it
+
+        if (fUiShmActive)
+            uiServerUpdateSharedTable();
 
         for (uint i=0; i < pData->curPluginCount; ++i)
         {
             const EnginePluginData& plugData(pData->plugins[i]);
             const CarlaPlugin* const plugin(pData->plugins[i].plugin);
 
-            std::sprintf(tmpBuf, "PEAKS_%i\n", i);
-            if (! fUiServer.writeMessage(tmpBuf))
-                return;
+            if (! fUiShmActive)
+            {
+                std::sprintf(tmpBuf, "PEAKS_%i\n", i);
+                if (! fUiServer.writeMessage(tmpBuf))
+                    return;
 
-            std::sprintf(tmpBuf, "%f:%f:%f:%f\n",
-                         static_cast<double>(plugData.peaks[0]),
-                         static_cast<double>(plugData.peaks[1]),
-                         static_cast<double>(plugData.peaks[2]),
-                         static_cast<double>(plugData.peaks[3]));
-            if (! fUiServer.writeMessage(tmpBuf))
-                return;
+                std::sprintf(tmpBuf, "%f:%f:%f:%f\n",
+                             static_cast<double>(plugData.peaks[0]),
+                             static_cast<double>(plugData.peaks[1]),
+                             static_cast<double>(plugData.peaks[2]),
+                             static_cast<double>(plugData.peaks[3]));
+                if (! fUiServer.writeMessage(tmpBuf))
+                    return;
 
-            fUiServer.flushMessages();
+                fUiServer.flushMessages();
+            }
 
-            for (uint32_t j=0, count=plugin->getParameterCount(); j < count; ++j)
+            for (uint32_t j=0, outputs=0, count=plugin->getParameterCount(); j < count; ++j)
             {
                 if (! plugin->isParameterOutput(j))
                     continue;
 
+                // already in the shared table
+                if (fUiShmActive && outputs++ < MAX_DEFAULT_PARAMETERS)
+                    continue;
+
                 std::sprintf(tmpBuf, "PARAMVAL_%i:%i\n", i, j);
                 if (! fUiServer.writeMessage(tmpBuf))
                     return;
@@ -1713,6 +2069,11 @@ private:
 
     bool fOptionsForced;
 
+    carla_shm_t  fUiShm;
+    CarlaString  fUiShmFilename;
+    CarlaEngineNativeUiShmData* fUiShmData;
+    bool fUiShmActive;
+
     CarlaPlugin* _getFirstPlugin() const noexcept
     {
         if (pData->curPluginCount == 0 || pData->plugins == nullptr)
@@ -2246,6 +2607,10 @@ bool CarlaEngineNativeUI::msgReceived(const char*const msg) noexcept
         if (CarlaPlugin* const plugin = fEngine->getPlugin(pluginId))
             plugin->sendMidiSingleNote(static_cast<uint8_t>(channel), static_cast<uint8_t>(note), static_cast<uint8_t>(velocity), true, true, false);
     }
+    else if (std::strcmp(msg, "enable_shm_table") == 0)
+    {
+        fEngine->enableSharedTableFromUI();
+    }
     else if (std::strcmp(msg, "show_custom_ui") == 0)
     {
         uint32_t pluginId;
@@ -33,10 +33,17 @@ CarlaEngineOsc::CarlaEngineOsc(CarlaEngine* const engine) noexcept
       fServerPathTCP(),
       fServerPathUDP(),
       fServerTCP(nullptr),
-      fServerUDP(nullptr)
+      fServerUDP(nullptr),
+      fSequenceUDP(0),
+      fShm(),
+      fShmFilename(),
+      fShmData(nullptr),
+      fShmActive(false)
 {
     CARLA_SAFE_ASSERT(engine != nullptr);
     carla_debug("CarlaEngineOsc::CarlaEngineOsc(%p)", engine);
+
+    carla_shm_init(fShm);
 }
 
 CarlaEngineOsc::~CarlaEngineOsc() noexcept
@@ -46,6 +53,7 @@ CarlaEngineOsc::~CarlaEngineOsc() noexcept
     CARLA_SAFE_ASSERT(fServerPathUDP.isEmpty());
     CARLA_SAFE_ASSERT(fServerTCP == nullptr);
     CARLA_SAFE_ASSERT(fServerUDP == nullptr);
+    CARLA_SAFE_ASSERT(fShmData == nullptr);
     carla_debug("CarlaEngineOsc::~CarlaEngineOsc()");
 }
 
@@ -204,6 +212,79 @@ void CarlaEngineOsc::close() noexcept
 
     fControlDataTCP.clear();
     fControlDataUDP.clear();
+
+    clearSharedMemory();
+}
+
+// -----------------------------------------------------------------------
+
+bool CarlaEngineOsc::enableSharedMemory() noexcept
+{
+    // only used once the client says it could attach, see "shm_attached"
+    fShmActive = false;
+
+    if (fShmData != nullptr)
+    {
+        // reused across client connections, only the ring needs resetting
+        fShmData->ringHead = 0;
+        fShmData->ringTail = 0;
+        return true;
+    }
+
+    char tmpFileBase[64];
+    std::strcpy(tmpFileBase, "/crlctrl_shm_XXXXXX");
+
+    fShm = carla_shm_create_temp(tmpFileBase);
+    CARLA_SAFE_ASSERT_RETURN(carla_is_shm_valid(fShm), false);
+
+    if (! carla_shm_map<CarlaEngineOscShmData>(fShm, fShmData))
+    {
+        carla_shm_close(fShm);
+        carla_shm_init(fShm);
+        return false;
+    }
+
+    carla_zeroStruct(*fShmData);
+    fShmData->magic      = CARLA_ENGINE_OSC_SHM_MAGIC;
+    fShmData->version    = CARLA_ENGINE_OSC_SHM_VERSION;
+    fShmData->maxPlugins = MAX_PATCHBAY_PLUGINS;
+    fShmData->ringSize   = kEngineOscShmRingSize;
+
+    fShmFilename = tmpFileBase;
+    carla_debug("OSC shared memory created at %s", fShmFilename.buffer());
+    return true;
+}
+
+void CarlaEngineOsc::clearSharedMemory() noexcept
+{
+    fShmActive = false;
+
+    if (fShmData != nullptr)
+    {
+        carla_shm_unmap(fShm, fShmData);
+        fShmData = nullptr;
+    }
+
+    if (carla_is_shm_valid(fShm))
+    {
+        carla_shm_close(fShm);
+        carla_shm_init(fShm);
+    }
+
+    fShmFilename.clear();
+}
+
+void CarlaEngineOsc::beginSharedMemoryWrite() const noexcept
+{
+    // only the engine thread writes, so a plain increment is enough
+    fShmData->sequence = fShmData->sequence + 1;
+    __sync_synchronize();
+}
+
+void CarlaEngineOsc::endSharedMemoryWrite() const noexcept
+{
+    __sync_synchronize();
+    fShmData->sequence = fShmData->sequence + 1;
 }
 
 // -----------------------------------------------------------------------
@@ -24,8 +24,11 @@
 
 #include "CarlaBackend.h"
 #include "CarlaOscUtils.hpp"
+#include "CarlaShmUtils.hpp"
 #include "CarlaString.hpp"
 
+#include <atomic>
+
 #define CARLA_ENGINE_OSC_HANDLE_ARGS CarlaPlugin* const plugin, const int argc, const lo_arg* const* const argv, const char* const types
 
 #define CARLA_ENGINE_OSC_CHECK_OSC_TYPES(/* argc, types, */ argcToCompare, typesToCompare)                                     \
@@ -53,6 +56,54 @@
 
 CARLA_BACKEND_START_NAMESPACE
 
+// -----------------------------------------------------------------------
+// Shared memory used instead of UDP for carla-control clients running on the same machine.
+// It carries all the UDP traffic: runtime info and peaks (seqlock table) and output parameter values (ring).
+// TCP messages (callbacks, plugin info and the client requests) are not moved here on purpose,
+// they are infrequent, variable-sized, and have to stay in order with each other.
+
+#define CARLA_ENGINE_OSC_SHM_MAGIC   0x43524C43 /* "CRLC" */
+#define CARLA_ENGINE_OSC_SHM_VERSION 1
+
+static const uint32_t kEngineOscShmRingSize = 4096;
+
+struct CarlaEngineOscShmParameter {
+    uint32_t pluginId;
+    uint32_t index;
+    float value;
+};
+
+struct CarlaEngineOscShmData {
+    // constant after creation
+    uint32_t magic;
+    uint32_t version;
+    uint32_t maxPlugins;
+    uint32_t ringSize;
+
+    // seqlock for everything below up to the ring, odd while the engine is writing
+    uint32_t sequence;
+
+    // runtime and transport info
+    uint32_t pluginCount;
+    float    load;
+    uint32_t xruns;
+    uint64_t frame;
+    int32_t  playing;
+    int32_t  bar;
+    int32_t  beat;
+    int32_t  tick;
+    double   beatsPerMinute;
+
+    // in1, in2, out1, out2 for each plugin
+    float peaks[MAX_PATCHBAY_PLUGINS][4];
+
+    // single-producer single-consumer ring of output parameter values,
+    // head is only written by the engine and tail only by the client
+    uint32_t ringHead;
+    uint32_t ringTail;
+    CarlaEngineOscShmParameter ring[kEngineOscShmRingSize];
+};
+
 // -----------------------------------------------------------------------
 
 class CarlaEngineOsc
@@ -89,6 +140,11 @@ public:
         return fControlDataUDP.target != nullptr;
     }
 
+    bool isControlUsingSharedMemory() const noexcept
+    {
+        return fShmActive && fShmData != nullptr;
+    }
+
     // -------------------------------------------------------------------
     // TCP
 
@@ -104,12 +160,14 @@ public:
     void sendPluginMidiProgram(const CarlaPlugin* const plugin, const uint32_t index) const noexcept;
     void sendPluginCustomData(const CarlaPlugin* const plugin, const uint32_t index) const noexcept;
     void sendPluginInternalParameterValues(const CarlaPlugin* const plugin) const noexcept;
+    void sendPluginStateVersion(const CarlaPlugin* const plugin, const uint64_t stateVersion, const bool unchanged) const noexcept;
     void sendPing() const noexcept;
     void sendResponse(const int messageId, const char* const error) const noexcept;
+    void sendSharedMemoryName() const noexcept;
     void sendExit() const noexcept;
 
     // -------------------------------------------------------------------
-    // UDP
+    // UDP, or shared memory when enabled
 
     void sendRuntimeInfo() const noexcept;
     void sendParameterValue(const uint pluginId, const uint32_t index, const float value) const noexcept;
@@ -130,6 +188,22 @@ private:
     lo_server    fServerTCP;
     lo_server    fServerUDP;
 
+    // sequence number for UDP messages, lets the client drop stale and out-of-order datagrams.
+    // incremented by the engine thread, reset when a client registers (from idle(), in the idle thread)
+    mutable std::atomic<int64_t> fSequenceUDP;
+
+    // kept mapped until close(), so the engine thread never writes into an unmapped segment
+    carla_shm_t  fShm;
+    CarlaString  fShmFilename;
+    CarlaEngineOscShmData* fShmData;
+    volatile bool fShmActive;
+
+    bool enableSharedMemory() noexcept;
+    void clearSharedMemory() noexcept;
+
+    void beginSharedMemoryWrite() const noexcept;
+    void endSharedMemoryWrite() const noexcept;
+
     // -------------------------------------------------------------------
 
     int handleMessage(const bool isTCP, const char* const path,
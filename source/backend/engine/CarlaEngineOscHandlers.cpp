@@ -184,11 +184,44 @@ int CarlaEngineOsc::handleMessage(const bool isTCP, const char* const path, cons
 
 // -----------------------------------------------------------------------
 
+// check if a state version is part of a comma-separated list, as sent by a resyncing client
+static bool isStateVersionKnown(const char* const knownVersions, const uint64_t stateVersion) noexcept
+{
+    if (knownVersions == nullptr || stateVersion == 0)
+        return false;
+
+    char strBuf[32];
+    std::snprintf(strBuf, 31, P_UINT64, stateVersion);
+    strBuf[31] = '\0';
+
+    const std::size_t len = std::strlen(strBuf);
+
+    for (const char* s = knownVersions; (s = std::strstr(s, strBuf)) != nullptr; s += len)
+    {
+        if ((s == knownVersions || s[-1] == ',') && (s[len] == ',' || s[len] == '\0'))
+            return true;
+    }
+
+    return false;
+}
+
 int CarlaEngineOsc::handleMsgRegister(const bool isTCP,
                                       const int argc, const lo_arg* const* const argv, const char* const types)
 {
     carla_debug("CarlaEngineOsc::handleMsgRegister()");
-    CARLA_ENGINE_OSC_CHECK_OSC_TYPES(1, "s");
+
+    // clients that already have plugin data cached send the state versions they know about
+    const char* knownVersions = nullptr;
+
+    if (isTCP && argc == 2)
+    {
+        CARLA_ENGINE_OSC_CHECK_OSC_TYPES(2, "ss");
+        knownVersions = &argv[1]->s;
+    }
+    else
+    {
+        CARLA_ENGINE_OSC_CHECK_OSC_TYPES(1, "s");
+    }
 
     const char* const url = &argv[0]->s;
     const lo_address addr = lo_address_new_from_url(url);
@@ -218,6 +251,12 @@ int CarlaEngineOsc::handleMsgRegister(const bool isTCP,
         const char* const port  = lo_address_get_port(addr);
         const lo_address target = lo_address_new_with_proto(isTCP ? LO_TCP : LO_UDP, host, port);
 
+        if (! isTCP)
+            fSequenceUDP = 0;
+
+        // a new client has to ask for shared memory again
+        fShmActive = false;
+
         oscData.owner  = carla_strdup_safe(url);
         oscData.path   = carla_strdup_free(lo_url_get_path(url));
         oscData.target = target;
@@ -240,7 +279,23 @@ int CarlaEngineOsc::handleMsgRegister(const bool isTCP,
                 CarlaPlugin* const plugin(fEngine->getPluginUnchecked(i));
                 CARLA_SAFE_ASSERT_CONTINUE(plugin != nullptr);
 
-                fEngine->callback(false, true, ENGINE_CALLBACK_PLUGIN_ADDED, i, 0, 0, 0, 0.0f, plugin->getName());
+                EnginePluginData& pluginData(fEngine->pData->plugins[i]);
+                const uint64_t stateVersion = pluginData.stateVersion;
+
+                if (isStateVersionKnown(knownVersions, stateVersion))
+                {
+                    // client has this exact state cached, skip sending all plugin data
+                    sendPluginStateVersion(plugin, stateVersion, true);
+                    sendCallback(ENGINE_CALLBACK_PLUGIN_ADDED, i, 0, 0, 0, 0.0f, plugin->getName());
+                }
+                else
+                {
+                    fEngine->callback(false, true, ENGINE_CALLBACK_PLUGIN_ADDED, i, 0, 0, 0, 0.0f, plugin->getName());
+
+                    // sending the state to a new client is not a state change
+                    pluginData.stateVersion = stateVersion;
+                    sendPluginStateVersion(plugin, stateVersion, false);
+                }
             }
 
             fEngine->patchbayRefresh(false, true, fEngine->pData->graph.isUsingExternalOSC());
@@ -271,6 +326,10 @@ int CarlaEngineOsc::handleMsgUnregister(const bool isTCP,
     {
         carla_stdout("OSC client %s unregistered", url);
         oscData.clear();
+
+        // without either connection nobody reads the shared memory anymore
+        fShmActive = false;
+
         return 0;
     }
 
@@ -359,6 +418,29 @@ int CarlaEngineOsc::handleMsgControl(const char* const method,
 
         ok = fEngine->patchbayRefresh(false, true, external);
     }
+    else if (std::strcmp(method, "enable_shm") == 0)
+    {
+        // only makes sense for clients on this machine, they ask for it themselves
+        ok = enableSharedMemory();
+
+        if (ok)
+            sendSharedMemoryName();
+        else
+            fEngine->setLastError("Failed to create shared memory for OSC control");
+    }
+    else if (std::strcmp(method, "shm_attached") == 0)
+    {
+        // the client mapped the segment, stop sending peaks, runtime info and output parameters over UDP
+        CARLA_SAFE_ASSERT_RETURN_OSC_ERR(fShmData != nullptr);
+
+        ok = true;
+        fShmActive = true;
+    }
+    else if (std::strcmp(method, "disable_shm") == 0)
+    {
+        ok = true;
+        fShmActive = false;
+    }
     else if (std::strcmp(method, "transport_play") == 0)
     {
         ok = true;
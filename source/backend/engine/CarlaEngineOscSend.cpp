@@ -271,6 +271,23 @@ void CarlaEngineOsc::sendPluginInternalParameterValues(const CarlaPlugin* const
                );
 }
 
+void CarlaEngineOsc::sendPluginStateVersion(const CarlaPlugin* const plugin,
+                                            const uint64_t stateVersion, const bool unchanged) const noexcept
+{
+    CARLA_SAFE_ASSERT_RETURN(fControlDataTCP.path != nullptr && fControlDataTCP.path[0] != '\0',);
+    CARLA_SAFE_ASSERT_RETURN(fControlDataTCP.target != nullptr,);
+    CARLA_SAFE_ASSERT_RETURN(plugin != nullptr,);
+    carla_debug("CarlaEngineOsc::sendPluginStateVersion(%p, " P_UINT64 ", %s)", plugin, stateVersion, bool2str(unchanged));
+
+    char targetPath[std::strlen(fControlDataTCP.path)+9];
+    std::strcpy(targetPath, fControlDataTCP.path);
+    std::strcat(targetPath, "/version");
+    try_lo_send(fControlDataTCP.target, targetPath, "ihi",
+                static_cast<int32_t>(plugin->getId()),
+                static_cast<int64_t>(stateVersion),
+                unchanged ? 1 : 0);
+}
+
 // -----------------------------------------------------------------------
 
 void CarlaEngineOsc::sendPing() const noexcept
@@ -296,6 +313,19 @@ void CarlaEngineOsc::sendResponse(const int messageId, const char* const error)
     try_lo_send(fControlDataTCP.target, targetPath, "is", messageId, error);
 }
 
+void CarlaEngineOsc::sendSharedMemoryName() const noexcept
+{
+    CARLA_SAFE_ASSERT_RETURN(fControlDataTCP.path != nullptr && fControlDataTCP.path[0] != '\0',);
+    CARLA_SAFE_ASSERT_RETURN(fControlDataTCP.target != nullptr,);
+    CARLA_SAFE_ASSERT_RETURN(fShmFilename.isNotEmpty(),);
+    carla_debug("CarlaEngineOsc::sendSharedMemoryName()");
+
+    char targetPath[std::strlen(fControlDataTCP.path)+5];
+    std::strcpy(targetPath, fControlDataTCP.path);
+    std::strcat(targetPath, "/shm");
+    try_lo_send(fControlDataTCP.target, targetPath, "s", fShmFilename.buffer());
+}
+
 void CarlaEngineOsc::sendExit() const noexcept
 {
     CARLA_SAFE_ASSERT_RETURN(fControlDataTCP.path != nullptr && fControlDataTCP.path[0] != '\0',);
@@ -312,15 +342,31 @@ void CarlaEngineOsc::sendExit() const noexcept
 
 void CarlaEngineOsc::sendRuntimeInfo() const noexcept
 {
+    const EngineTimeInfo timeInfo(fEngine->getTimeInfo());
+
+    if (isControlUsingSharedMemory())
+    {
+        beginSharedMemoryWrite();
+        fShmData->pluginCount    = fEngine->getCurrentPluginCount();
+        fShmData->load           = fEngine->getDSPLoad();
+        fShmData->xruns          = fEngine->getTotalXruns();
+        fShmData->frame          = timeInfo.frame;
+        fShmData->playing        = timeInfo.playing ? 1 : 0;
+        fShmData->bar            = timeInfo.bbt.bar;
+        fShmData->beat           = timeInfo.bbt.beat;
+        fShmData->tick           = static_cast<int32_t>(timeInfo.bbt.tick);
+        fShmData->beatsPerMinute = timeInfo.bbt.beatsPerMinute;
+        endSharedMemoryWrite();
+        return;
+    }
+
     CARLA_SAFE_ASSERT_RETURN(fControlDataUDP.path != nullptr && fControlDataUDP.path[0] != '\0',);
     CARLA_SAFE_ASSERT_RETURN(fControlDataUDP.target != nullptr,);
 
-    const EngineTimeInfo timeInfo(fEngine->getTimeInfo());
-
     char targetPath[std::strlen(fControlDataUDP.path)+18];
     std::strcpy(targetPath, fControlDataUDP.path);
     std::strcat(targetPath, "/runtime");
-    try_lo_send(fControlDataUDP.target, targetPath, "fiihiiif",
+    try_lo_send(fControlDataUDP.target, targetPath, "fiihiiifh",
                 static_cast<double>(fEngine->getDSPLoad()),
                 static_cast<int32_t>(fEngine->getTotalXruns()),
                 timeInfo.playing ? 1 : 0,
@@ -328,36 +374,68 @@ void CarlaEngineOsc::sendRuntimeInfo() const noexcept
                 static_cast<int32_t>(timeInfo.bbt.bar),
                 static_cast<int32_t>(timeInfo.bbt.beat),
                 static_cast<int32_t>(timeInfo.bbt.tick),
-                timeInfo.bbt.beatsPerMinute);
+                timeInfo.bbt.beatsPerMinute,
+                ++fSequenceUDP);
 }
 
 void CarlaEngineOsc::sendParameterValue(const uint pluginId, const uint32_t index, const float value) const noexcept
 {
+    if (isControlUsingSharedMemory())
+    {
+        const uint32_t head = fShmData->ringHead;
+        const uint32_t next = (head + 1) % kEngineOscShmRingSize;
+
+        // ring full, client is not keeping up; output parameters are resent on the next cycle anyway
+        if (next == *(volatile uint32_t*)&fShmData->ringTail)
+            return;
+
+        CarlaEngineOscShmParameter& param(fShmData->ring[head]);
+        param.pluginId = pluginId;
+        param.index    = index;
+        param.value    = value;
+
+        __sync_synchronize();
+        fShmData->ringHead = next;
+        return;
+    }
+
     CARLA_SAFE_ASSERT_RETURN(fControlDataUDP.path != nullptr && fControlDataUDP.path[0] != '\0',);
     CARLA_SAFE_ASSERT_RETURN(fControlDataUDP.target != nullptr,);
 
     char targetPath[std::strlen(fControlDataUDP.path)+21];
     std::strcpy(targetPath, fControlDataUDP.path);
     std::strcat(targetPath, "/param");
-    try_lo_send(fControlDataUDP.target, targetPath, "iif",
+    try_lo_send(fControlDataUDP.target, targetPath, "iifh",
                 static_cast<int32_t>(pluginId),
                 index,
-                static_cast<double>(value));
+                static_cast<double>(value),
+                ++fSequenceUDP);
 }
 
 void CarlaEngineOsc::sendPeaks(const uint pluginId, const float peaks[4]) const noexcept
 {
+    if (isControlUsingSharedMemory())
+    {
+        CARLA_SAFE_ASSERT_RETURN(pluginId < MAX_PATCHBAY_PLUGINS,);
+
+        beginSharedMemoryWrite();
+        std::memcpy(fShmData->peaks[pluginId], peaks, sizeof(float)*4);
+        endSharedMemoryWrite();
+        return;
+    }
+
     CARLA_SAFE_ASSERT_RETURN(fControlDataUDP.path != nullptr && fControlDataUDP.path[0] != '\0',);
     CARLA_SAFE_ASSERT_RETURN(fControlDataUDP.target != nullptr,);
 
     char targetPath[std::strlen(fControlDataUDP.path)+11];
     std::strcpy(targetPath, fControlDataUDP.path);
     std::strcat(targetPath, "/peaks");
-    try_lo_send(fControlDataUDP.target, targetPath, "iffff", static_cast<int32_t>(pluginId),
+    try_lo_send(fControlDataUDP.target, targetPath, "iffffh", static_cast<int32_t>(pluginId),
                 static_cast<double>(peaks[0]),
                 static_cast<double>(peaks[1]),
                 static_cast<double>(peaks[2]),
-                static_cast<double>(peaks[3]));
+                static_cast<double>(peaks[3]),
+                ++fSequenceUDP);
 }
 
 // -----------------------------------------------------------------------
@@ -61,7 +61,7 @@ void CarlaEngineThread::run() noexcept
     for (; (kIsAlwaysRunning || kEngine->isRunning()) && ! shouldThreadExit();)
     {
 #if defined(HAVE_LIBLO) && ! defined(BUILD_BRIDGE)
-        const bool oscRegistedForUDP = engineOsc.isControlRegisteredForUDP();
+        const bool oscRegistedForUDP = engineOsc.isControlRegisteredForUDP() || engineOsc.isControlUsingSharedMemory();
 #else
         const bool oscRegistedForUDP = false;
 #endif
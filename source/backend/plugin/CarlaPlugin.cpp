@@ -1711,9 +1711,17 @@ void CarlaPlugin::setCustomData(const char* const type, const char* const key, c
         if (std::strcmp(customData.key, key) == 0)
         {
             if (customData.value != nullptr)
+            {
+                if (std::strcmp(customData.value, value) == 0)
+                    return;
+
                 delete[] customData.value;
+            }
 
             customData.value = carla_strdup(value);
+#ifndef BUILD_BRIDGE_ALTERNATIVE_ARCH
+            pData->engine->pluginStateChanged(pData->id);
+#endif
             return;
         }
     }
@@ -1724,6 +1732,10 @@ void CarlaPlugin::setCustomData(const char* const type, const char* const key, c
     customData.key   = carla_strdup(key);
     customData.value = carla_strdup(value);
     pData->custom.append(customData);
+
+#ifndef BUILD_BRIDGE_ALTERNATIVE_ARCH
+    pData->engine->pluginStateChanged(pData->id);
+#endif
 }
 
 void CarlaPlugin::setChunkData(const void* const data, const std::size_t dataSize)
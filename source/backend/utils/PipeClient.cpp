@@ -19,6 +19,8 @@
 
 #include "CarlaPipeUtils.hpp"
 
+#include "water/misc/Time.h"
+
 namespace CB = CarlaBackend;
 
 // -------------------------------------------------------------------------------------------------------------------
@@ -30,7 +32,8 @@ public:
         : CarlaPipeClient(),
           fCallbackFunc(callbackFunc),
           fCallbackPtr(callbackPtr),
-          fLastReadLine(nullptr)
+          fLastReadLine(nullptr),
+          fReceivedCount(0)
     {
         CARLA_SAFE_ASSERT(fCallbackFunc != nullptr);
     }
@@ -51,8 +54,34 @@ public:
         return fLastReadLine;
     }
 
+    // reads messages one by one until none is left or the time limit is reached, returns how many were handled
+    uint idlePipeFor(const uint timeLimit) noexcept
+    {
+        const uint32_t timeoutEnd(water::Time::getMillisecondCounter() + timeLimit);
+        uint count = 0;
+
+        for (;;)
+        {
+            const uint received = fReceivedCount;
+
+            idlePipe(true);
+
+            if (fReceivedCount == received)
+                break;
+
+            ++count;
+
+            if (water::Time::getMillisecondCounter() >= timeoutEnd)
+                break;
+        }
+
+        return count;
+    }
+
     bool msgReceived(const char* const msg) noexcept override
     {
+        ++fReceivedCount;
+
         if (fCallbackFunc != nullptr)
         {
             try {
@@ -67,6 +96,7 @@ private:
     const CarlaPipeCallbackFunc fCallbackFunc;
     void* const fCallbackPtr;
     const char* fLastReadLine;
+    uint fReceivedCount;
 
     CARLA_DECLARE_NON_COPYABLE_WITH_LEAK_DETECTOR(ExposedCarlaPipeClient)
 };
@@ -93,6 +123,20 @@ void carla_pipe_client_idle(CarlaPipeClientHandle handle)
     ((ExposedCarlaPipeClient*)handle)->idlePipe();
 }
 
+uint carla_pipe_client_idle_for(CarlaPipeClientHandle handle, uint timeLimit)
+{
+    CARLA_SAFE_ASSERT_RETURN(handle != nullptr, 0);
+
+    return ((ExposedCarlaPipeClient*)handle)->idlePipeFor(timeLimit);
+}
+
+int carla_pipe_client_get_read_fd(CarlaPipeClientHandle handle)
+{
+    CARLA_SAFE_ASSERT_RETURN(handle != nullptr, -1);
+
+    return ((ExposedCarlaPipeClient*)handle)->getReadFileDescriptor();
+}
+
 bool carla_pipe_client_is_running(CarlaPipeClientHandle handle)
 {
     CARLA_SAFE_ASSERT_RETURN(handle != nullptr, false);
@@ -152,6 +196,17 @@ bool carla_pipe_client_flush_and_unlock(CarlaPipeClientHandle handle)
     return ret;
 }
 
+bool carla_pipe_client_send_msg(CarlaPipeClientHandle handle, const char* msg)
+{
+    CARLA_SAFE_ASSERT_RETURN(handle != nullptr, false);
+
+    ExposedCarlaPipeClient* const pipe = (ExposedCarlaPipeClient*)handle;
+    pipe->lockPipe();
+    const bool ret = pipe->writeMessage(msg) && pipe->flushMessages();
+    pipe->unlockPipe();
+    return ret;
+}
+
 void carla_pipe_client_destroy(CarlaPipeClientHandle handle)
 {
     CARLA_SAFE_ASSERT_RETURN(handle != nullptr,);
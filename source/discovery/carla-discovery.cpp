@@ -49,6 +49,7 @@
 #endif
 
 #include <iostream>
+#include <string>
 
 #ifndef BUILD_BRIDGE
 # include "water/files/File.h"
@@ -1513,18 +1514,8 @@ static void do_fluidsynth_check(const char* const filename, const bool doInit)
 
 // ------------------------------ main entry point ------------------------------
 
-int main(int argc, char* argv[])
+static bool do_check(const PluginType type, const char* const filename)
 {
-    if (argc != 3)
-    {
-        carla_stdout("usage: %s <type> </path/to/plugin>", argv[0]);
-        return 1;
-    }
-
-    const char* const stype    = argv[1];
-    const char* const filename = argv[2];
-    const PluginType  type     = getPluginTypeFromString(stype);
-
     CarlaString filenameCheck(filename);
     filenameCheck.toLower();
 
@@ -1544,7 +1535,7 @@ int main(int argc, char* argv[])
     if (type != PLUGIN_SF2 && filenameCheck.contains("fluidsynth", true))
     {
         DISCOVERY_OUT("info", "skipping fluidsynth based plugin");
-        return 0;
+        return true;
     }
 
 #ifdef CARLA_OS_MAC
@@ -1552,21 +1543,6 @@ int main(int argc, char* argv[])
         openLib = false;
 #endif
 
-    // ---------------------------------------------------------------------
-    // Initialize OS features
-
-#ifdef CARLA_OS_WIN
-    OleInitialize(nullptr);
-    CoInitializeEx(nullptr, COINIT_APARTMENTTHREADED);
-# ifndef __WINPTHREADS_VERSION
-    // (non-portable) initialization of statically linked pthread library
-    pthread_win32_process_attach_np();
-    pthread_win32_thread_attach_np();
-# endif
-#endif
-
-    // ---------------------------------------------------------------------
-
     if (openLib)
     {
         handle = lib_open(filename);
@@ -1574,7 +1550,7 @@ int main(int argc, char* argv[])
         if (handle == nullptr)
         {
             print_lib_error(filename);
-            return 1;
+            return false;
         }
     }
 
@@ -1592,7 +1568,7 @@ int main(int argc, char* argv[])
         if (! lib_close(handle))
         {
             print_lib_error(filename);
-            return 1;
+            return false;
         }
 
         handle = lib_open(filename);
@@ -1600,7 +1576,7 @@ int main(int argc, char* argv[])
         if (handle == nullptr)
         {
             print_lib_error(filename);
-            return 1;
+            return false;
         }
     }
 
@@ -1608,7 +1584,7 @@ int main(int argc, char* argv[])
     if (std::strcmp(filename, ":all") == 0)
     {
         do_cached_check(type);
-        return 0;
+        return true;
     }
 #endif
 
@@ -1663,6 +1639,64 @@ int main(int argc, char* argv[])
     if (openLib && handle != nullptr)
         lib_close(handle);
 
+    return true;
+}
+
+// Batch mode, filenames are read from stdin (one per line) and checked one after the other.
+// The output of each file ends with a "batch-end" line, so the caller knows when to send the next one.
+// If a plugin crashes the whole process goes with it, the caller is expected to start a new one.
+static void do_batch_check(const PluginType type)
+{
+    DISCOVERY_OUT("batch-ready", "-----------");
+
+    std::string filename;
+
+    while (std::getline(std::cin, filename))
+    {
+        if (filename.empty())
+            continue;
+
+        do_check(type, filename.c_str());
+
+        DISCOVERY_OUT("batch-end", filename);
+    }
+}
+
+int main(int argc, char* argv[])
+{
+    if (argc != 3)
+    {
+        carla_stdout("usage: %s <type> </path/to/plugin>", argv[0]);
+        carla_stdout("       %s <type> :batch (filenames are read from stdin)", argv[0]);
+        return 1;
+    }
+
+    const char* const stype    = argv[1];
+    const char* const filename = argv[2];
+    const PluginType  type     = getPluginTypeFromString(stype);
+
+    // ---------------------------------------------------------------------
+    // Initialize OS features
+
+#ifdef CARLA_OS_WIN
+    OleInitialize(nullptr);
+    CoInitializeEx(nullptr, COINIT_APARTMENTTHREADED);
+# ifndef __WINPTHREADS_VERSION
+    // (non-portable) initialization of statically linked pthread library
+    pthread_win32_process_attach_np();
+    pthread_win32_thread_attach_np();
+# endif
+#endif
+
+    // ---------------------------------------------------------------------
+
+    bool ok = true;
+
+    if (std::strcmp(filename, ":batch") == 0)
+        do_batch_check(type);
+    else
+        ok = do_check(type, filename);
+
     // ---------------------------------------------------------------------
 
 #ifdef CARLA_OS_WIN
@@ -1674,7 +1708,7 @@ int main(int argc, char* argv[])
     OleUninitialize();
 #endif
 
-    return 0;
+    return ok ? 0 : 1;
 }
 
 // --------------------------------------------------------------------------
@@ -20,10 +20,12 @@
 # Imports (Global)
 
 from abc import ABCMeta, abstractmethod
+from array import array
 from ctypes import *
+from mmap import mmap
 from platform import architecture
 from sip import voidptr
-from struct import pack
+from struct import pack, Struct
 from sys import platform, maxsize
 
 # ------------------------------------------------------------------------------------------------------------
@@ -2942,6 +2944,34 @@ class CarlaHostDLL(CarlaHostMeta):
 # Helper object for CarlaHostPlugin
 
 class PluginStoreInfo(object):
+    # parameter data and ranges are kept as one array per field, dicts are only created when requested
+    kParameterDataFields   = tuple(PyParameterData.keys())
+    kParameterRangesFields = tuple(PyParameterRanges.keys())
+
+    __slots__ = [
+        'pluginInfo',
+        'pluginRealName',
+        'internalValues',
+        'audioCountInfo',
+        'midiCountInfo',
+        'parameterCount',
+        'parameterCountInfo',
+        'parameterInfo',
+        'parameterData',
+        'parameterRanges',
+        'parameterValues',
+        'programCount',
+        'programCurrent',
+        'programNames',
+        'midiProgramCount',
+        'midiProgramCurrent',
+        'midiProgramData',
+        'customDataCount',
+        'customData',
+        'peaks',
+        'stateVersion',
+    ]
+
     def __init__(self):
         self.clear()
 
@@ -2951,12 +2981,8 @@ class PluginStoreInfo(object):
         self.internalValues = [0.0, 1.0, 1.0, -1.0, 1.0, 0.0, -1.0]
         self.audioCountInfo = PyCarlaPortCountInfo.copy()
         self.midiCountInfo  = PyCarlaPortCountInfo.copy()
-        self.parameterCount = 0
         self.parameterCountInfo = PyCarlaPortCountInfo.copy()
-        self.parameterInfo   = []
-        self.parameterData   = []
-        self.parameterRanges = []
-        self.parameterValues = []
+        self.resizeParameters(0)
         self.programCount   = 0
         self.programCurrent = -1
         self.programNames   = []
@@ -2965,7 +2991,110 @@ class PluginStoreInfo(object):
         self.midiProgramData    = []
         self.customDataCount = 0
         self.customData      = []
-        self.peaks = [0.0, 0.0, 0.0, 0.0]
+        self.peaks = array('d', (0.0, 0.0, 0.0, 0.0))
+        self.stateVersion = 0
+
+    # ----------------------------------------------------------------------------------------------------------------
+
+    def resizeParameters(self, count):
+        self.parameterCount = count
+
+        # placeholders share the same default info dict, it is replaced and never modified
+        self.parameterInfo   = [PyCarlaParameterInfo] * count
+        self.parameterData   = dict((key, array('i', (value,)) * count) for key, value in PyParameterData.items())
+        self.parameterRanges = dict((key, array('d', (value,)) * count) for key, value in PyParameterRanges.items())
+        self.parameterValues = array('d', (0.0,)) * count
+
+    def getParameterData(self, index):
+        return dict((key, self.parameterData[key][index]) for key in self.kParameterDataFields)
+
+    def getParameterRanges(self, index):
+        return dict((key, self.parameterRanges[key][index]) for key in self.kParameterRangesFields)
+
+    # partial dicts are allowed, only the given fields are changed
+    def setParameterData(self, index, data):
+        for key, value in data.items():
+            self.parameterData[key][index] = value
+
+    def setParameterRanges(self, index, ranges):
+        for key, value in ranges.items():
+            self.parameterRanges[key][index] = value
+
+    # bulk updates, one sequence per parameter field with a value for every parameter
+    def setParameterDataColumns(self, columns):
+        for key, values in columns.items():
+            self.parameterData[key] = array('i', values)
+
+    def setParameterRangesColumns(self, columns):
+        for key, values in columns.items():
+            self.parameterRanges[key] = array('d', values)
+
+    def setParameterValues(self, values):
+        self.parameterValues = array('d', values)
+
+# ------------------------------------------------------------------------------------------------------------
+# Plugin store list, maps consecutive plugin ids to their PluginStoreInfo
+
+class PluginStoreList(object):
+    # Plugins are kept as references in id order, so renumbering on remove or switch never touches their data.
+    # Removing only shifts the references after the removed plugin, switching swaps two of them.
+    __slots__ = ['fPlugins']
+
+    def __init__(self):
+        self.fPlugins = []
+
+    def __len__(self):
+        return len(self.fPlugins)
+
+    def __contains__(self, pluginId):
+        return 0 <= pluginId < len(self.fPlugins)
+
+    def __getitem__(self, pluginId):
+        if pluginId < 0:
+            raise IndexError(pluginId)
+        return self.fPlugins[pluginId]
+
+    def __setitem__(self, pluginId, plugin):
+        self.allocate(pluginId)
+        self.fPlugins[pluginId] = plugin
+
+    def get(self, pluginId, default=None):
+        if 0 <= pluginId < len(self.fPlugins):
+            return self.fPlugins[pluginId]
+        return default
+
+    def values(self):
+        return list(self.fPlugins)
+
+    def clear(self):
+        self.fPlugins = []
+
+    # makes sure pluginId is valid, new plugins get empty info
+    def allocate(self, pluginId):
+        missing = pluginId + 1 - len(self.fPlugins)
+
+        if missing > 0:
+            self.fPlugins.extend(PluginStoreInfo() for x in range(missing))
+
+    def remove(self, pluginId):
+        if 0 <= pluginId < len(self.fPlugins):
+            del self.fPlugins[pluginId]
+            return True
+        return False
+
+    def switch(self, pluginIdA, pluginIdB):
+        plugins = self.fPlugins
+        plugins[pluginIdA], plugins[pluginIdB] = plugins[pluginIdB], plugins[pluginIdA]
+
+# ------------------------------------------------------------------------------------------------------------
+# Shared table with peaks and output parameter values, see CarlaEngineNativeUiShmData
+
+PLUGIN_UI_SHM_MAGIC   = 0x43524C50
+PLUGIN_UI_SHM_VERSION = 1
+PLUGIN_UI_SHM_HEADER  = Struct("=IIIIII")
+
+# retries when the engine is writing while we read
+PLUGIN_UI_SHM_READ_ATTEMPTS = 8
 
 # ------------------------------------------------------------------------------------------------------------
 # Carla Host object for plugins (using pipes)
@@ -2984,7 +3113,7 @@ class CarlaHostPlugin(CarlaHostMeta):
         self.fLastError       = ""
 
         # plugin info
-        self.fPluginsInfo = {}
+        self.fPluginsInfo = PluginStoreList()
         self.fFallbackPluginInfo = PluginStoreInfo()
 
         # runtime engine info
@@ -3009,6 +3138,13 @@ class CarlaHostPlugin(CarlaHostMeta):
         self.fOscTCP = ""
         self.fOscUDP = ""
 
+        # shared table, when the engine provides one
+        self.fShmFile  = None
+        self.fShmData  = None
+        self.fShmViews = None
+        self.fShmMaxParameters = 0
+        self.fShmGeneration = -1
+
     # --------------------------------------------------------------------------------------------------------
 
     # Needs to be reimplemented
@@ -3158,10 +3294,10 @@ class CarlaHostPlugin(CarlaHostMeta):
         return PyCarlaScalePointInfo
 
     def get_parameter_data(self, pluginId, parameterId):
-        return self.fPluginsInfo.get(pluginId, self.fFallbackPluginInfo).parameterData[parameterId]
+        return self.fPluginsInfo.get(pluginId, self.fFallbackPluginInfo).getParameterData(parameterId)
 
     def get_parameter_ranges(self, pluginId, parameterId):
-        return self.fPluginsInfo.get(pluginId, self.fFallbackPluginInfo).parameterRanges[parameterId]
+        return self.fPluginsInfo.get(pluginId, self.fFallbackPluginInfo).getParameterRanges(parameterId)
 
     def get_midi_program_data(self, pluginId, midiProgramId):
         return self.fPluginsInfo.get(pluginId, self.fFallbackPluginInfo).midiProgramData[midiProgramId]
@@ -3212,7 +3348,7 @@ class CarlaHostPlugin(CarlaHostMeta):
         return self.fPluginsInfo.get(pluginId, self.fFallbackPluginInfo).midiProgramCurrent
 
     def get_default_parameter_value(self, pluginId, parameterId):
-        return self.fPluginsInfo[pluginId].parameterRanges[parameterId]['def']
+        return self.fPluginsInfo[pluginId].parameterRanges['def'][parameterId]
 
     def get_current_parameter_value(self, pluginId, parameterId):
         return self.fPluginsInfo[pluginId].parameterValues[parameterId]
@@ -3271,11 +3407,11 @@ class CarlaHostPlugin(CarlaHostMeta):
 
     def set_parameter_midi_channel(self, pluginId, parameterId, channel):
         self.sendMsg(["set_parameter_midi_channel", pluginId, parameterId, channel])
-        self.fPluginsInfo[pluginId].parameterData[parameterId]['midiCC'] = channel
+        self.fPluginsInfo[pluginId].parameterData['midiChannel'][parameterId] = channel
 
     def set_parameter_midi_cc(self, pluginId, parameterId, cc):
         self.sendMsg(["set_parameter_midi_cc", pluginId, parameterId, cc])
-        self.fPluginsInfo[pluginId].parameterData[parameterId]['midiCC'] = cc
+        self.fPluginsInfo[pluginId].parameterData['midiCC'][parameterId] = cc
 
     def set_parameter_touch(self, pluginId, parameterId, touch):
         self.sendMsg(["set_parameter_touch", pluginId, parameterId, touch])
@@ -3354,11 +3490,11 @@ class CarlaHostPlugin(CarlaHostMeta):
         self.fPluginsInfo[pluginId] = PluginStoreInfo()
 
     def _allocateAsNeeded(self, pluginId):
-        if pluginId < len(self.fPluginsInfo):
-            return
+        self.fPluginsInfo.allocate(pluginId)
 
-        for id in range(len(self.fPluginsInfo), pluginId+1):
-            self.fPluginsInfo[id] = PluginStoreInfo()
+    def _remove(self, pluginId):
+        if not self.fPluginsInfo.remove(pluginId):
+            print("_remove failed for", pluginId)
 
     def _set_pluginInfo(self, pluginId, info):
         plugin = self.fPluginsInfo.get(pluginId, None)
@@ -3418,21 +3554,8 @@ class CarlaHostPlugin(CarlaHostMeta):
             print("_set_parameterCountInfo failed for", pluginId)
             return
 
-        plugin.parameterCount = count
         plugin.parameterCountInfo = info
-
-        # clear
-        plugin.parameterInfo  = []
-        plugin.parameterData  = []
-        plugin.parameterRanges = []
-        plugin.parameterValues = []
-
-        # add placeholders
-        for x in range(count):
-            plugin.parameterInfo.append(PyCarlaParameterInfo.copy())
-            plugin.parameterData.append(PyParameterData.copy())
-            plugin.parameterRanges.append(PyParameterRanges.copy())
-            plugin.parameterValues.append(0.0)
+        plugin.resizeParameters(count)
 
     def _set_programCount(self, pluginId, count):
         plugin = self.fPluginsInfo.get(pluginId, None)
@@ -3477,7 +3600,7 @@ class CarlaHostPlugin(CarlaHostMeta):
             print("_set_parameterData failed for", pluginId)
             return
         if paramIndex < plugin.parameterCount:
-            plugin.parameterData[paramIndex] = data
+            plugin.setParameterData(paramIndex, data)
         else:
             print("_set_parameterData failed for", pluginId, "and index", paramIndex)
 
@@ -3487,7 +3610,7 @@ class CarlaHostPlugin(CarlaHostMeta):
             print("_set_parameterRanges failed for", pluginId)
             return
         if paramIndex < plugin.parameterCount:
-            plugin.parameterRanges[paramIndex] = ranges
+            plugin.setParameterRanges(paramIndex, ranges)
         else:
             print("_set_parameterRanges failed for", pluginId, "and index", paramIndex)
 
@@ -3497,7 +3620,7 @@ class CarlaHostPlugin(CarlaHostMeta):
             print("_set_parameterRangesUpdate failed for", pluginId)
             return
         if paramIndex < plugin.parameterCount:
-            plugin.parameterRanges[paramIndex].update(ranges)
+            plugin.setParameterRanges(paramIndex, ranges)
         else:
             print("_set_parameterRangesUpdate failed for", pluginId, "and index", paramIndex)
 
@@ -3517,7 +3640,7 @@ class CarlaHostPlugin(CarlaHostMeta):
             print("_set_parameterDefault failed for", pluginId)
             return
         if paramIndex < plugin.parameterCount:
-            plugin.parameterRanges[paramIndex]['def'] = value
+            plugin.parameterRanges['def'][paramIndex] = value
         else:
             print("_set_parameterDefault failed for", pluginId, "and index", paramIndex)
 
@@ -3527,7 +3650,7 @@ class CarlaHostPlugin(CarlaHostMeta):
             print("_set_parameterMidiChannel failed for", pluginId)
             return
         if paramIndex < plugin.parameterCount:
-            plugin.parameterData[paramIndex]['midiChannel'] = channel
+            plugin.parameterData['midiChannel'][paramIndex] = channel
         else:
             print("_set_parameterMidiChannel failed for", pluginId, "and index", paramIndex)
 
@@ -3537,10 +3660,40 @@ class CarlaHostPlugin(CarlaHostMeta):
             print("_set_parameterMidiCC failed for", pluginId)
             return
         if paramIndex < plugin.parameterCount:
-            plugin.parameterData[paramIndex]['midiCC'] = cc
+            plugin.parameterData['midiCC'][paramIndex] = cc
         else:
             print("_set_parameterMidiCC failed for", pluginId, "and index", paramIndex)
 
+    # sets all parameters at once, each argument is optional
+    # data and ranges are dicts with one sequence per field, like PluginStoreInfo keeps them
+    def _set_parameterBulk(self, pluginId, infos, dataColumns, rangesColumns, values):
+        plugin = self.fPluginsInfo.get(pluginId, None)
+        if plugin is None:
+            print("_set_parameterBulk failed for", pluginId)
+            return
+
+        count = plugin.parameterCount
+
+        if infos is not None and len(infos) != count:
+            print("_set_parameterBulk failed for", pluginId, "with", len(infos), "infos")
+            return
+        if values is not None and len(values) != count:
+            print("_set_parameterBulk failed for", pluginId, "with", len(values), "values")
+            return
+        for columns in (dataColumns, rangesColumns):
+            if columns is not None and any(len(column) != count for column in columns.values()):
+                print("_set_parameterBulk failed for", pluginId, "with mismatched columns")
+                return
+
+        if infos is not None:
+            plugin.parameterInfo = list(infos)
+        if dataColumns is not None:
+            plugin.setParameterDataColumns(dataColumns)
+        if rangesColumns is not None:
+            plugin.setParameterRangesColumns(rangesColumns)
+        if values is not None:
+            plugin.setParameterValues(values)
+
     def _set_currentProgram(self, pluginId, pIndex):
         plugin = self.fPluginsInfo.get(pluginId, None)
         if plugin is None:
@@ -3588,12 +3741,128 @@ class CarlaHostPlugin(CarlaHostMeta):
     def _set_peaks(self, pluginId, in1, in2, out1, out2):
         pluginInfo = self.fPluginsInfo.get(pluginId, None)
         if pluginInfo is not None:
-            pluginInfo.peaks = [in1, in2, out1, out2]
+            pluginInfo.peaks[0] = in1
+            pluginInfo.peaks[1] = in2
+            pluginInfo.peaks[2] = out1
+            pluginInfo.peaks[3] = out2
+
+    # --------------------------------------------------------------------------------------------------------
+
+    def _attachSharedTable(self, name):
+        self._detachSharedTable()
+
+        try:
+            shmFile = open("/dev/shm/" + name.lstrip("/"), "r+b")
+        except OSError:
+            print("_attachSharedTable failed for", name)
+            return False
+
+        try:
+            shmData = mmap(shmFile.fileno(), 0)
+        except (OSError, ValueError):
+            print("_attachSharedTable failed to map", name)
+            shmFile.close()
+            return False
+
+        magic, version, maxPlugins, maxParameters, _, _ = PLUGIN_UI_SHM_HEADER.unpack_from(shmData, 0)
+
+        if magic != PLUGIN_UI_SHM_MAGIC or version != PLUGIN_UI_SHM_VERSION:
+            print("_attachSharedTable failed for", name, "with unknown version", version)
+            shmData.close()
+            shmFile.close()
+            return False
+
+        # typed views over each table, no copies
+        view = memoryview(shmData)
+        peaksOffset   = PLUGIN_UI_SHM_HEADER.size
+        outputsOffset = peaksOffset + maxPlugins * 4 * 4
+        indexesOffset = outputsOffset + maxPlugins * 4
+        valuesOffset  = indexesOffset + maxPlugins * maxParameters * 4
+        endOffset     = valuesOffset + maxPlugins * maxParameters * 4
+
+        self.fShmFile  = shmFile
+        self.fShmData  = shmData
+        self.fShmViews = (
+            view,
+            view[:peaksOffset].cast('I'),
+            view[peaksOffset:outputsOffset].cast('f'),
+            view[outputsOffset:indexesOffset].cast('I'),
+            view[indexesOffset:valuesOffset].cast('I'),
+            view[valuesOffset:endOffset].cast('f'),
+        )
+        self.fShmMaxParameters = maxParameters
+        self.fShmGeneration = -1
+        return True
+
+    def _detachSharedTable(self):
+        # views must be released before the mapping can be closed
+        if self.fShmViews is not None:
+            for view in reversed(self.fShmViews):
+                view.release()
+            self.fShmViews = None
+
+        if self.fShmData is not None:
+            self.fShmData.close()
+            self.fShmData = None
+
+        if self.fShmFile is not None:
+            self.fShmFile.close()
+            self.fShmFile = None
+
+    def _isUsingSharedTable(self):
+        return self.fShmData is not None
+
+    def _idleSharedTable(self):
+        if self.fShmViews is None:
+            return
+
+        _, header, peaks, outputs, indexes, values = self.fShmViews
+        maxParameters = self.fShmMaxParameters
+
+        # seqlock read, a generation we already have means nothing changed
+        for _ in range(PLUGIN_UI_SHM_READ_ATTEMPTS):
+            generation = header[4]
+
+            if generation == self.fShmGeneration:
+                return
+            if generation & 1:
+                continue
+
+            pluginCount = min(header[5], len(self.fPluginsInfo))
+            pluginPeaks = peaks[:pluginCount*4].tolist()
+            pluginOutputs = []
+
+            for pluginId in range(pluginCount):
+                start = pluginId * maxParameters
+                end   = start + min(outputs[pluginId], maxParameters)
+                pluginOutputs.append((indexes[start:end].tolist(), values[start:end].tolist()))
+
+            if header[4] == generation:
+                break
+
+        else:
+            return
+
+        self.fShmGeneration = generation
+
+        for pluginId in range(pluginCount):
+            self._set_peaks(pluginId, *pluginPeaks[pluginId*4:pluginId*4+4])
+
+            plugin = self.fPluginsInfo[pluginId]
+            parameterValues = plugin.parameterValues
+            parameterCount  = plugin.parameterCount
+
+            for index, value in zip(*pluginOutputs[pluginId]):
+                if index < parameterCount:
+                    parameterValues[index] = value
+
+    # --------------------------------------------------------------------------------------------------------
 
     def _switchPlugins(self, pluginIdA, pluginIdB):
-        tmp = self.fPluginsInfo[pluginIdA]
-        self.fPluginsInfo[pluginIdA] = self.fPluginsInfo[pluginIdB]
-        self.fPluginsInfo[pluginIdB] = tmp
+        if pluginIdA not in self.fPluginsInfo or pluginIdB not in self.fPluginsInfo:
+            print("_switchPlugins failed for", pluginIdA, "and", pluginIdB)
+            return
+        self.fPluginsInfo.switch(pluginIdA, pluginIdB)
 
     def _setViaCallback(self, action, pluginId, value1, value2, value3, valuef, valueStr):
         if action == ENGINE_CALLBACK_ENGINE_STARTED:
@@ -3601,12 +3870,15 @@ class CarlaHostPlugin(CarlaHostMeta):
             self.fBufferSize = value3
             self.fSampleRate = valuef
 
-        elif ENGINE_CALLBACK_BUFFER_SIZE_CHANGED:
+        elif action == ENGINE_CALLBACK_BUFFER_SIZE_CHANGED:
             self.fBufferSize = value1
 
-        elif ENGINE_CALLBACK_SAMPLE_RATE_CHANGED:
+        elif action == ENGINE_CALLBACK_SAMPLE_RATE_CHANGED:
             self.fSampleRate = valuef
 
+        elif action == ENGINE_CALLBACK_PLUGIN_REMOVED:
+            self._remove(pluginId)
+
         elif action == ENGINE_CALLBACK_PLUGIN_RENAMED:
             self._set_pluginName(pluginId, valueStr)
 
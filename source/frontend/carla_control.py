@@ -19,7 +19,8 @@
 # ----------------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
-from PyQt5.QtCore import QEventLoop
+from PyQt5.QtCore import QEventLoop, QSocketNotifier
+from PyQt5.QtWidgets import QAbstractItemView, QHeaderView, QTableWidget, QTableWidgetItem, QVBoxLayout
 
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Custom)
@@ -42,12 +43,46 @@ from liblo import (
   UDP as LO_UDP,
 )
 
+from array import array
+from mmap import mmap
 from random import random
+from socket import gethostname
+from struct import Struct
+from time import monotonic
 
 # ------------------------------------------------------------------------------------------------------------
 
 DEBUG = False
 
+# Maximum number of OSC messages handled per socket wakeup.
+# Pending messages are left for the next event loop iteration, keeping the UI responsive under message floods.
+OSC_MAX_MESSAGES_PER_WAKEUP = 256
+
+# Number of fast-timer ticks without any message from the engine before the timers slow down,
+# and how much slower they get. TCP data is polled by the timers, see createSocketNotifiers().
+OSC_IDLE_TICKS_BEFORE_SLOWDOWN = 25
+OSC_IDLE_TIMER_SLOWDOWN = 4
+
+# Time to wait for an answer to a /register with known plugin states, in s.
+# Engines without plugin state versions drop that form, the plain one is sent after this (without blocking).
+OSC_REGISTER_TIMEOUT = 2.0
+
+# Refresh interval of the fleet overview, in ms. This is the only timer used in fleet mode.
+FLEET_REFRESH_INTERVAL = 100
+
+# Layout of the shared memory used by local engines, must match CarlaEngineOscShmData.
+# It replaces UDP only (runtime info, peaks and output parameter values), TCP messages are still used.
+OSC_SHM_MAGIC          = 0x43524C43
+OSC_SHM_VERSION        = 1
+OSC_SHM_HEADER         = Struct("=IIIII")
+OSC_SHM_RUNTIME        = Struct("=IIIIIIfIQiiiid")
+OSC_SHM_RING_POSITIONS = Struct("=II")
+OSC_SHM_RING_TAIL      = Struct("=I")
+OSC_SHM_RING_PARAMETER = Struct("=IIf")
+
+# Number of attempts at reading a consistent snapshot while the engine is writing
+OSC_SHM_READ_ATTEMPTS = 8
+
 # ----------------------------------------------------------------------------------------------------------------------
 # OSC connect Dialog
 
@@ -168,6 +203,20 @@ class CarlaHostOSC(CarlaHostQtPlugin):
         self.lo_target_tcp_name = ""
         self.lo_target_udp_name = ""
 
+        # plugin data kept from a previous connection, indexed by engine state version
+        self.fStateCache = {}
+
+        # target, server and deadline of a /register with known states that was not answered yet
+        self.fRegisterFallback = None
+
+        # shared memory used instead of UDP when the engine runs on this machine
+        self.fShmFile = None
+        self.fShmData = None
+        self.fShmMaxPlugins = 0
+        self.fShmRingSize = 0
+        self.fShmRingOffset = 0
+        self.fShmLastSequence = 0
+
         self.resetPendingMessages()
 
     # -------------------------------------------------------------------
@@ -198,6 +247,9 @@ class CarlaHostOSC(CarlaHostQtPlugin):
 
         if method in ("clear_engine_xruns",
                       "cancel_engine_action",
+                      "enable_shm",
+                      "shm_attached",
+                      "disable_shm",
                       #"load_file",
                       #"load_project",
                       #"save_project",
@@ -276,6 +328,8 @@ class CarlaHostOSC(CarlaHostQtPlugin):
         lo_send(self.lo_target_tcp, path, messageId, *args)
 
         while messageId in self.pendingMessages:
+            if self.lo_server_tcp is not None:
+                self.lo_server_tcp.idle()
             QApplication.processEvents(QEventLoop.AllEvents, 100)
 
         error = self.responses.pop(messageId)
@@ -291,6 +345,185 @@ class CarlaHostOSC(CarlaHostQtPlugin):
 
     # -------------------------------------------------------------------
 
+    def cacheAllPluginsInfo(self):
+        self.fStateCache = {}
+
+        for pluginInfo in self.fPluginsInfo.values():
+            if pluginInfo.stateVersion != 0:
+                self.fStateCache[pluginInfo.stateVersion] = pluginInfo
+
+    def getKnownStateVersions(self):
+        return ",".join("%i" % stateVersion for stateVersion in self.fStateCache)
+
+    def registerTCP(self, lo_target_tcp, lo_server_tcp):
+        knownVersions = self.getKnownStateVersions()
+
+        self.fRegisterFallback = None
+
+        # the engine only resends plugins whose state is not in our cache
+        if knownVersions:
+            lo_send(lo_target_tcp, "/register", lo_server_tcp.getFullURL(), knownVersions)
+            self.fRegisterFallback = (lo_target_tcp, lo_server_tcp, monotonic() + OSC_REGISTER_TIMEOUT)
+            return
+
+        lo_send(lo_target_tcp, "/register", lo_server_tcp.getFullURL())
+
+    # A registered engine always answers first with the engine-started callback,
+    # any message from it means the /register with known states was understood.
+    def registerAnswered(self):
+        self.fRegisterFallback = None
+
+    # called from the timers, registers again the plain way if the engine did not answer in time
+    def idleRegister(self):
+        if self.fRegisterFallback is None:
+            return
+
+        lo_target_tcp, lo_server_tcp, deadline = self.fRegisterFallback
+
+        # disconnected or connected again meanwhile
+        if lo_server_tcp is not self.lo_server_tcp:
+            self.fRegisterFallback = None
+            return
+
+        if monotonic() < deadline:
+            return
+
+        print("Engine did not answer /register with known plugin states, registering again without them")
+        self.fRegisterFallback = None
+        self.fStateCache = {}
+        lo_send(lo_target_tcp, "/register", lo_server_tcp.getFullURL())
+
+    # -------------------------------------------------------------------
+
+    def isTargetLocal(self):
+        if self.lo_target_tcp is None:
+            return False
+
+        hostname = self.lo_target_tcp.hostname
+
+        return hostname in ("localhost", "::1", gethostname()) or hostname.startswith("127.")
+
+    def attachSharedMemory(self, name):
+        self.detachSharedMemory()
+
+        try:
+            shmFile = open("/dev/shm/" + name.lstrip("/"), "r+b")
+        except OSError:
+            print("attachSharedMemory failed for", name)
+            return False
+
+        try:
+            shmData = mmap(shmFile.fileno(), 0)
+        except (OSError, ValueError):
+            print("attachSharedMemory failed to map", name)
+            shmFile.close()
+            return False
+
+        magic, version, maxPlugins, ringSize, _ = OSC_SHM_HEADER.unpack_from(shmData, 0)
+
+        if magic != OSC_SHM_MAGIC or version != OSC_SHM_VERSION:
+            print("attachSharedMemory failed for", name, "with unknown version", version)
+            shmData.close()
+            shmFile.close()
+            return False
+
+        self.fShmFile = shmFile
+        self.fShmData = shmData
+        self.fShmMaxPlugins = maxPlugins
+        self.fShmRingSize = ringSize
+        self.fShmRingOffset = OSC_SHM_RUNTIME.size + maxPlugins * 4 * 4
+        self.fShmLastSequence = 0
+        return True
+
+    def detachSharedMemory(self):
+        if self.fShmData is not None:
+            self.fShmData.close()
+            self.fShmData = None
+
+        if self.fShmFile is not None:
+            self.fShmFile.close()
+            self.fShmFile = None
+
+    def isUsingSharedMemory(self):
+        return self.fShmData is not None
+
+    # returns True if the engine wrote anything new
+    def idleSharedMemory(self):
+        shmData = self.fShmData
+
+        if shmData is None:
+            return False
+
+        # runtime info and peaks, protected by a seqlock
+        for _ in range(OSC_SHM_READ_ATTEMPTS):
+            runtime = OSC_SHM_RUNTIME.unpack_from(shmData, 0)
+            sequence = runtime[4]
+
+            if sequence & 1:
+                continue
+
+            pluginCount = min(runtime[5], self.fShmMaxPlugins)
+            peaks = Struct("=%if" % (pluginCount * 4)).unpack_from(shmData, OSC_SHM_RUNTIME.size)
+
+            if OSC_SHM_HEADER.unpack_from(shmData, 0)[4] == sequence:
+                break
+
+        else:
+            peaks = None
+
+        changed = peaks is not None and sequence != self.fShmLastSequence
+
+        if changed:
+            self.fShmLastSequence = sequence
+            _, _, _, _, _, _, load, xruns, frame, playing, bar, beat, tick, bpm = runtime
+            self._set_runtime_info(load, xruns)
+            self._set_transport(bool(playing), frame, bar, beat, tick, bpm)
+
+            for pluginId in range(pluginCount):
+                self._set_peaks(pluginId, *peaks[pluginId*4:pluginId*4+4])
+
+        # output parameter values, a ring where we only ever move the tail
+        head, tail = OSC_SHM_RING_POSITIONS.unpack_from(shmData, self.fShmRingOffset)
+
+        if head == tail:
+            return changed
+
+        ringOffset = self.fShmRingOffset + OSC_SHM_RING_POSITIONS.size
+        values = {}
+
+        while tail != head:
+            pluginId, paramId, paramValue = OSC_SHM_RING_PARAMETER.unpack_from(shmData,
+                                                                               ringOffset + tail * OSC_SHM_RING_PARAMETER.size)
+            values[(pluginId, paramId)] = paramValue
+            tail = (tail + 1) % self.fShmRingSize
+
+        # the engine owns the head, only write back our tail
+        OSC_SHM_RING_TAIL.pack_into(shmData, self.fShmRingOffset + OSC_SHM_RING_TAIL.size, tail)
+
+        for (pluginId, paramId), paramValue in values.items():
+            self._set_parameterValue(pluginId, paramId, paramValue)
+
+        return True
+
+    # -------------------------------------------------------------------
+
+    def _set_stateVersion(self, pluginId, stateVersion, unchanged):
+        if unchanged:
+            pluginInfo = self.fStateCache.pop(stateVersion, None)
+            if pluginInfo is None:
+                print("_set_stateVersion failed for", pluginId, "with unknown version", stateVersion)
+                return
+            self.fPluginsInfo[pluginId] = pluginInfo
+        else:
+            pluginInfo = self.fPluginsInfo.get(pluginId, None)
+            if pluginInfo is None:
+                print("_set_stateVersion failed for", pluginId)
+                return
+
+        pluginInfo.stateVersion = stateVersion
+
+    # -------------------------------------------------------------------
+
     def engine_init(self, driverName, clientName):
         return self.lo_target_tcp is not None
 
@@ -319,11 +552,17 @@ class CarlaControlServerTCP(Server):
         self.host = host
         self.rhost = rhost
 
-    def idle(self):
+    def idle(self, maxMessages = OSC_MAX_MESSAGES_PER_WAKEUP):
         self.fReceivedMsgs = False
+        count = 0
 
-        while self.recv(0) and self.fReceivedMsgs:
-            pass
+        while count < maxMessages and self.recv(0):
+            count += 1
+
+        if count != 0:
+            self.host.registerAnswered()
+
+        return count
 
     def getFullURL(self):
         if self.rhost:
@@ -335,6 +574,14 @@ class CarlaControlServerTCP(Server):
         if DEBUG: print(path, args)
         self.fReceivedMsgs = True
         action, pluginId, value1, value2, value3, valuef, valueStr = args
+
+        # UDP sequence numbers and pending values are kept per plugin id, which change on removal
+        if self.host.lo_server_udp is not None:
+            if action == ENGINE_CALLBACK_PLUGIN_REMOVED:
+                self.host.lo_server_udp.removePlugin(pluginId)
+            elif action == ENGINE_CALLBACK_RELOAD_ALL:
+                self.host.lo_server_udp.removeAllPlugins()
+
         self.host._setViaCallback(action, pluginId, value1, value2, value3, valuef, valueStr)
         engineCallback(self.host, action, pluginId, value1, value2, value3, valuef, valueStr)
 
@@ -469,6 +716,20 @@ class CarlaControlServerTCP(Server):
         self.host._set_internalValue(pluginId, PARAMETER_PANNING, pan)
         self.host._set_internalValue(pluginId, PARAMETER_CTRL_CHANNEL, ctrlChan)
 
+    @make_method('/ctrl/version', 'ihi')
+    def carla_version(self, path, args):
+        if DEBUG: print(path, args)
+        self.fReceivedMsgs = True
+        pluginId, stateVersion, unchanged = args
+        self.host._set_stateVersion(pluginId, stateVersion, bool(unchanged))
+
+    @make_method('/ctrl/shm', 's')
+    def carla_shm(self, path, args):
+        if DEBUG: print(path, args)
+        self.fReceivedMsgs = True
+        shmName, = args
+        self.host.attachSharedMemory(shmName)
+
     @make_method('/ctrl/resp', 'is')
     def carla_resp(self, path, args):
         if DEBUG: print(path, args)
@@ -510,35 +771,117 @@ class CarlaControlServerUDP(Server):
         self.host = host
         self.rhost = rhost
 
-    def idle(self):
+        # latest values received since the last flush, keyed by plugin and parameter
+        self.fPendingRuntime = None
+        self.fPendingParams  = {}
+        self.fPendingPeaks   = {}
+
+        # last applied sequence numbers, used to discard stale and out-of-order datagrams
+        self.fLastSeqRuntime = 0
+        self.fLastSeqParams  = {}
+        self.fLastSeqPeaks   = {}
+
+    def idle(self, maxMessages = OSC_MAX_MESSAGES_PER_WAKEUP):
         self.fReceivedMsgs = False
+        count = 0
 
-        while self.recv(0) and self.fReceivedMsgs:
-            pass
+        while count < maxMessages and self.recv(0):
+            count += 1
+
+        if count != 0:
+            self.flushPending()
+
+        return count
+
+    def flushPending(self):
+        if self.fPendingRuntime is not None:
+            load, xruns, playing, frame, bar, beat, tick, bpm = self.fPendingRuntime
+            self.fPendingRuntime = None
+            self.host._set_runtime_info(load, xruns)
+            self.host._set_transport(bool(playing), frame, bar, beat, tick, bpm)
+
+        if len(self.fPendingParams) != 0:
+            for (pluginId, paramId), paramValue in self.fPendingParams.items():
+                self.host._set_parameterValue(pluginId, paramId, paramValue)
+            self.fPendingParams = {}
+
+        if len(self.fPendingPeaks) != 0:
+            for pluginId, (in1, in2, out1, out2) in self.fPendingPeaks.items():
+                self.host._set_peaks(pluginId, in1, in2, out1, out2)
+            self.fPendingPeaks = {}
+
+    # forget a removed plugin, the ones after it move down one id like in the engine
+    def removePlugin(self, pluginId):
+        def shiftParams(values):
+            return dict(((pId if pId < pluginId else pId-1, paramId), value)
+                        for (pId, paramId), value in values.items() if pId != pluginId)
+
+        def shiftPeaks(values):
+            return dict((pId if pId < pluginId else pId-1, value)
+                        for pId, value in values.items() if pId != pluginId)
+
+        self.fPendingParams = shiftParams(self.fPendingParams)
+        self.fLastSeqParams = shiftParams(self.fLastSeqParams)
+        self.fPendingPeaks  = shiftPeaks(self.fPendingPeaks)
+        self.fLastSeqPeaks  = shiftPeaks(self.fLastSeqPeaks)
+
+    def removeAllPlugins(self):
+        self.fPendingParams = {}
+        self.fLastSeqParams = {}
+        self.fPendingPeaks  = {}
+        self.fLastSeqPeaks  = {}
 
     def getFullURL(self):
         if self.rhost:
             return "osc.udp://%s:%i/ctrl" % (self.rhost, self.get_port())
         return "%sctrl" % self.get_url()
 
-    @make_method('/ctrl/runtime', 'fiihiiif')
+    @make_method('/ctrl/runtime', 'fiihiiifh')
     def carla_runtime(self, path, args):
         self.fReceivedMsgs = True
-        load, xruns, playing, frame, bar, beat, tick, bpm = args
-        self.host._set_runtime_info(load, xruns)
-        self.host._set_transport(bool(playing), frame, bar, beat, tick, bpm)
+        seq = args.pop()
+        if seq <= self.fLastSeqRuntime:
+            return
+        self.fLastSeqRuntime = seq
+        self.fPendingRuntime = args
 
-    @make_method('/ctrl/param', 'iif')
+    @make_method('/ctrl/param', 'iifh')
     def carla_param_fixme(self, path, args):
+        self.fReceivedMsgs = True
+        pluginId, paramId, paramValue, seq = args
+        key = (pluginId, paramId)
+        if seq <= self.fLastSeqParams.get(key, 0):
+            return
+        self.fLastSeqParams[key] = seq
+        self.fPendingParams[key] = paramValue
+
+    @make_method('/ctrl/peaks', 'iffffh')
+    def carla_peaks(self, path, args):
+        self.fReceivedMsgs = True
+        pluginId, in1, in2, out1, out2, seq = args
+        if seq <= self.fLastSeqPeaks.get(pluginId, 0):
+            return
+        self.fLastSeqPeaks[pluginId] = seq
+        self.fPendingPeaks[pluginId] = (in1, in2, out1, out2)
+
+    # older engines do not send sequence numbers, arrival order is all we have
+
+    @make_method('/ctrl/runtime', 'fiihiiif')
+    def carla_runtime_noseq(self, path, args):
+        self.fReceivedMsgs = True
+        self.fPendingRuntime = args
+
+    @make_method('/ctrl/param', 'iif')
+    def carla_param_noseq(self, path, args):
         self.fReceivedMsgs = True
         pluginId, paramId, paramValue = args
-        self.host._set_parameterValue(pluginId, paramId, paramValue)
+        self.fPendingParams[(pluginId, paramId)] = paramValue
 
     @make_method('/ctrl/peaks', 'iffff')
-    def carla_peaks(self, path, args):
+    def carla_peaks_noseq(self, path, args):
         self.fReceivedMsgs = True
         pluginId, in1, in2, out1, out2 = args
-        self.host._set_peaks(pluginId, in1, in2, out1, out2)
+        self.fPendingPeaks[pluginId] = (in1, in2, out1, out2)
 
     @make_method(None, None)
     def fallback(self, path, args):
@@ -558,6 +901,16 @@ class HostWindowOSC(HostWindow):
             host = CarlaHostOSC()
             self.host = host
 
+        # ----------------------------------------------------------------------------------------------------
+        # Internal stuff
+
+        self.fOscNotifierTCP = None
+        self.fOscNotifierUDP = None
+
+        # fast-timer ticks without messages, see OSC_IDLE_TICKS_BEFORE_SLOWDOWN
+        self.fOscIdleTicks  = 0
+        self.fOscTimersSlow = False
+
         # ----------------------------------------------------------------------------------------------------
         # Connect actions to functions
 
@@ -586,7 +939,7 @@ class HostWindowOSC(HostWindow):
         try:
             lo_target_tcp = Address(self.fOscAddressTCP)
             lo_server_tcp = CarlaControlServerTCP(self.host, self.fOscReportedHost)
-            lo_send(lo_target_tcp, "/register", lo_server_tcp.getFullURL())
+            self.host.registerTCP(lo_target_tcp, lo_server_tcp)
 
             lo_target_udp = Address(self.fOscAddressUDP)
             lo_server_udp = CarlaControlServerUDP(self.host, self.fOscReportedHost)
@@ -628,11 +981,15 @@ class HostWindowOSC(HostWindow):
 
         self.ui.act_file_refresh.setEnabled(True)
 
+        self.createSocketNotifiers()
         self.startTimers()
+        self.enableSharedMemoryIfLocal()
 
     def disconnectOsc(self):
         self.killTimers()
+        self.deleteSocketNotifiers()
         self.unregister()
+        self.host.detachSharedMemory()
         self.removeAllPlugins()
         patchcanvas.clear()
 
@@ -670,26 +1027,134 @@ class HostWindowOSC(HostWindow):
         self.host.lo_target_tcp_name = ""
         self.host.lo_target_udp_name = ""
 
+    def enableSharedMemoryIfLocal(self):
+        if not self.host.isTargetLocal():
+            return
+
+        # peaks, runtime info and output parameters are then read from shared memory instead of UDP.
+        # older or remote engines reply with an error, we keep using UDP in that case.
+        if not self.host.sendMsg(["enable_shm"]):
+            self.host.detachSharedMemory()
+            return
+
+        # the engine keeps using UDP until told the segment is mapped here,
+        # so nothing is lost if it cannot be (another user or mount namespace, no /dev/shm, etc)
+        if not self.host.isUsingSharedMemory():
+            self.host.sendMsg(["disable_shm"])
+            return
+
+        if not self.host.sendMsg(["shm_attached"]):
+            self.host.detachSharedMemory()
+
+    # --------------------------------------------------------------------------------------------------------
+    # Socket notifiers
+
+    def createSocketNotifiers(self):
+        self.deleteSocketNotifiers()
+
+        # UDP messages all arrive on the server socket, so they can be handled as soon as they are readable.
+        # For TCP, liblo only exposes the listening socket; it wakes us up on new connections,
+        # while data on already accepted connections is polled by the timers.
+        self.fOscNotifierTCP = QSocketNotifier(self.host.lo_server_tcp.fileno(), QSocketNotifier.Read, self)
+        self.fOscNotifierTCP.activated.connect(self.slot_oscReadyReadTCP)
+
+        self.fOscNotifierUDP = QSocketNotifier(self.host.lo_server_udp.fileno(), QSocketNotifier.Read, self)
+        self.fOscNotifierUDP.activated.connect(self.slot_oscReadyReadUDP)
+
+    def deleteSocketNotifiers(self):
+        if self.fOscNotifierTCP is not None:
+            self.fOscNotifierTCP.setEnabled(False)
+            self.fOscNotifierTCP.deleteLater()
+            self.fOscNotifierTCP = None
+
+        if self.fOscNotifierUDP is not None:
+            self.fOscNotifierUDP.setEnabled(False)
+            self.fOscNotifierUDP.deleteLater()
+            self.fOscNotifierUDP = None
+
+    # returns the number of messages handled
+    def idleOscTCP(self):
+        if self.host.lo_server_tcp is None:
+            return 0
+
+        return self.host.lo_server_tcp.idle()
+
+    @pyqtSlot(int)
+    def slot_oscReadyReadTCP(self, socket):
+        self.idleOscTCP()
+        self.setOscActive()
+
+    @pyqtSlot(int)
+    def slot_oscReadyReadUDP(self, socket):
+        # notifiers are level-triggered, anything left over the budget wakes us up again on the next loop
+        if self.host.lo_server_udp is not None and self.host.lo_server_udp.idle() != 0:
+            self.setOscActive()
+
     # --------------------------------------------------------------------------------------------------------
     # Timers
 
+    # messages arrived, go back to the normal timer intervals if they were slowed down
+    def setOscActive(self):
+        self.fOscIdleTicks = 0
+
+        if self.fOscTimersSlow:
+            self.setOscTimersSlow(False)
+
+    def setOscTimersSlow(self, slow):
+        if self.fIdleTimerFast == 0 or self.fIdleTimerSlow == 0:
+            return
+
+        interval = self.fSavedSettings[CARLA_KEY_MAIN_REFRESH_INTERVAL]
+
+        if slow:
+            interval *= OSC_IDLE_TIMER_SLOWDOWN
+
+        self.fOscTimersSlow = slow
+
+        self.killTimer(self.fIdleTimerFast)
+        self.killTimer(self.fIdleTimerSlow)
+        self.fIdleTimerFast = self.startTimer(interval)
+        self.fIdleTimerSlow = self.startTimer(interval*4)
+
+    def startTimers(self):
+        self.fOscIdleTicks  = 0
+        self.fOscTimersSlow = False
+        HostWindow.startTimers(self)
+
+    def restartTimersIfNeeded(self):
+        self.fOscIdleTicks  = 0
+        self.fOscTimersSlow = False
+        HostWindow.restartTimersIfNeeded(self)
+
     def idleFast(self):
         HostWindow.idleFast(self)
 
-        if self.host.lo_server_tcp is not None:
-            self.host.lo_server_tcp.idle()
-        else:
+        if self.host.lo_server_tcp is None or self.host.lo_server_udp is None:
             self.disconnectOsc()
+            return
 
-        if self.host.lo_server_udp is not None:
-            self.host.lo_server_udp.idle()
-        else:
-            self.disconnectOsc()
+        # there is no notifier for data on accepted TCP connections, so they are polled on every tick.
+        # when the engine is quiet the timers slow down, which bounds how late a message can be handled.
+        active = self.idleOscTCP() != 0
+        active = self.host.idleSharedMemory() or active
+
+        self.host.idleRegister()
+
+        if active:
+            self.setOscActive()
+            return
+
+        self.fOscIdleTicks += 1
+
+        if self.fOscIdleTicks == OSC_IDLE_TICKS_BEFORE_SLOWDOWN and not self.fOscTimersSlow:
+            self.setOscTimersSlow(True)
 
     # --------------------------------------------------------------------------------------------------------
 
     def removeAllPlugins(self):
-        self.host.fPluginsInfo = {}
+        # keep plugin data around, a later register can reuse it for plugins that did not change
+        self.host.cacheAllPluginsInfo()
+        self.host.fPluginsInfo.clear()
         HostWindow.removeAllPlugins(self)
 
     # --------------------------------------------------------------------------------------------------------
@@ -730,6 +1195,9 @@ class HostWindowOSC(HostWindow):
         if None in (self.host.lo_server_tcp, self.host.lo_server_udp, self.host.lo_target_tcp, self.host.lo_target_udp):
             return
 
+        self.deleteSocketNotifiers()
+        self.host.detachSharedMemory()
+
         lo_send(self.host.lo_target_udp, "/unregister", self.host.lo_server_udp.getFullURL())
         while self.host.lo_server_udp.recv(0):
             pass
@@ -745,9 +1213,10 @@ class HostWindowOSC(HostWindow):
 
         self.host.lo_server_tcp = CarlaControlServerTCP(self.host, self.fOscReportedHost)
         self.host.lo_server_udp = CarlaControlServerUDP(self.host, self.fOscReportedHost)
+        self.createSocketNotifiers()
 
         try:
-            lo_send(self.host.lo_target_tcp, "/register", self.host.lo_server_tcp.getFullURL())
+            self.host.registerTCP(self.host.lo_target_tcp, self.host.lo_server_tcp)
         except:
             self.disconnectOsc()
             return
@@ -758,6 +1227,8 @@ class HostWindowOSC(HostWindow):
             self.disconnectOsc()
             return
 
+        self.enableSharedMemoryIfLocal()
+
     # --------------------------------------------------------------------------------------------------------
 
     @pyqtSlot()
@@ -775,8 +1246,364 @@ class HostWindowOSC(HostWindow):
 
     def closeEvent(self, event):
         self.killTimers()
+        self.deleteSocketNotifiers()
         self.unregister()
+        self.host.detachSharedMemory()
 
         HostWindow.closeEvent(self, event)
 
+# ---------------------------------------------------------------------------------------------------------------------
+# Fleet mode, monitors many engines at once
+
+class FleetEngineInfo(object):
+    __slots__ = [
+        'name',
+        'targetTCP',
+        'targetUDP',
+        'status',
+        'load',
+        'xruns',
+        'pluginNames',
+        'peaks',
+        'parameterValues',
+        'dirty',
+    ]
+
+    def __init__(self, name, targetTCP, targetUDP):
+        self.name      = name
+        self.targetTCP = targetTCP
+        self.targetUDP = targetUDP
+        self.status    = "Connecting"
+        self.clear()
+
+    def clear(self):
+        self.load  = 0.0
+        self.xruns = 0
+        self.pluginNames = []
+        self.peaks = array('f')       # 4 values per plugin, in1, in2, out1, out2
+        self.parameterValues = []     # one array('f') per plugin
+        self.dirty = True
+
+    def getPluginCount(self):
+        return len(self.pluginNames)
+
+    def allocateAsNeeded(self, pluginId):
+        while len(self.pluginNames) <= pluginId:
+            self.pluginNames.append("")
+            self.peaks.extend((0.0, 0.0, 0.0, 0.0))
+            self.parameterValues.append(array('f'))
+
+    def removePlugin(self, pluginId):
+        if pluginId >= len(self.pluginNames):
+            return
+        self.pluginNames.pop(pluginId)
+        self.parameterValues.pop(pluginId)
+        del self.peaks[pluginId*4:pluginId*4+4]
+
+    def getEnginePeaks(self):
+        # same as the engine's main peaks, input of the first plugin and output of the last one
+        count = len(self.pluginNames)
+        if count == 0:
+            return (0.0, 0.0, 0.0, 0.0)
+        last = (count-1)*4
+        return (self.peaks[0], self.peaks[1], self.peaks[last+2], self.peaks[last+3])
+
+# ---------------------------------------------------------------------------------------------------------------------
+
+class CarlaFleetServer(Server):
+    def __init__(self, engines, proto):
+        Server.__init__(self, proto=proto)
+
+        self.fEngines = engines
+
+        self.fHandlers = {
+            'cb': self.handleCallback,
+            'info': self.handleInfo,
+            'ports': self.handlePorts,
+            'param': self.handleParam,
+            'peaks': self.handlePeaks,
+            'runtime': self.handleRuntime,
+            'exit': self.handleExit,
+            'exit-error': self.handleExitError,
+        }
+
+    def idle(self, maxMessages = OSC_MAX_MESSAGES_PER_WAKEUP):
+        count = 0
+
+        while count < maxMessages and self.recv(0):
+            count += 1
+
+        return count
+
+    def getFullURL(self, engineId):
+        # each engine sends to its own path, so a single server can tell them apart
+        return "%sfleet/%i" % (self.get_url(), engineId)
+
+    @make_method(None, None)
+    def dispatch(self, path, args):
+        try:
+            _, prefix, engineId, method = path.split("/", 3)
+            engine = self.fEngines[int(engineId)]
+        except:
+            print("CarlaFleetServer::dispatch(\"%s\") - unknown message, args =" % path, args)
+            return
+
+        handler = self.fHandlers.get(method, None)
+
+        if handler is None:
+            return
+
+        handler(engine, args)
+        engine.dirty = True
+
+    # -------------------------------------------------------------------
+
+    def handleCallback(self, engine, args):
+        action, pluginId, value1, value2, value3, valuef, valueStr = args
+
+        if action == ENGINE_CALLBACK_ENGINE_STARTED:
+            engine.clear()
+            engine.status = "Connected"
+
+        elif action in (ENGINE_CALLBACK_PLUGIN_ADDED, ENGINE_CALLBACK_PLUGIN_RENAMED):
+            engine.allocateAsNeeded(pluginId)
+            engine.pluginNames[pluginId] = valueStr
+
+        elif action == ENGINE_CALLBACK_PLUGIN_REMOVED:
+            engine.removePlugin(pluginId)
+
+        elif action == ENGINE_CALLBACK_PARAMETER_VALUE_CHANGED:
+            if pluginId < engine.getPluginCount() and 0 <= value1 < len(engine.parameterValues[pluginId]):
+                engine.parameterValues[pluginId][value1] = valuef
+
+        elif action == ENGINE_CALLBACK_ENGINE_STOPPED:
+            engine.clear()
+            engine.status = "Stopped"
+
+    def handleInfo(self, engine, args):
+        pluginId = args[0]
+        name     = args[7]
+        engine.allocateAsNeeded(pluginId)
+        engine.pluginNames[pluginId] = name
+
+    def handlePorts(self, engine, args):
+        pluginId, paramTotal = args[0], args[7]
+        engine.allocateAsNeeded(pluginId)
+        engine.parameterValues[pluginId] = array('f', bytes(4*paramTotal))
+
+    def handleParam(self, engine, args):
+        # long version comes from TCP with full parameter details, short one from UDP with only the value
+        pluginId, paramId = args[0], args[1]
+        value = args[14] if len(args) >= 15 else args[2]
+
+        if pluginId < engine.getPluginCount() and paramId < len(engine.parameterValues[pluginId]):
+            engine.parameterValues[pluginId][paramId] = value
+
+    def handlePeaks(self, engine, args):
+        pluginId = args[0]
+
+        if pluginId < engine.getPluginCount():
+            engine.peaks[pluginId*4:pluginId*4+4] = array('f', args[1:5])
+
+    def handleRuntime(self, engine, args):
+        engine.load  = args[0]
+        engine.xruns = args[1]
+
+    def handleExit(self, engine, args):
+        engine.clear()
+        engine.status = "Closed"
+
+    def handleExitError(self, engine, args):
+        engine.clear()
+        engine.status = "Error: %s" % args[0]
+
+# ---------------------------------------------------------------------------------------------------------------------
+
+class FleetEngineDialog(QDialog):
+    def __init__(self, parent, engine):
+        QDialog.__init__(self, parent)
+        self.setWindowTitle(engine.name)
+        self.resize(640, 400)
+
+        self.fEngine = engine
+
+        self.fTable = QTableWidget(0, 5, self)
+        self.fTable.setHorizontalHeaderLabels([self.tr("Plugin"), self.tr("Parameters"),
+                                               self.tr("Peak In"), self.tr("Peak Out"), self.tr("Values")])
+        self.fTable.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.fTable.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.fTable.verticalHeader().setVisible(False)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.fTable)
+
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.refresh()
+
+    def refresh(self):
+        engine = self.fEngine
+        count  = engine.getPluginCount()
+
+        if self.fTable.rowCount() != count:
+            self.fTable.setRowCount(count)
+            for row in range(count):
+                for column in range(5):
+                    self.fTable.setItem(row, column, QTableWidgetItem())
+
+        for pluginId in range(count):
+            peaks  = engine.peaks[pluginId*4:pluginId*4+4]
+            values = engine.parameterValues[pluginId]
+            self.fTable.item(pluginId, 0).setText(engine.pluginNames[pluginId])
+            self.fTable.item(pluginId, 1).setText(str(len(values)))
+            self.fTable.item(pluginId, 2).setText("%.2f / %.2f" % (peaks[0], peaks[1]))
+            self.fTable.item(pluginId, 3).setText("%.2f / %.2f" % (peaks[2], peaks[3]))
+            self.fTable.item(pluginId, 4).setText(" ".join("%.3g" % v for v in values[:8]))
+
+# ---------------------------------------------------------------------------------------------------------------------
+
+class FleetWindow(QMainWindow):
+    # signals
+    SIGTERM = pyqtSignal()
+    SIGUSR1 = pyqtSignal()
+
+    COLUMN_NAME    = 0
+    COLUMN_STATUS  = 1
+    COLUMN_PLUGINS = 2
+    COLUMN_LOAD    = 3
+    COLUMN_XRUNS   = 4
+    COLUMN_PEAKIN  = 5
+    COLUMN_PEAKOUT = 6
+    COLUMN_COUNT   = 7
+
+    def __init__(self, addresses):
+        QMainWindow.__init__(self)
+        self.setWindowTitle("Carla Control - Fleet")
+        self.resize(900, 500)
+        gCarla.gui = self
+
+        self.fEngines = []
+        self.fDialogs = {}
+
+        self.fTable = QTableWidget(0, self.COLUMN_COUNT, self)
+        self.fTable.setHorizontalHeaderLabels([self.tr("Engine"), self.tr("Status"), self.tr("Plugins"),
+                                               self.tr("DSP Load"), self.tr("Xruns"),
+                                               self.tr("Peak In"), self.tr("Peak Out")])
+        self.fTable.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.fTable.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.fTable.horizontalHeader().setSectionResizeMode(self.COLUMN_STATUS, QHeaderView.Stretch)
+        self.fTable.verticalHeader().setVisible(False)
+        self.fTable.cellDoubleClicked.connect(self.slot_showEngineDetails)
+        self.setCentralWidget(self.fTable)
+
+        # shared by all engines
+        self.fServerTCP = CarlaFleetServer(self.fEngines, LO_TCP)
+        self.fServerUDP = CarlaFleetServer(self.fEngines, LO_UDP)
+
+        self.fNotifierUDP = QSocketNotifier(self.fServerUDP.fileno(), QSocketNotifier.Read, self)
+        self.fNotifierUDP.activated.connect(self.slot_readyReadUDP)
+
+        for address in addresses:
+            self.addEngine(address)
+
+        self.fRefreshTimer = self.startTimer(FLEET_REFRESH_INTERVAL)
+
+        self.SIGTERM.connect(self.slot_handleSIGTERM)
+
+    # -----------------------------------------------------------------------------------------------------------------
+
+    def addEngine(self, address):
+        # address is "host[:tcpPort[:udpPort]]", UDP port defaults to the same as TCP
+        parts   = address.split(":")
+        host    = parts[0]
+        tcpPort = int(parts[1]) if len(parts) > 1 else CARLA_DEFAULT_OSC_TCP_PORT_NUMBER
+        udpPort = int(parts[2]) if len(parts) > 2 else tcpPort
+
+        engineId = len(self.fEngines)
+        engine   = FleetEngineInfo("%s:%i" % (host, tcpPort),
+                                   Address(host, tcpPort, LO_TCP),
+                                   Address(host, udpPort, LO_UDP))
+        self.fEngines.append(engine)
+
+        self.fTable.setRowCount(engineId+1)
+        for column in range(self.COLUMN_COUNT):
+            self.fTable.setItem(engineId, column, QTableWidgetItem())
+        self.fTable.item(engineId, self.COLUMN_NAME).setText(engine.name)
+
+        try:
+            lo_send(engine.targetTCP, "/register", self.fServerTCP.getFullURL(engineId))
+            lo_send(engine.targetUDP, "/register", self.fServerUDP.getFullURL(engineId))
+        except:
+            engine.status = "Failed to connect"
+
+    def unregisterAll(self):
+        for engineId, engine in enumerate(self.fEngines):
+            try:
+                lo_send(engine.targetTCP, "/unregister", self.fServerTCP.getFullURL(engineId))
+                lo_send(engine.targetUDP, "/unregister", self.fServerUDP.getFullURL(engineId))
+            except:
+                pass
+
+    # -----------------------------------------------------------------------------------------------------------------
+
+    def refreshEngineRow(self, engineId, engine):
+        peaks = engine.getEnginePeaks()
+        self.fTable.item(engineId, self.COLUMN_STATUS).setText(engine.status)
+        self.fTable.item(engineId, self.COLUMN_PLUGINS).setText(str(engine.getPluginCount()))
+        self.fTable.item(engineId, self.COLUMN_LOAD).setText("%.1f%%" % engine.load)
+        self.fTable.item(engineId, self.COLUMN_XRUNS).setText(str(engine.xruns))
+        self.fTable.item(engineId, self.COLUMN_PEAKIN).setText("%.2f / %.2f" % (peaks[0], peaks[1]))
+        self.fTable.item(engineId, self.COLUMN_PEAKOUT).setText("%.2f / %.2f" % (peaks[2], peaks[3]))
+
+    def refresh(self):
+        # liblo does not expose sockets of accepted TCP connections, poll those here
+        self.fServerTCP.idle()
+
+        for engineId, engine in enumerate(self.fEngines):
+            if not engine.dirty:
+                continue
+            engine.dirty = False
+            self.refreshEngineRow(engineId, engine)
+
+            dialog = self.fDialogs.get(engineId, None)
+            if dialog is not None:
+                dialog.refresh()
+
+    # -----------------------------------------------------------------------------------------------------------------
+
+    @pyqtSlot(int)
+    def slot_readyReadUDP(self, socket):
+        self.fServerUDP.idle()
+
+    @pyqtSlot()
+    def slot_handleSIGTERM(self):
+        print("Got SIGTERM -> Closing now")
+        self.close()
+
+    @pyqtSlot(int, int)
+    def slot_showEngineDetails(self, row, column):
+        dialog = self.fDialogs.get(row, None)
+
+        if dialog is None:
+            dialog = FleetEngineDialog(self, self.fEngines[row])
+            dialog.destroyed.connect(lambda: self.fDialogs.pop(row, None))
+            self.fDialogs[row] = dialog
+
+        dialog.show()
+        dialog.raise_()
+
+    # -----------------------------------------------------------------------------------------------------------------
+
+    def timerEvent(self, event):
+        if event.timerId() == self.fRefreshTimer:
+            self.refresh()
+
+        QMainWindow.timerEvent(self, event)
+
+    def closeEvent(self, event):
+        self.killTimer(self.fRefreshTimer)
+        self.fNotifierUDP.setEnabled(False)
+        self.unregisterAll()
+
+        QMainWindow.closeEvent(self, event)
+
 # ------------------------------------------------------------------------------------------------------------
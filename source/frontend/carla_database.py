@@ -19,11 +19,20 @@
 # ---------------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from copy import deepcopy
-from subprocess import Popen, PIPE
-
-from PyQt5.QtCore import pyqtSignal, pyqtSlot, Qt, QEventLoop, QThread, QSettings
-from PyQt5.QtWidgets import QApplication, QDialog, QDialogButtonBox, QTableWidgetItem
+from json import dump as jsonDump, load as jsonLoad
+from queue import Queue
+from sqlite3 import connect as sqliteConnect
+from stat import S_ISDIR
+from subprocess import Popen, PIPE, TimeoutExpired
+from threading import Lock, Timer
+from time import localtime, strftime, time
+
+from PyQt5.QtCore import pyqtSignal, pyqtSlot, Qt, QAbstractTableModel, QEventLoop, QFileSystemWatcher, QModelIndex
+from PyQt5.QtCore import QObject, QSettings, QThread, QTimer
+from PyQt5.QtWidgets import QApplication, QDialog, QDialogButtonBox
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Imports (Custom)
@@ -67,9 +76,128 @@ if haveLRDF and readEnvVars:
 # ---------------------------------------------------------------------------------------------------------------------
 # Plugin Query (helper functions)
 
-def findBinaries(binPath, OS):
-    binaries = []
+# Identifies a file or directory by device and inode, so the same one found through other paths is seen once.
+# os.DirEntry.stat() leaves both as 0 on Windows, and some filesystems have no inodes at all,
+# so in that case use a full stat, or if still not available, the resolved path.
+def _getPathKey(path, stat):
+    if stat.st_ino != 0:
+        return (stat.st_dev, stat.st_ino)
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        pass
+    else:
+        if stat.st_ino != 0:
+            return (stat.st_dev, stat.st_ino)
+
+    return os.path.normcase(os.path.realpath(path))
+
+# Walks a single root, directories already visited (see _getPathKey()) are skipped so symlink cycles end.
+# Returns a list of (key, path, isLink) for matching files and directories, matching directories are not walked into.
+def _scanPluginPath(root, fileExtensions, dirExtensions, dirFile, followLinks):
+    found = []
+
+    try:
+        stat = os.stat(root)
+    except OSError:
+        return found
+
+    visited = set()
+    pending = [(root, _getPathKey(root, stat))]
+
+    while len(pending) != 0:
+        path, key = pending.pop()
+
+        if key in visited:
+            continue
+
+        visited.add(key)
+
+        try:
+            entries = os.scandir(path)
+        except OSError:
+            continue
+
+        subdirs = []
+
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        if entry.is_symlink() and not followLinks:
+                            continue
+
+                        key = _getPathKey(entry.path, entry.stat())
+
+                        if dirExtensions and entry.name.lower().endswith(dirExtensions):
+                            found.append((key, entry.path, entry.is_symlink()))
+                        elif dirFile and os.path.exists(os.path.join(entry.path, dirFile)):
+                            found.append((key, entry.path, entry.is_symlink()))
+                        else:
+                            subdirs.append((entry.path, key))
+
+                    elif fileExtensions and entry.name.lower().endswith(fileExtensions) and entry.is_file():
+                        key = _getPathKey(entry.path, entry.stat())
+                        found.append((key, entry.path, entry.is_symlink()))
+
+                except OSError:
+                    continue
+
+        # keep the same order as a recursive walk
+        pending += reversed(subdirs)
 
+    return found
+
+# Finds files ending in one of fileExtensions, directories ending in one of dirExtensions,
+# and directories containing a file named dirFile, inside roots (a path or a list of paths).
+# Roots are walked in parallel, the same file found through different paths or symlinks is only returned once
+# (preferring a path that is not a symlink).
+def scanPluginPaths(roots, fileExtensions=(), dirExtensions=(), dirFile=None, followLinks=False):
+    if isinstance(roots, str):
+        roots = [roots]
+
+    roots = [root for root in roots if root]
+
+    def scan(root):
+        return _scanPluginPath(root, fileExtensions, dirExtensions, dirFile, followLinks)
+
+    if len(roots) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(roots), os.cpu_count() or 1)) as executor:
+            results = list(executor.map(scan, roots))
+    else:
+        results = [scan(root) for root in roots]
+
+    indexes = {}
+    paths   = []
+    links   = []
+
+    for found in results:
+        for key, path, isLink in found:
+            index = indexes.get(key)
+
+            if index is None:
+                indexes[key] = len(paths)
+                paths.append(path)
+                links.append(isLink)
+
+            elif links[index] and not isLink:
+                paths[index] = path
+                links[index] = False
+
+    return paths
+
+# checks if path is one of roots (a list of paths), or inside one of them
+def isPathInside(path, roots):
+    for root in roots:
+        root = root.rstrip(os.sep)
+
+        if path == root or path.startswith(root + os.sep):
+            return True
+
+    return False
+
+def findBinaries(binPath, OS):
     if OS == "WINDOWS":
         extensions = (".dll",)
     elif OS == "MACOS":
@@ -77,55 +205,26 @@ def findBinaries(binPath, OS):
     else:
         extensions = (".so",)
 
-    for root, dirs, files in os.walk(binPath):
-        for name in [name for name in files if name.lower().endswith(extensions)]:
-            binaries.append(os.path.join(root, name))
-
-    return binaries
+    return scanPluginPaths(binPath, fileExtensions=extensions)
 
 def findVST3Binaries(binPath):
-    binaries = []
-
-    for root, dirs, files in os.walk(binPath):
-        for name in [name for name in files if name.lower().endswith(".vst3")]:
-            binaries.append(os.path.join(root, name))
-
-    return binaries
+    return scanPluginPaths(binPath, fileExtensions=(".vst3",))
 
 def findLV2Bundles(bundlePath):
-    bundles = []
-
-    for root, dirs, files in os.walk(bundlePath, followlinks=True):
-        if root == bundlePath: continue
-        if os.path.exists(os.path.join(root, "manifest.ttl")):
-            bundles.append(root)
-
-    return bundles
+    return scanPluginPaths(bundlePath, dirFile="manifest.ttl", followLinks=True)
 
 def findMacVSTBundles(bundlePath, isVST3):
-    bundles = []
     extension = ".vst3" if isVST3 else ".vst"
 
-    for root, dirs, files in os.walk(bundlePath, followlinks=True):
-        #if root == bundlePath: continue # FIXME
-        for name in [name for name in dirs if name.lower().endswith(extension)]:
-            bundles.append(os.path.join(root, name))
-
-    return bundles
+    return scanPluginPaths(bundlePath, dirExtensions=(extension,), followLinks=True)
 
 def findFilenames(filePath, stype):
-    filenames = []
-
     if stype == "sf2":
         extensions = (".sf2",".sf3",)
     else:
         return []
 
-    for root, dirs, files in os.walk(filePath):
-        for name in [name for name in files if name.lower().endswith(extensions)]:
-            filenames.append(os.path.join(root, name))
-
-    return filenames
+    return scanPluginPaths(filePath, fileExtensions=extensions)
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Plugin Query
@@ -151,8 +250,20 @@ PyPluginInfo = {
     'parameters.outs': 0
 }
 
-global gDiscoveryProcess
-gDiscoveryProcess = None
+# discovery processes currently running, one per discovery job
+gDiscoveryProcesses = set()
+gDiscoveryLock = Lock()
+
+# processes killed by killDiscovery(), these did not crash
+gDiscoverySkipped = set()
+
+# how a discovery ended
+DISCOVERY_OK      = "ok"
+DISCOVERY_CRASH   = "crash"
+DISCOVERY_TIMEOUT = "timeout"
+DISCOVERY_SKIPPED = "skipped"
+
+DISCOVERY_DEFAULT_TIMEOUT = 30
 
 def findWinePrefix(filename, recursionLimit = 10):
     if recursionLimit == 0 or len(filename) < 5 or "/" not in filename:
@@ -165,14 +276,28 @@ def findWinePrefix(filename, recursionLimit = 10):
 
     return findWinePrefix(path, recursionLimit-1)
 
-def runCarlaDiscovery(itype, stype, filename, tool, wineSettings=None):
-    if not os.path.exists(tool):
-        qWarning("runCarlaDiscovery() - tool '%s' does not exist" % tool)
-        return
+# environment for discovery processes, doChecks None keeps the current one (see CARLA_DISCOVERY_NO_PROCESSING_CHECKS)
+def getDiscoveryEnv(doChecks=None):
+    if doChecks is None:
+        return None
+
+    env = os.environ.copy()
+
+    if doChecks:
+        env.pop("CARLA_DISCOVERY_NO_PROCESSING_CHECKS", None)
+    else:
+        env["CARLA_DISCOVERY_NO_PROCESSING_CHECKS"] = "true"
+
+    return env
 
+def getDiscoveryCommand(tool, filename, wineSettings=None, lowPriority=False):
     command = []
 
     if LINUX or MACOS:
+        if lowPriority:
+            command.append("nice")
+            command.append("-n")
+            command.append("10")
         command.append("env")
         command.append("LANG=C")
         command.append("LD_PRELOAD=")
@@ -203,34 +328,73 @@ def runCarlaDiscovery(itype, stype, filename, tool, wineSettings=None):
             command.append(wineCMD)
 
     command.append(tool)
-    command.append(stype)
-    command.append(filename)
+    return command
+
+# Reads and parses discovery output until the process ends, or until endLine is found.
+# The process is killed if this takes longer than timeout seconds.
+# Returns the plugins found and how the discovery ended (one of DISCOVERY_*).
+def readDiscoveryOutput(process, itype, filename, endLine=None, timeout=None):
+    watchdog = None
+    timedOut = []
 
-    global gDiscoveryProcess
-    gDiscoveryProcess = Popen(command, stdout=PIPE)
+    if timeout:
+        def slot_timeout():
+            timedOut.append(True)
+            process.kill()
 
+        watchdog = Timer(timeout, slot_timeout)
+        watchdog.daemon = True
+        watchdog.start()
+
+    try:
+        plugins, ended = parseDiscoveryOutput(process, itype, filename, endLine)
+
+        # process closed its output, wait for it to finish (or the watchdog to kill it)
+        if not ended:
+            process.wait()
+
+    finally:
+        if watchdog is not None:
+            watchdog.cancel()
+
+    with gDiscoveryLock:
+        skipped = process in gDiscoverySkipped
+        gDiscoverySkipped.discard(process)
+
+    if ended:
+        status = DISCOVERY_OK
+    elif timedOut:
+        status = DISCOVERY_TIMEOUT
+    elif skipped:
+        status = DISCOVERY_SKIPPED
+    # batch mode never ends on its own, single mode returns 1 on files that cannot be loaded
+    elif endLine is not None or process.returncode not in (0, 1):
+        status = DISCOVERY_CRASH
+    else:
+        status = DISCOVERY_OK
+
+    return (plugins, status)
+
+def parseDiscoveryOutput(process, itype, filename, endLine):
     pinfo = None
     plugins = []
     fakeLabel = os.path.basename(filename).rsplit(".", 1)[0]
 
     while True:
         try:
-            line = gDiscoveryProcess.stdout.readline().decode("utf-8", errors="ignore")
+            line = process.stdout.readline().decode("utf-8", errors="ignore")
         except:
             print("ERROR: discovery readline failed")
             break
 
-        # line is valid, strip it
-        if line:
-            line = line.strip()
+        # end of output
+        if not line:
+            break
 
-        # line is invalid, try poll() again
-        elif gDiscoveryProcess.poll() is None:
-            continue
+        line = line.strip()
 
-        # line is invalid and poll() failed, stop here
-        else:
-            break
+        if endLine is not None and line == endLine:
+            return (plugins, True)
 
         if line == "carla-discovery::init::-----------":
             pinfo = deepcopy(PyPluginInfo)
@@ -302,18 +466,179 @@ def runCarlaDiscovery(itype, stype, filename, tool, wineSettings=None):
             else:
                 print("%s - %s (unknown property)" % (line, filename))
 
-    # FIXME?
-    tmp = gDiscoveryProcess
-    gDiscoveryProcess = None
-    del gDiscoveryProcess, tmp
+    return (plugins, False)
+
+def runCarlaDiscovery(itype, stype, filename, tool, wineSettings=None, timeout=None):
+    return runCarlaDiscoveryWithStatus(itype, stype, filename, tool, wineSettings, timeout)[0]
+
+# Starts a discovery process, returns None if continueChecking says the discovery was cancelled.
+# Checked while holding gDiscoveryLock, so a process is either started before killDiscovery() kills them all,
+# or not at all.
+def startDiscoveryProcess(command, stdin=None, doChecks=None, continueChecking=None):
+    with gDiscoveryLock:
+        if continueChecking is not None and not continueChecking():
+            return None
+
+        process = Popen(command, stdin=stdin, stdout=PIPE, env=getDiscoveryEnv(doChecks))
+        gDiscoveryProcesses.add(process)
+
+    return process
+
+def runCarlaDiscoveryWithStatus(itype, stype, filename, tool, wineSettings=None, timeout=None, lowPriority=False,
+                                doChecks=None, continueChecking=None):
+    if not os.path.exists(tool):
+        qWarning("runCarlaDiscovery() - tool '%s' does not exist" % tool)
+        return (None, DISCOVERY_OK)
+
+    command = getDiscoveryCommand(tool, filename, wineSettings, lowPriority)
+    command.append(stype)
+    command.append(filename)
+
+    process = startDiscoveryProcess(command, None, doChecks, continueChecking)
+
+    if process is None:
+        return (None, DISCOVERY_SKIPPED)
+
+    plugins, status = readDiscoveryOutput(process, itype, filename, None, timeout)
+
+    with gDiscoveryLock:
+        gDiscoveryProcesses.discard(process)
+
+    process.stdout.close()
+
+    return (plugins, status)
+
+# A long-lived discovery process that checks many files, one after the other.
+# Avoids starting a new process (and wine) per file, a new one is only started after a crash.
+# Falls back to one process per file if the tool has no batch mode.
+class CarlaDiscoveryBatch(object):
+    # continueChecking is called before starting a new discovery process, returning False cancels it
+    def __init__(self, itype, stype, tool, wineSettings=None, timeout=None, lowPriority=False, doChecks=None,
+                 continueChecking=None):
+        self.fType         = itype
+        self.fTypeStr      = stype
+        self.fTool         = tool
+        self.fWineSettings = wineSettings
+        self.fTimeout      = timeout
+        self.fLowPriority  = lowPriority
+        self.fDoChecks     = doChecks
+        self.fProcess      = None
+        self.fCommand      = None
+        self.fSupported    = True
+
+        self.fContinueChecking = continueChecking
+
+    # returns the plugins found and how the discovery ended, like runCarlaDiscoveryWithStatus()
+    def check(self, filename):
+        if not os.path.exists(self.fTool):
+            qWarning("CarlaDiscoveryBatch::check() - tool '%s' does not exist" % self.fTool)
+            return (None, DISCOVERY_OK)
+
+        if not self.fSupported or "\n" in filename:
+            return self._checkAlone(filename)
+
+        # the command only changes if wine prefix does
+        command = getDiscoveryCommand(self.fTool, filename, self.fWineSettings, self.fLowPriority)
+        command.append(self.fTypeStr)
+        command.append(":batch")
+
+        if self.fProcess is not None and command != self.fCommand:
+            self.close()
+
+        # try twice, in case the process was killed between files
+        for _ in range(2):
+            if self.fProcess is None:
+                status = self._start(command)
+
+                if status == DISCOVERY_SKIPPED:
+                    return ([], status)
+
+                if status != DISCOVERY_OK:
+                    self.fSupported = False
+                    return self._checkAlone(filename)
+
+            try:
+                self.fProcess.stdin.write(filename.encode("utf-8") + b"\n")
+                self.fProcess.stdin.flush()
+            except OSError:
+                self.close()
+                continue
+
+            plugins, status = readDiscoveryOutput(self.fProcess, self.fType, filename,
+                                                  "carla-discovery::batch-end::" + filename, self.fTimeout)
+
+            if status != DISCOVERY_OK:
+                self.close()
+
+            # the batch process may have been left in a bad state by a previous file,
+            # only blame this one if it also crashes on its own.
+            # timeouts are not checked again, that would wait twice as long as the timeout
+            if status == DISCOVERY_CRASH:
+                return self._checkAlone(filename)
 
-    return plugins
+            return (plugins, status)
+
+        return self._checkAlone(filename)
+
+    def close(self):
+        process = self.fProcess
+
+        if process is None:
+            return
+
+        self.fProcess = None
+        self.fCommand = None
+
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+
+        try:
+            process.wait(5)
+        except TimeoutExpired:
+            process.kill()
+            process.wait()
+
+        with gDiscoveryLock:
+            gDiscoveryProcesses.discard(process)
+            gDiscoverySkipped.discard(process)
+
+        process.stdout.close()
+
+    # checks a single file with its own discovery process
+    def _checkAlone(self, filename):
+        return runCarlaDiscoveryWithStatus(self.fType, self.fTypeStr, filename,
+                                           self.fTool, self.fWineSettings, self.fTimeout, self.fLowPriority,
+                                           self.fDoChecks, self.fContinueChecking)
+
+    # returns DISCOVERY_OK if the tool is ready for filenames
+    def _start(self, command):
+        process = startDiscoveryProcess(command, PIPE, self.fDoChecks, self.fContinueChecking)
+
+        if process is None:
+            return DISCOVERY_SKIPPED
+
+        self.fProcess = process
+        self.fCommand = command
+
+        _, status = readDiscoveryOutput(process, self.fType, "", "carla-discovery::batch-ready::-----------",
+                                        self.fTimeout)
+
+        if status != DISCOVERY_OK:
+            self.close()
+
+        return status
 
 def killDiscovery():
-    global gDiscoveryProcess
+    with gDiscoveryLock:
+        for process in gDiscoveryProcesses:
+            gDiscoverySkipped.add(process)
 
-    if gDiscoveryProcess is not None:
-        gDiscoveryProcess.kill()
+            try:
+                process.kill()
+            except OSError:
+                pass
 
 def checkPluginCached(desc, ptype):
     pinfo = deepcopy(PyPluginInfo)
@@ -363,17 +688,388 @@ def checkFileSFZ(filename, tool):
 def checkAllPluginsAU(tool):
     return runCarlaDiscovery(PLUGIN_AU, "AU", ":all", tool)
 
+# ---------------------------------------------------------------------------------------------------------------------
+# Where the plugin index and discovery cache are stored
+
+def getPluginDatabaseDir():
+    if WINDOWS:
+        return os.path.join(APPDATA, "falkTX")
+
+    return os.path.join(HOME, ".config", "falkTX")
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Plugin Index
+
+# plugin sources, named after the old CarlaPlugins4 settings keys
+PLUGIN_INDEX_SOURCES_LADSPA = ("LADSPA_native", "LADSPA_posix32", "LADSPA_posix64", "LADSPA_win32", "LADSPA_win64")
+PLUGIN_INDEX_SOURCES_DSSI   = ("DSSI_native", "DSSI_posix32", "DSSI_posix64", "DSSI_win32", "DSSI_win64")
+PLUGIN_INDEX_SOURCES_VST2   = ("VST2_native", "VST2_posix32", "VST2_posix64", "VST2_win32", "VST2_win64")
+PLUGIN_INDEX_SOURCES_VST3   = ("VST3_native", "VST3_posix32", "VST3_posix64", "VST3_win32", "VST3_win64")
+PLUGIN_INDEX_SOURCES_OTHER  = ("Internal", "LV2", "AU", "AU_posix32", "SF2", "SFZ")
+
+# bump when the table layout changes, an index with a different version (or plugin API) is created again
+PLUGIN_INDEX_SCHEMA_VERSION = 1
+
+# PyPluginInfo key, column name and type
+PLUGIN_INDEX_COLUMNS = (
+    ('API',             "api",            "INTEGER"),
+    ('build',           "build",          "INTEGER"),
+    ('type',            "type",           "INTEGER"),
+    ('hints',           "hints",          "INTEGER"),
+    ('filename',        "filename",       "TEXT"),
+    ('name',            "name",           "TEXT"),
+    ('label',           "label",          "TEXT"),
+    ('maker',           "maker",          "TEXT"),
+    ('uniqueId',        "uniqueId",       "INTEGER"),
+    ('audio.ins',       "audioIns",       "INTEGER"),
+    ('audio.outs',      "audioOuts",      "INTEGER"),
+    ('midi.ins',        "midiIns",        "INTEGER"),
+    ('midi.outs',       "midiOuts",       "INTEGER"),
+    ('parameters.ins',  "parametersIns",  "INTEGER"),
+    ('parameters.outs', "parametersOuts", "INTEGER"),
+)
+
+# SQLite index of all known plugins, one row per plugin.
+# Rows belong to a source (plugin type and discovery tool) and to the binary they were found in,
+# so a discovery can replace the plugins of a single binary or of a whole source in one transaction.
+# Each thread needs its own PluginIndex.
+class PluginIndex(object):
+    def __init__(self):
+        self.fFilename = os.path.join(getPluginDatabaseDir(), "CarlaPlugins.db")
+
+        os.makedirs(os.path.dirname(self.fFilename), exist_ok=True)
+
+        isNew = not os.path.exists(self.fFilename)
+
+        self.fConn = sqliteConnect(self.fFilename, timeout=10)
+        self.fConn.execute("PRAGMA journal_mode=WAL")
+
+        version = PLUGIN_QUERY_API_VERSION * 100 + PLUGIN_INDEX_SCHEMA_VERSION
+
+        if self.fConn.execute("PRAGMA user_version").fetchone()[0] != version:
+            self._createTables(version)
+
+            if isNew:
+                self._importFromSettings()
+
+    def close(self):
+        self.fConn.close()
+
+    # -----------------------------------------------------------------------------------------------------------------
+
+    # plugins of the given sources, in the order they were added
+    def getPlugins(self, sources):
+        columns = ", ".join(column for _, column, _ in PLUGIN_INDEX_COLUMNS)
+        keys    = [key for key, _, _ in PLUGIN_INDEX_COLUMNS]
+        plugins = []
+
+        for source in sources:
+            for row in self.fConn.execute("SELECT %s FROM plugins WHERE source = ? ORDER BY id" % columns, (source,)):
+                # PyPluginInfo is flat, no need for a deep copy
+                pinfo = dict(PyPluginInfo)
+                pinfo.update(zip(keys, row))
+                plugins.append(pinfo)
+
+        return plugins
+
+    # plugins of a source grouped by the binary they were found in, as a list of (binary, plugins)
+    def getBinaryPlugins(self, source):
+        columns = ", ".join(column for _, column, _ in PLUGIN_INDEX_COLUMNS)
+        keys    = [key for key, _, _ in PLUGIN_INDEX_COLUMNS]
+        binaryPlugins = {}
+
+        for row in self.fConn.execute("SELECT binary, %s FROM plugins WHERE source = ? ORDER BY id" % columns,
+                                      (source,)):
+            pinfo = dict(PyPluginInfo)
+            pinfo.update(zip(keys, row[1:]))
+            binaryPlugins.setdefault(row[0], []).append(pinfo)
+
+        return list(binaryPlugins.items())
+
+    def getPluginCount(self, sources):
+        count = 0
+
+        for source in sources:
+            count += self.fConn.execute("SELECT COUNT(*) FROM plugins WHERE source = ?", (source,)).fetchone()[0]
+
+        return count
+
+    # Replaces the plugins of a source, or only those of one of its binaries.
+    # plugins can be a list of plugins, or a list of lists as returned by the discovery.
+    def setPlugins(self, source, plugins, binary=None):
+        with self.fConn:
+            if binary is None:
+                self.fConn.execute("DELETE FROM plugins WHERE source = ?", (source,))
+            else:
+                self.fConn.execute("DELETE FROM plugins WHERE source = ? AND binary = ?", (source, binary))
+
+            self.fConn.executemany(self._getInsertQuery(), self._getRows(source, plugins, binary))
+
+    # Replaces the plugins of several binaries of a source in one transaction.
+    # binaryPlugins is a list of (binary, plugins), an empty plugin list removes the binary.
+    def setBinaryPlugins(self, source, binaryPlugins):
+        with self.fConn:
+            for binary, plugins in binaryPlugins:
+                self.fConn.execute("DELETE FROM plugins WHERE source = ? AND binary = ?", (source, binary))
+                self.fConn.executemany(self._getInsertQuery(), self._getRows(source, plugins, binary))
+
+    # removes the plugins of binaries not in binaries, if paths is set only binaries inside one of them are removed
+    def pruneBinaries(self, source, binaries, paths=None):
+        binaries = set(binaries)
+
+        with self.fConn:
+            for binary, in self.fConn.execute("SELECT DISTINCT binary FROM plugins WHERE source = ?", (source,)).fetchall():
+                if binary not in binaries and (paths is None or isPathInside(binary, paths)):
+                    self.fConn.execute("DELETE FROM plugins WHERE source = ? AND binary = ?", (source, binary))
+
+    def getValue(self, key, default):
+        row = self.fConn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else default
+
+    def setValue(self, key, value):
+        with self.fConn:
+            self.fConn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # -----------------------------------------------------------------------------------------------------------------
+
+    def _getInsertQuery(self):
+        columns = ", ".join(column for _, column, _ in PLUGIN_INDEX_COLUMNS)
+        values  = ", ".join("?" for _ in PLUGIN_INDEX_COLUMNS)
+
+        return "INSERT INTO plugins (source, binary, %s) VALUES (?, ?, %s)" % (columns, values)
+
+    def _getRows(self, source, plugins, binary):
+        for plugin in plugins:
+            for pinfo in (plugin if isinstance(plugin, list) else (plugin,)):
+                row = [source, binary if binary is not None else pinfo['filename']]
+
+                for key, _, _ in PLUGIN_INDEX_COLUMNS:
+                    row.append(pinfo[key])
+
+                yield row
+
+    def _createTables(self, version):
+        columns = ", ".join("%s %s" % (column, ctype) for _, column, ctype in PLUGIN_INDEX_COLUMNS)
+
+        with self.fConn:
+            self.fConn.execute("DROP TABLE IF EXISTS plugins")
+            self.fConn.execute("DROP TABLE IF EXISTS meta")
+            self.fConn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value)")
+            self.fConn.execute("CREATE TABLE plugins (id INTEGER PRIMARY KEY, source TEXT NOT NULL, "
+                               "binary TEXT NOT NULL, %s)" % columns)
+            self.fConn.execute("CREATE INDEX plugins_source ON plugins (source, binary)")
+            self.fConn.execute("CREATE INDEX plugins_type ON plugins (type)")
+            self.fConn.execute("CREATE INDEX plugins_build ON plugins (build)")
+            self.fConn.execute("CREATE INDEX plugins_hints ON plugins (hints)")
+            self.fConn.execute("CREATE INDEX plugins_name ON plugins (name COLLATE NOCASE)")
+            self.fConn.execute("CREATE INDEX plugins_maker ON plugins (maker COLLATE NOCASE)")
+            self.fConn.execute("PRAGMA user_version = %i" % version)
+
+    # one-time import of the plugin lists from the old settings based database
+    def _importFromSettings(self):
+        settingsDB = QSettings("falkTX", "CarlaPlugins4")
+
+        with self.fConn:
+            for source in (PLUGIN_INDEX_SOURCES_LADSPA + PLUGIN_INDEX_SOURCES_DSSI +
+                           PLUGIN_INDEX_SOURCES_VST2 + PLUGIN_INDEX_SOURCES_VST3 + PLUGIN_INDEX_SOURCES_OTHER):
+                plugins = [plugin for plugin in toList(settingsDB.value("Plugins/" + source, []))
+                           if isinstance(plugin, (dict, list))]
+
+                try:
+                    self.fConn.executemany(self._getInsertQuery(), self._getRows(source, plugins, None))
+                except (KeyError, TypeError):
+                    qWarning("PluginIndex::_importFromSettings() - ignoring invalid %s plugins" % source)
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Discovery Cache
+
+# Results of previous discoveries, one entry per binary.
+# An entry is valid while the binary (size, mtime and inode) and the discovery tool stay the same.
+# Scans with and without processing checks use separate sections, see SearchPluginsThread._getCacheSection().
+# Binaries that crashed or timed out are quarantined (skipped) under the same rules, until cleared.
+class DiscoveryCache(object):
+    def __init__(self):
+        self.fFilename   = os.path.join(getPluginDatabaseDir(), "CarlaDiscoveryCache.json")
+        self.fSections   = {}
+        self.fQuarantine = {}
+        self.fToolKeys   = {}
+
+    def load(self):
+        self.fSections   = {}
+        self.fQuarantine = {}
+
+        if not os.path.exists(self.fFilename):
+            return
+
+        try:
+            with open(self.fFilename, 'r') as fd:
+                data = jsonLoad(fd)
+        except (OSError, ValueError):
+            qWarning("DiscoveryCache::load() - failed to read '%s', ignoring it" % self.fFilename)
+            return
+
+        # quarantine does not depend on the API, the same binary will crash again
+        self.fQuarantine = data.get('quarantine', {})
+
+        if data.get('API') != PLUGIN_QUERY_API_VERSION:
+            return
+
+        self.fSections = data.get('sections', {})
+
+    def save(self):
+        data = {
+            'API': PLUGIN_QUERY_API_VERSION,
+            'sections': self.fSections,
+            'quarantine': self.fQuarantine
+        }
+
+        try:
+            os.makedirs(os.path.dirname(self.fFilename), exist_ok=True)
+            with open(self.fFilename + ".tmp", 'w') as fd:
+                jsonDump(data, fd)
+            os.replace(self.fFilename + ".tmp", self.fFilename)
+        except OSError:
+            qWarning("DiscoveryCache::save() - failed to write '%s'" % self.fFilename)
+
+    def clear(self):
+        self.fSections = {}
+
+    def getKey(self, filename, tool):
+        if tool not in self.fToolKeys:
+            try:
+                self.fToolKeys[tool] = os.stat(tool).st_mtime_ns
+            except OSError:
+                self.fToolKeys[tool] = 0
+
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+
+        key = [stat.st_size, stat.st_mtime_ns, stat.st_ino, self.fToolKeys[tool]]
+
+        # the directory of a bundle stays the same when the binary inside is replaced
+        if S_ISDIR(stat.st_mode):
+            key += self._getBundleKey(filename)
+
+        return key
+
+    def getPlugins(self, section, filename, key):
+        entry = self.fSections.get(section, {}).get(filename)
+
+        if entry is None or key is None or entry['key'] != key:
+            return None
+
+        return entry['plugins']
+
+    def setPlugins(self, section, filename, key, plugins):
+        if key is None:
+            return
+
+        self.fSections.setdefault(section, {})[filename] = {
+            'key': key,
+            'plugins': plugins
+        }
+
+        self.fQuarantine.get(section, {}).pop(filename, None)
+
+    # -----------------------------------------------------------------------------------------------------------------
+
+    def isQuarantined(self, section, filename, key):
+        entry = self.fQuarantine.get(section, {}).get(filename)
+
+        return entry is not None and key is not None and entry['key'] == key
+
+    def setQuarantined(self, section, filename, key, reason):
+        if key is None:
+            return
+
+        self.fQuarantine.setdefault(section, {})[filename] = {
+            'key': key,
+            'reason': reason,
+            'time': int(time())
+        }
+
+        self.fSections.get(section, {}).pop(filename, None)
+
+    # list of (filename, reason, time), sorted by filename
+    def getQuarantined(self):
+        quarantined = []
+
+        for entries in self.fQuarantine.values():
+            for filename, entry in entries.items():
+                quarantined.append((filename, entry['reason'], entry['time']))
+
+        quarantined.sort()
+        return quarantined
+
+    def clearQuarantine(self):
+        self.fQuarantine = {}
+
+    # -----------------------------------------------------------------------------------------------------------------
+
+    # drop entries of binaries that were not found anymore, if paths is set only those inside one of them
+    def prune(self, section, filenames, paths=None):
+        filenames = set(filenames)
+
+        for entries in (self.fSections.get(section), self.fQuarantine.get(section)):
+            if entries is None:
+                continue
+
+            for filename in [filename for filename in entries
+                             if filename not in filenames and (paths is None or isPathInside(filename, paths))]:
+                del entries[filename]
+
+    # -----------------------------------------------------------------------------------------------------------------
+
+    # Number of files, and size and mtime of the newest one, in Contents/ and its direct subdirectories.
+    # That is where bundles keep their binaries (like Contents/MacOS or Contents/x86_64-linux) and Info.plist.
+    def _getBundleKey(self, bundle):
+        contents = os.path.join(bundle, "Contents")
+        dirs  = [contents]
+        count = 0
+        newest = (0, 0)
+
+        while len(dirs) != 0:
+            path = dirs.pop()
+
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if entry.is_dir():
+                            if path == contents:
+                                dirs.append(entry.path)
+                            continue
+
+                        stat = entry.stat()
+                        count += 1
+                        newest = max(newest, (stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                pass
+
+        return [count, newest[1], newest[0]]
+
 # ---------------------------------------------------------------------------------------------------------------------
 # Separate Thread for Plugin Search
 
 class SearchPluginsThread(QThread):
     pluginLook = pyqtSignal(int, str)
+    pluginsFound = pyqtSignal(str, str, list)
 
     def __init__(self, parent, pathBinaries):
         QThread.__init__(self, parent)
 
         self.fContinueChecking = False
         self.fPathBinaries     = pathBinaries
+        self.fJobCount         = os.cpu_count() or 1
+        self.fIncremental      = True
+        self.fTimeout          = DISCOVERY_DEFAULT_TIMEOUT
+        self.fCache            = DiscoveryCache()
+        self.fLastCacheSave    = 0.0
+        self.fPluginIndex      = None
+        self.fChangedPaths     = None
+        self.fLowPriority      = False
+        self.fDoChecks         = None
 
         self.fCheckNative  = False
         self.fCheckPosix32 = False
@@ -427,6 +1123,28 @@ class SearchPluginsThread(QThread):
         self.fCheckWin32   = win32
         self.fCheckWin64   = win64
 
+    def setSearchJobCount(self, count):
+        self.fJobCount = max(1, count)
+
+    def setSearchIncremental(self, incremental):
+        self.fIncremental = incremental
+
+    def setSearchTimeout(self, timeout):
+        self.fTimeout = timeout
+
+    # only look inside these directories (within the configured paths), binaries elsewhere are left untouched
+    def setSearchChangedPaths(self, paths):
+        self.fChangedPaths = paths
+
+    # runs the discovery tools with a lower CPU priority, for background rescans
+    def setSearchLowPriority(self, lowPriority):
+        self.fLowPriority = lowPriority
+
+    # runs processing checks during discovery or not, by default the CARLA_DISCOVERY_NO_PROCESSING_CHECKS
+    # environment variable decides
+    def setSearchProcessingChecks(self, doChecks):
+        self.fDoChecks = doChecks
+
     def setSearchPluginTypes(self, ladspa, dssi, lv2, vst2, vst3, au, sf2, sfz):
         self.fCheckLADSPA = ladspa
         self.fCheckDSSI   = dssi
@@ -441,7 +1159,23 @@ class SearchPluginsThread(QThread):
         self.fContinueChecking = False
 
     def run(self):
-        settingsDB = QSettings("falkTX", "CarlaPlugins4")
+        self.fCache.load()
+
+        if not self.fIncremental:
+            self.fCache.clear()
+
+        self.fLastCacheSave = time()
+        self.fPluginIndex   = PluginIndex()
+
+        try:
+            self._run()
+        finally:
+            self.fCache.save()
+            self.fPluginIndex.close()
+            self.fPluginIndex = None
+
+    def _run(self):
+        pluginIndex = self.fPluginIndex
 
         self.fContinueChecking = True
         self.fCurCount = 0
@@ -538,33 +1272,27 @@ class SearchPluginsThread(QThread):
             rdfPadValue = self.fCurPercentValue * checkValue
 
             if self.fCheckNative:
-                plugins = self._checkLADSPA(OS, self.fToolNative)
-                settingsDB.setValue("Plugins/LADSPA_native", plugins)
+                self._checkLADSPA(OS, self.fToolNative)
                 if not self.fContinueChecking: return
 
             if self.fCheckPosix32:
-                plugins = self._checkLADSPA(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix32"))
-                settingsDB.setValue("Plugins/LADSPA_posix32", plugins)
+                self._checkLADSPA(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix32"))
                 if not self.fContinueChecking: return
 
             if self.fCheckPosix64:
-                plugins = self._checkLADSPA(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix64"))
-                settingsDB.setValue("Plugins/LADSPA_posix64", plugins)
+                self._checkLADSPA(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix64"))
                 if not self.fContinueChecking: return
 
             if self.fCheckWin32:
-                plugins = self._checkLADSPA("WINDOWS", os.path.join(self.fPathBinaries, "carla-discovery-win32.exe"), not WINDOWS)
-                settingsDB.setValue("Plugins/LADSPA_win32", plugins)
+                self._checkLADSPA("WINDOWS", os.path.join(self.fPathBinaries, "carla-discovery-win32.exe"), not WINDOWS)
                 if not self.fContinueChecking: return
 
             if self.fCheckWin64:
-                plugins = self._checkLADSPA("WINDOWS", os.path.join(self.fPathBinaries, "carla-discovery-win64.exe"), not WINDOWS)
-                settingsDB.setValue("Plugins/LADSPA_win64", plugins)
+                self._checkLADSPA("WINDOWS", os.path.join(self.fPathBinaries, "carla-discovery-win64.exe"), not WINDOWS)
 
-            settingsDB.sync()
             if not self.fContinueChecking: return
 
-            if haveLRDF and checkValue > 0:
+            if haveLRDF and checkValue > 0 and self.fChangedPaths is None:
                 startValue = self.fLastCheckValue - rdfPadValue
 
                 self._pluginLook(startValue, "LADSPA RDFs...")
@@ -583,395 +1311,714 @@ class SearchPluginsThread(QThread):
 
         if self.fCheckDSSI:
             if self.fCheckNative:
-                plugins = self._checkDSSI(OS, self.fToolNative)
-                settingsDB.setValue("Plugins/DSSI_native", plugins)
+                self._checkDSSI(OS, self.fToolNative)
                 if not self.fContinueChecking: return
 
             if self.fCheckPosix32:
-                plugins = self._checkDSSI(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix32"))
-                settingsDB.setValue("Plugins/DSSI_posix32", plugins)
+                self._checkDSSI(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix32"))
                 if not self.fContinueChecking: return
 
             if self.fCheckPosix64:
-                plugins = self._checkDSSI(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix64"))
-                settingsDB.setValue("Plugins/DSSI_posix64", plugins)
+                self._checkDSSI(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix64"))
                 if not self.fContinueChecking: return
 
             if self.fCheckWin32:
-                plugins = self._checkDSSI("WINDOWS", os.path.join(self.fPathBinaries, "carla-discovery-win32.exe"), not WINDOWS)
-                settingsDB.setValue("Plugins/DSSI_win32", plugins)
+                self._checkDSSI("WINDOWS", os.path.join(self.fPathBinaries, "carla-discovery-win32.exe"), not WINDOWS)
                 if not self.fContinueChecking: return
 
             if self.fCheckWin64:
-                plugins = self._checkDSSI("WINDOWS", os.path.join(self.fPathBinaries, "carla-discovery-win64.exe"), not WINDOWS)
-                settingsDB.setValue("Plugins/DSSI_win64", plugins)
+                self._checkDSSI("WINDOWS", os.path.join(self.fPathBinaries, "carla-discovery-win64.exe"), not WINDOWS)
 
-            settingsDB.sync()
             if not self.fContinueChecking: return
 
         if self.fCheckLV2:
             plugins = self._checkCached(True)
-            settingsDB.setValue("Plugins/LV2", plugins)
-            settingsDB.sync()
+            pluginIndex.setPlugins("LV2", plugins)
             if not self.fContinueChecking: return
 
         if self.fCheckVST2:
             if self.fCheckNative:
-                plugins = self._checkVST2(OS, self.fToolNative)
-                settingsDB.setValue("Plugins/VST2_native", plugins)
+                self._checkVST2(OS, self.fToolNative)
                 if not self.fContinueChecking: return
 
             if self.fCheckPosix32:
-                plugins = self._checkVST2(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix32"))
-                settingsDB.setValue("Plugins/VST2_posix32", plugins)
+                self._checkVST2(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix32"))
                 if not self.fContinueChecking: return
 
             if self.fCheckPosix64:
-                plugins = self._checkVST2(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix64"))
-                settingsDB.setValue("Plugins/VST2_posix64", plugins)
+                self._checkVST2(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix64"))
                 if not self.fContinueChecking: return
 
             if self.fCheckWin32:
-                plugins = self._checkVST2("WINDOWS", os.path.join(self.fPathBinaries, "carla-discovery-win32.exe"), not WINDOWS)
-                settingsDB.setValue("Plugins/VST2_win32", plugins)
+                self._checkVST2("WINDOWS", os.path.join(self.fPathBinaries, "carla-discovery-win32.exe"), not WINDOWS)
                 if not self.fContinueChecking: return
 
             if self.fCheckWin64:
-                plugins = self._checkVST2("WINDOWS", os.path.join(self.fPathBinaries, "carla-discovery-win64.exe"), not WINDOWS)
-                settingsDB.setValue("Plugins/VST2_win64", plugins)
+                self._checkVST2("WINDOWS", os.path.join(self.fPathBinaries, "carla-discovery-win64.exe"), not WINDOWS)
                 if not self.fContinueChecking: return
 
-            settingsDB.sync()
             if not self.fContinueChecking: return
 
         if self.fCheckVST3:
             if self.fCheckNative and (MACOS or WINDOWS):
-                plugins = self._checkVST3(OS, self.fToolNative)
-                settingsDB.setValue("Plugins/VST3_native", plugins)
+                self._checkVST3(OS, self.fToolNative)
                 if not self.fContinueChecking: return
 
             if self.fCheckPosix32:
-                plugins = self._checkVST3(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix32"))
-                settingsDB.setValue("Plugins/VST3_posix32", plugins)
+                self._checkVST3(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix32"))
                 if not self.fContinueChecking: return
 
             if self.fCheckPosix64:
-                plugins = self._checkVST3(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix64"))
-                settingsDB.setValue("Plugins/VST3_posix64", plugins)
+                self._checkVST3(OS, os.path.join(self.fPathBinaries, "carla-discovery-posix64"))
                 if not self.fContinueChecking: return
 
             if self.fCheckWin32:
-                plugins = self._checkVST3("WINDOWS", os.path.join(self.fPathBinaries, "carla-discovery-win32.exe"), not WINDOWS)
-                settingsDB.setValue("Plugins/VST3_win32", plugins)
+                self._checkVST3("WINDOWS", os.path.join(self.fPathBinaries, "carla-discovery-win32.exe"), not WINDOWS)
                 if not self.fContinueChecking: return
 
             if self.fCheckWin64:
-                plugins = self._checkVST3("WINDOWS", os.path.join(self.fPathBinaries, "carla-discovery-win64.exe"), not WINDOWS)
-                settingsDB.setValue("Plugins/VST3_win64", plugins)
+                self._checkVST3("WINDOWS", os.path.join(self.fPathBinaries, "carla-discovery-win64.exe"), not WINDOWS)
                 if not self.fContinueChecking: return
 
-            settingsDB.sync()
             if not self.fContinueChecking: return
 
         if self.fCheckAU:
             if self.fCheckNative:
                 plugins = self._checkCached(False)
-                settingsDB.setValue("Plugins/AU", plugins)
-                settingsDB.sync()
+                pluginIndex.setPlugins("AU", plugins)
                 if not self.fContinueChecking: return
 
             if self.fCheckPosix32:
                 plugins = self._checkAU(os.path.join(self.fPathBinaries, "carla-discovery-posix32"))
-                settingsDB.setValue("Plugins/AU_posix32", self.fAuPlugins)
+                pluginIndex.setPlugins("AU_posix32", plugins)
                 if not self.fContinueChecking: return
 
-            settingsDB.sync()
             if not self.fContinueChecking: return
 
         if self.fCheckSF2:
             settings = QSettings("falkTX", "Carla2")
-            SF2_PATH = toList(settings.value(CARLA_KEY_PATHS_SF2, CARLA_DEFAULT_SF2_PATH))
+            SF2_PATH = self._getSearchPaths(toList(settings.value(CARLA_KEY_PATHS_SF2, CARLA_DEFAULT_SF2_PATH)))
             del settings
 
-            kits = self._checkKIT(SF2_PATH, "sf2")
-            settingsDB.setValue("Plugins/SF2", kits)
-            settingsDB.sync()
+            self._checkKIT(SF2_PATH, "sf2")
             if not self.fContinueChecking: return
 
         if self.fCheckSFZ:
             kits = self._checkSfzCached()
-            settingsDB.setValue("Plugins/SFZ", kits)
-            settingsDB.sync()
+            pluginIndex.setPlugins("SFZ", kits)
 
     def _checkLADSPA(self, OS, tool, isWine=False):
-        ladspaBinaries = []
         ladspaPlugins = []
 
         self._pluginLook(self.fLastCheckValue, "LADSPA plugins...")
 
         settings = QSettings("falkTX", "Carla2")
-        LADSPA_PATH = toList(settings.value(CARLA_KEY_PATHS_LADSPA, CARLA_DEFAULT_LADSPA_PATH))
+        LADSPA_PATH = self._getSearchPaths(toList(settings.value(CARLA_KEY_PATHS_LADSPA, CARLA_DEFAULT_LADSPA_PATH)))
         del settings
 
-        for iPATH in LADSPA_PATH:
-            binaries = findBinaries(iPATH, OS)
-            for binary in binaries:
-                if binary not in ladspaBinaries:
-                    ladspaBinaries.append(binary)
-
-        ladspaBinaries.sort()
+        ladspaBinaries = sorted(findBinaries(LADSPA_PATH, OS))
 
         if not self.fContinueChecking:
             return ladspaPlugins
 
-        for i in range(len(ladspaBinaries)):
-            ladspa  = ladspaBinaries[i]
-            percent = ( float(i) / len(ladspaBinaries) ) * self.fCurPercentValue
-            self._pluginLook((self.fLastCheckValue + percent) * 0.9, ladspa)
-
-            plugins = checkPluginLADSPA(ladspa, tool, self.fWineSettings if isWine else None)
-            if plugins:
-                ladspaPlugins.append(plugins)
-
-            if not self.fContinueChecking:
-                break
+        wineSettings  = self.fWineSettings if isWine else None
+        ladspaPlugins = self._runDiscovery(PLUGIN_LADSPA, "LADSPA", tool, wineSettings, LADSPA_PATH, ladspaBinaries, 0.9)
 
         self.fLastCheckValue += self.fCurPercentValue
         return ladspaPlugins
 
     def _checkDSSI(self, OS, tool, isWine=False):
-        dssiBinaries = []
         dssiPlugins = []
 
         self._pluginLook(self.fLastCheckValue, "DSSI plugins...")
 
         settings = QSettings("falkTX", "Carla2")
-        DSSI_PATH = toList(settings.value(CARLA_KEY_PATHS_DSSI, CARLA_DEFAULT_DSSI_PATH))
+        DSSI_PATH = self._getSearchPaths(toList(settings.value(CARLA_KEY_PATHS_DSSI, CARLA_DEFAULT_DSSI_PATH)))
         del settings
 
-        for iPATH in DSSI_PATH:
-            binaries = findBinaries(iPATH, OS)
-            for binary in binaries:
-                if binary not in dssiBinaries:
-                    dssiBinaries.append(binary)
-
-        dssiBinaries.sort()
+        dssiBinaries = sorted(findBinaries(DSSI_PATH, OS))
 
         if not self.fContinueChecking:
             return dssiPlugins
 
-        for i in range(len(dssiBinaries)):
-            dssi    = dssiBinaries[i]
-            percent = ( float(i) / len(dssiBinaries) ) * self.fCurPercentValue
-            self._pluginLook(self.fLastCheckValue + percent, dssi)
+        wineSettings = self.fWineSettings if isWine else None
+        dssiPlugins  = self._runDiscovery(PLUGIN_DSSI, "DSSI", tool, wineSettings, DSSI_PATH, dssiBinaries)
+
+        self.fLastCheckValue += self.fCurPercentValue
+        return dssiPlugins
+
+    def _checkVST2(self, OS, tool, isWine=False):
+        vst2Plugins = []
+
+        if MACOS and not isWine:
+            self._pluginLook(self.fLastCheckValue, "VST2 bundles...")
+        else:
+            self._pluginLook(self.fLastCheckValue, "VST2 plugins...")
+
+        settings = QSettings("falkTX", "Carla2")
+        VST2_PATH = self._getSearchPaths(toList(settings.value(CARLA_KEY_PATHS_VST2, CARLA_DEFAULT_VST2_PATH)))
+        del settings
+
+        if MACOS and not isWine:
+            vst2Binaries = sorted(findMacVSTBundles(VST2_PATH, False))
+        else:
+            vst2Binaries = sorted(findBinaries(VST2_PATH, OS))
+
+        if not self.fContinueChecking:
+            return vst2Plugins
+
+        wineSettings = self.fWineSettings if isWine else None
+        vst2Plugins  = self._runDiscovery(PLUGIN_VST2, "VST2", tool, wineSettings, VST2_PATH, vst2Binaries)
+
+        self.fLastCheckValue += self.fCurPercentValue
+        return vst2Plugins
+
+    def _checkVST3(self, OS, tool, isWine=False):
+        vst3Plugins = []
+
+        if MACOS and not isWine:
+            self._pluginLook(self.fLastCheckValue, "VST2 bundles...")
+        else:
+            self._pluginLook(self.fLastCheckValue, "VST2 plugins...")
+
+        settings = QSettings("falkTX", "Carla2")
+        VST3_PATH = self._getSearchPaths(toList(settings.value(CARLA_KEY_PATHS_VST3, CARLA_DEFAULT_VST3_PATH)))
+        del settings
+
+        if MACOS and not isWine:
+            vst3Binaries = sorted(findMacVSTBundles(VST3_PATH, True))
+        else:
+            vst3Binaries = sorted(findVST3Binaries(VST3_PATH))
+
+        if not self.fContinueChecking:
+            return vst3Plugins
+
+        wineSettings = self.fWineSettings if isWine else None
+        vst3Plugins  = self._runDiscovery(PLUGIN_VST3, "VST3", tool, wineSettings, VST3_PATH, vst3Binaries)
+
+        self.fLastCheckValue += self.fCurPercentValue
+        return vst3Plugins
+
+    def _checkAU(self, tool):
+        auPlugins = []
+
+        plugins = checkAllPluginsAU(tool)
+        if plugins:
+            auPlugins.append(plugins)
+
+        self.fLastCheckValue += self.fCurPercentValue
+        return auPlugins
+
+    def _checkKIT(self, kitPATH, kitExtension):
+        kitPlugins = []
+
+        kitFiles = sorted(findFilenames(kitPATH, kitExtension))
+
+        if not self.fContinueChecking:
+            return kitPlugins
+
+        if kitExtension == "sf2":
+            kitPlugins = self._runDiscovery(PLUGIN_SF2, "SF2", self.fToolNative, None, kitPATH, kitFiles)
+
+        self.fLastCheckValue += self.fCurPercentValue
+        return kitPlugins
+
+    def _checkCached(self, isLV2):
+        if isLV2:
+            settings  = QSettings("falkTX", "Carla2")
+            PLUG_PATH = splitter.join(toList(settings.value(CARLA_KEY_PATHS_LV2, CARLA_DEFAULT_LV2_PATH)))
+            del settings
+            PLUG_TEXT = "LV2"
+            PLUG_TYPE = PLUGIN_LV2
+        else: # AU
+            PLUG_PATH = ""
+            PLUG_TEXT = "AU"
+            PLUG_TYPE = PLUGIN_AU
+
+        plugins = []
+        self._pluginLook(self.fLastCheckValue, "{} plugins...".format(PLUG_TEXT))
+
+        count = gCarla.utils.get_cached_plugin_count(PLUG_TYPE, PLUG_PATH)
 
-            plugins = checkPluginDSSI(dssi, tool, self.fWineSettings if isWine else None)
-            if plugins:
-                dssiPlugins.append(plugins)
+        if not self.fContinueChecking:
+            return plugins
+
+        for i in range(count):
+            descInfo = gCarla.utils.get_cached_plugin_info(PLUG_TYPE, i)
+
+            percent = ( float(i) / count ) * self.fCurPercentValue
+            self._pluginLook(self.fLastCheckValue + percent, descInfo['label'])
+
+            if not descInfo['valid']:
+                continue
+
+            plugins.append(checkPluginCached(descInfo, PLUG_TYPE))
 
             if not self.fContinueChecking:
                 break
 
         self.fLastCheckValue += self.fCurPercentValue
-        return dssiPlugins
+        return plugins
 
-    def _checkVST2(self, OS, tool, isWine=False):
-        vst2Binaries = []
-        vst2Plugins = []
+    def _checkSfzCached(self):
+        settings  = QSettings("falkTX", "Carla2")
+        PLUG_PATH = splitter.join(toList(settings.value(CARLA_KEY_PATHS_SFZ, CARLA_DEFAULT_SFZ_PATH)))
+        del settings
+
+        sfzKits = []
+        self._pluginLook(self.fLastCheckValue, "SFZ kits...")
+
+        count = gCarla.utils.get_cached_plugin_count(PLUGIN_SFZ, PLUG_PATH)
+
+        if not self.fContinueChecking:
+            return sfzKits
+
+        for i in range(count):
+            descInfo = gCarla.utils.get_cached_plugin_info(PLUGIN_SFZ, i)
+
+            percent = ( float(i) / count ) * self.fCurPercentValue
+            self._pluginLook(self.fLastCheckValue + percent, descInfo['label'])
+
+            if not descInfo['valid']:
+                continue
+
+            sfzKits.append(checkPluginCached(descInfo, PLUGIN_SFZ))
+
+            if not self.fContinueChecking:
+                break
+
+        self.fLastCheckValue += self.fCurPercentValue
+        return sfzKits
+
+    # Checks all filenames with up to fJobCount discovery processes at once, each one running in batch mode.
+    # Binaries that did not change since the last scan with the same tool are taken from the cache.
+    # Results are written to the plugin index as they arrive (in small batches), and announced with pluginsFound.
+    # Results keep the order of filenames, progress is reported as each one finishes.
+    def _runDiscovery(self, itype, stype, tool, wineSettings, searchPaths, filenames, progressScale=1.0):
+        section = self._getCacheSection(stype, tool)
+        source  = self._getIndexSource(stype, tool)
+        results = [None] * len(filenames)
+        keys    = [self.fCache.getKey(filename, tool) for filename in filenames]
+        pending = []
+
+        quarantined = 0
+
+        for i in range(len(filenames)):
+            if self.fCache.isQuarantined(section, filenames[i], keys[i]):
+                quarantined += 1
+                continue
+
+            results[i] = self.fCache.getPlugins(section, filenames[i], keys[i])
+
+            if results[i] is None:
+                pending.append(i)
+
+        if quarantined != 0:
+            print("carla-discovery::info::skipping %i quarantined %s binaries" % (quarantined, stype))
+
+        if len(filenames) - quarantined != len(pending):
+            print("carla-discovery::info::%i of %i %s binaries unchanged, using cached results" % (
+                  len(filenames) - quarantined - len(pending), len(filenames), stype))
+
+        # make sure the index has what the cache has, in case it was reset or a previous scan was interrupted
+        self.fPluginIndex.setBinaryPlugins(source, [(filenames[i], results[i])
+                                                    for i in range(len(filenames)) if results[i] is not None])
+
+        if len(pending) != 0:
+            self._runDiscoveryJobs(itype, stype, tool, wineSettings, filenames, progressScale,
+                                   section, source, results, keys, pending)
+
+        # only complete scans know which binaries are gone, and partial ones only inside the paths they looked into
+        if self.fContinueChecking:
+            prunePaths = searchPaths if self.fChangedPaths is not None else None
+            self.fCache.prune(section, filenames, prunePaths)
+            self.fPluginIndex.pruneBinaries(source, filenames, prunePaths)
+
+        return [plugins for plugins in results if plugins]
+
+    def _runDiscoveryJobs(self, itype, stype, tool, wineSettings, filenames, progressScale,
+                          section, source, results, keys, pending):
+        jobCount = min(self.fJobCount, len(pending))
+        batches  = Queue()
+
+        for _ in range(jobCount):
+            batches.put(CarlaDiscoveryBatch(itype, stype, tool, wineSettings, self.fTimeout, self.fLowPriority,
+                                            self.fDoChecks, lambda: self.fContinueChecking))
+
+        def runCheck(filename):
+            if not self.fContinueChecking:
+                return (None, DISCOVERY_SKIPPED)
+
+            batch = batches.get()
+
+            try:
+                return batch.check(filename)
+            finally:
+                batches.put(batch)
+
+        # binaries done since the last write to the index
+        found = []
+        lastFlush = time()
+
+        with ThreadPoolExecutor(max_workers=jobCount) as executor:
+            futures = dict((executor.submit(runCheck, filenames[i]), i) for i in pending)
+            done    = len(filenames) - len(pending)
+
+            for future in as_completed(futures):
+                i = futures[future]
+                done += 1
+
+                if future.cancelled():
+                    continue
+
+                try:
+                    results[i], status = future.result()
+                except Exception as e:
+                    print("carla-discovery::error::%s - %s" % (e, filenames[i]))
+                    results[i], status = None, DISCOVERY_SKIPPED
+
+                # only complete scans are cached, a skipped one might have been killed halfway
+                if not self.fContinueChecking:
+                    pass
+                elif status in (DISCOVERY_CRASH, DISCOVERY_TIMEOUT):
+                    print("carla-discovery::quarantine::%s during discovery - %s" % (status, filenames[i]))
+                    self.fCache.setQuarantined(section, filenames[i], keys[i], status)
+                    found.append((filenames[i], []))
+                elif status == DISCOVERY_OK and results[i] is not None:
+                    self.fCache.setPlugins(section, filenames[i], keys[i], results[i])
+                    found.append((filenames[i], results[i]))
+
+                if len(found) >= 32 or (len(found) != 0 and time() - lastFlush >= 0.5):
+                    self._flushFound(stype, source, found)
+                    found = []
+                    lastFlush = time()
+
+                if self.fContinueChecking:
+                    percent = ( float(done) / len(filenames) ) * self.fCurPercentValue
+                    self._pluginLook((self.fLastCheckValue + percent) * progressScale, filenames[i])
+                    continue
+
+                # cancelled, do not start anything new and kill what is still running
+                for other in futures:
+                    other.cancel()
+
+                killDiscovery()
+
+        while not batches.empty():
+            batches.get().close()
+
+        if len(found) != 0:
+            self._flushFound(stype, source, found)
+
+    # writes discovery results of some binaries to the index and cache, so an interrupted scan can resume from here
+    def _flushFound(self, stype, source, found):
+        self.fPluginIndex.setBinaryPlugins(source, found)
+        self.pluginsFound.emit(stype, source, found)
+
+        if time() - self.fLastCacheSave >= 2.0:
+            self.fCache.save()
+            self.fLastCacheSave = time()
+
+    # the directories to look into for plugin paths, see setSearchChangedPaths()
+    def _getSearchPaths(self, paths):
+        if self.fChangedPaths is None:
+            return paths
+
+        # changed directories inside the plugin paths, and plugin paths inside changed directories
+        searchPaths = [path for path in self.fChangedPaths if isPathInside(path, paths)]
+
+        for path in paths:
+            if isPathInside(path, self.fChangedPaths) and not isPathInside(path, searchPaths):
+                searchPaths.append(path)
+
+        return searchPaths
+
+    # cache section of a discovery, results (and crashes) also depend on running the processing checks or not
+    def _getCacheSection(self, stype, tool):
+        if self.fDoChecks is not None:
+            doChecks = self.fDoChecks
+        else:
+            doChecks = os.getenv("CARLA_DISCOVERY_NO_PROCESSING_CHECKS") is None
+
+        if not doChecks:
+            return "%s:%s:nochecks" % (stype, tool)
+
+        return "%s:%s" % (stype, tool)
+
+    # index source of a discovery, see PLUGIN_INDEX_SOURCES_*
+    def _getIndexSource(self, stype, tool):
+        if stype == "SF2":
+            return "SF2"
+
+        if tool == self.fToolNative:
+            return stype + "_native"
+
+        return stype + "_" + os.path.basename(tool).rsplit("-", 1)[-1].replace(".exe", "")
+
+    def _pluginLook(self, percent, plugin):
+        self.pluginLook.emit(percent, plugin)
 
-        if MACOS and not isWine:
-            self._pluginLook(self.fLastCheckValue, "VST2 bundles...")
-        else:
-            self._pluginLook(self.fLastCheckValue, "VST2 plugins...")
+# ---------------------------------------------------------------------------------------------------------------------
+# Background watcher of plugin paths
 
-        settings = QSettings("falkTX", "Carla2")
-        VST2_PATH = toList(settings.value(CARLA_KEY_PATHS_VST2, CARLA_DEFAULT_VST2_PATH))
-        del settings
+# Only directories are watched, not every file, each one takes a watch descriptor (inotify on Linux).
+# Directories are added breadth-first, so past this limit only the deepest ones are left out.
+# Bundles are the exception, the binary directories inside them and their files are watched too.
+PLUGIN_WATCH_MAX_DIRS = 1000
 
-        for iPATH in VST2_PATH:
-            if MACOS and not isWine:
-                binaries = findMacVSTBundles(iPATH, False)
-            else:
-                binaries = findBinaries(iPATH, OS)
-            for binary in binaries:
-                if binary not in vst2Binaries:
-                    vst2Binaries.append(binary)
+# Wait this long (in ms) after the last change before rescanning, so installs and copies finish first
+PLUGIN_WATCH_DELAY = 5000
 
-        vst2Binaries.sort()
+# Watches the plugin paths of the types enabled in the refresh dialog.
+# Changed directories are rescanned in the background, thanks to the discovery cache only binaries
+# that are new or changed are checked, and plugins of removed binaries are dropped from the index.
+class PluginPathWatcher(QObject):
+    # a rescan finished, or was stopped and its thread is done
+    rescanFinished = pyqtSignal()
 
-        if not self.fContinueChecking:
-            return vst2Plugins
+    def __init__(self, parent, pathBinaries):
+        QObject.__init__(self, parent)
 
-        for i in range(len(vst2Binaries)):
-            vst2    = vst2Binaries[i]
-            percent = ( float(i) / len(vst2Binaries) ) * self.fCurPercentValue
-            self._pluginLook(self.fLastCheckValue + percent, vst2)
+        self.fPathBinaries = pathBinaries
+        self.fWatcher      = None
+        self.fThread       = None
+        self.fChangedPaths = set()
 
-            plugins = checkPluginVST2(vst2, tool, self.fWineSettings if isWine else None)
-            if plugins:
-                vst2Plugins.append(plugins)
+        # watched paths inside bundles, mapped to the directory the bundle is in
+        self.fBundlePaths  = {}
 
-            if not self.fContinueChecking:
-                break
+        self.fTimer = QTimer(self)
+        self.fTimer.setInterval(PLUGIN_WATCH_DELAY)
+        self.fTimer.setSingleShot(True)
+        self.fTimer.timeout.connect(self.slot_rescan)
 
-        self.fLastCheckValue += self.fCurPercentValue
-        return vst2Plugins
+    def isEnabled(self):
+        return QSettings("falkTX", "CarlaRefresh2").value("PluginDatabase/WatchPaths", False, type=bool)
 
-    def _checkVST3(self, OS, tool, isWine=False):
-        vst3Binaries = []
-        vst3Plugins = []
+    def isRescanning(self):
+        return self.fThread is not None
 
-        if MACOS and not isWine:
-            self._pluginLook(self.fLastCheckValue, "VST2 bundles...")
-        else:
-            self._pluginLook(self.fLastCheckValue, "VST2 plugins...")
+    # (re)starts watching, if enabled, with the current paths and settings
+    def reload(self):
+        self.stop()
 
-        settings = QSettings("falkTX", "Carla2")
-        VST3_PATH = toList(settings.value(CARLA_KEY_PATHS_VST3, CARLA_DEFAULT_VST3_PATH))
-        del settings
+        if not self.isEnabled():
+            return
 
-        for iPATH in VST3_PATH:
-            if MACOS and not isWine:
-                binaries = findMacVSTBundles(iPATH, True)
-            else:
-                binaries = findVST3Binaries(iPATH)
-            for binary in binaries:
-                if binary not in vst3Binaries:
-                    vst3Binaries.append(binary)
+        self.fWatcher = QFileSystemWatcher(self)
+        self.fWatcher.directoryChanged.connect(self.slot_directoryChanged)
+        self.fWatcher.fileChanged.connect(self.slot_directoryChanged)
 
-        vst3Binaries.sort()
+        self._watchDirectories(self._getRoots())
 
-        if not self.fContinueChecking:
-            return vst3Plugins
+    # Stops watching, and cancels a running rescan.
+    # The rescan thread is only waited for if wait is set, otherwise see isRescanning() and rescanFinished.
+    def stop(self, wait=False):
+        self.fTimer.stop()
+        self.fChangedPaths.clear()
 
-        for i in range(len(vst3Binaries)):
-            vst3    = vst3Binaries[i]
-            percent = ( float(i) / len(vst3Binaries) ) * self.fCurPercentValue
-            self._pluginLook(self.fLastCheckValue + percent, vst3)
+        if self.fThread is not None:
+            self.fThread.stop()
+            killDiscovery()
 
-            plugins = checkPluginVST3(vst3, tool, self.fWineSettings if isWine else None)
-            if plugins:
-                vst3Plugins.append(plugins)
+            if wait:
+                self.fThread.wait()
 
-            if not self.fContinueChecking:
-                break
+        if self.fWatcher is not None:
+            self.fWatcher.directoryChanged.disconnect(self.slot_directoryChanged)
+            self.fWatcher.fileChanged.disconnect(self.slot_directoryChanged)
+            self.fWatcher.deleteLater()
+            self.fWatcher = None
 
-        self.fLastCheckValue += self.fCurPercentValue
-        return vst3Plugins
+        self.fBundlePaths.clear()
 
-    def _checkAU(self, tool):
-        auPlugins = []
+    # -----------------------------------------------------------------------------------------------------------------
 
-        plugins = checkAllPluginsAU(tool)
-        if plugins:
-            auPlugins.append(plugins)
+    @pyqtSlot(str)
+    def slot_directoryChanged(self, path):
+        # bundles are rescanned through the directory they are in, the cache notices the changed binary
+        self.fChangedPaths.add(self.fBundlePaths.get(path, path))
+        self.fTimer.start()
 
-        self.fLastCheckValue += self.fCurPercentValue
-        return auPlugins
+    @pyqtSlot()
+    def slot_rescan(self):
+        if self.fWatcher is None or len(self.fChangedPaths) == 0:
+            return
 
-    def _checkKIT(self, kitPATH, kitExtension):
-        kitFiles = []
-        kitPlugins = []
+        # try again later, changes seen meanwhile are not lost
+        if self.fThread is not None:
+            self.fTimer.start()
+            return
 
-        for iPATH in kitPATH:
-            files = findFilenames(iPATH, kitExtension)
-            for file_ in files:
-                if file_ not in kitFiles:
-                    kitFiles.append(file_)
+        # a directory inside another changed one is already rescanned with it
+        paths = []
+        for path in sorted(self.fChangedPaths):
+            if not isPathInside(path, paths):
+                paths.append(path)
 
-        kitFiles.sort()
+        self.fChangedPaths.clear()
 
-        if not self.fContinueChecking:
-            return kitPlugins
+        settings = QSettings("falkTX", "CarlaRefresh2")
 
-        for i in range(len(kitFiles)):
-            kit     = kitFiles[i]
-            percent = ( float(i) / len(kitFiles) ) * self.fCurPercentValue
-            self._pluginLook(self.fLastCheckValue + percent, kit)
+        def hasTool(tool):
+            return os.path.exists(os.path.join(self.fPathBinaries, tool))
+
+        self.fThread = SearchPluginsThread(self, self.fPathBinaries)
+        self.fThread.setSearchBinaryTypes(settings.value("PluginDatabase/SearchNative", True, type=bool),
+                                          settings.value("PluginDatabase/SearchPOSIX32", False, type=bool)
+                                            and hasTool("carla-discovery-posix32") and not WINDOWS,
+                                          settings.value("PluginDatabase/SearchPOSIX64", False, type=bool)
+                                            and hasTool("carla-discovery-posix64") and not WINDOWS,
+                                          settings.value("PluginDatabase/SearchWin32", False, type=bool)
+                                            and hasTool("carla-discovery-win32.exe"),
+                                          settings.value("PluginDatabase/SearchWin64", False, type=bool)
+                                            and hasTool("carla-discovery-win64.exe"))
+        self.fThread.setSearchPluginTypes(settings.value("PluginDatabase/SearchLADSPA", True, type=bool),
+                                          settings.value("PluginDatabase/SearchDSSI", True, type=bool),
+                                          False,
+                                          settings.value("PluginDatabase/SearchVST2", True, type=bool),
+                                          settings.value("PluginDatabase/SearchVST3", True, type=bool),
+                                          False,
+                                          settings.value("PluginDatabase/SearchSF2", False, type=bool),
+                                          False)
+        self.fThread.setSearchTimeout(settings.value("PluginDatabase/DiscoveryTimeout", DISCOVERY_DEFAULT_TIMEOUT, type=int))
+        self.fThread.setSearchJobCount(1)
+        self.fThread.setSearchIncremental(True)
+        self.fThread.setSearchChangedPaths(paths)
+        self.fThread.setSearchLowPriority(True)
+        self.fThread.setSearchProcessingChecks(settings.value("PluginDatabase/DoChecks", False, type=bool))
+        self.fThread.finished.connect(self.slot_rescanFinished)
+        self.fThread.start(QThread.LowestPriority)
+
+        # new subdirectories need to be watched too
+        self._watchDirectories(paths)
 
-            if kitExtension == "sf2":
-                plugins = checkFileSF2(kit, self.fToolNative)
-            else:
-                plugins = None
+    @pyqtSlot()
+    def slot_rescanFinished(self):
+        self.fThread.deleteLater()
+        self.fThread = None
 
-            if plugins:
-                kitPlugins.append(plugins)
+        if self.fWatcher is not None and len(self.fChangedPaths) != 0:
+            self.fTimer.start()
 
-            if not self.fContinueChecking:
-                break
+        self.rescanFinished.emit()
 
-        self.fLastCheckValue += self.fCurPercentValue
-        return kitPlugins
+    # -----------------------------------------------------------------------------------------------------------------
 
-    def _checkCached(self, isLV2):
-        if isLV2:
-            settings  = QSettings("falkTX", "Carla2")
-            PLUG_PATH = splitter.join(toList(settings.value(CARLA_KEY_PATHS_LV2, CARLA_DEFAULT_LV2_PATH)))
-            del settings
-            PLUG_TEXT = "LV2"
-            PLUG_TYPE = PLUGIN_LV2
-        else: # AU
-            PLUG_PATH = ""
-            PLUG_TEXT = "AU"
-            PLUG_TYPE = PLUGIN_AU
+    # plugin paths of the types that are scanned with carla-discovery, and that are enabled
+    def _getRoots(self):
+        refreshSettings = QSettings("falkTX", "CarlaRefresh2")
+        settings = QSettings("falkTX", "Carla2")
+        roots = []
+
+        if refreshSettings.value("PluginDatabase/SearchLADSPA", True, type=bool):
+            roots += toList(settings.value(CARLA_KEY_PATHS_LADSPA, CARLA_DEFAULT_LADSPA_PATH))
+        if refreshSettings.value("PluginDatabase/SearchDSSI", True, type=bool):
+            roots += toList(settings.value(CARLA_KEY_PATHS_DSSI, CARLA_DEFAULT_DSSI_PATH))
+        if refreshSettings.value("PluginDatabase/SearchVST2", True, type=bool):
+            roots += toList(settings.value(CARLA_KEY_PATHS_VST2, CARLA_DEFAULT_VST2_PATH))
+        if refreshSettings.value("PluginDatabase/SearchVST3", True, type=bool):
+            roots += toList(settings.value(CARLA_KEY_PATHS_VST3, CARLA_DEFAULT_VST3_PATH))
+        if refreshSettings.value("PluginDatabase/SearchSF2", False, type=bool):
+            roots += toList(settings.value(CARLA_KEY_PATHS_SF2, CARLA_DEFAULT_SF2_PATH))
+
+        return [root.rstrip(os.sep) or os.sep for root in roots if root and os.path.isdir(root)]
+
+    # watches roots and their subdirectories, breadth-first, until there are PLUGIN_WATCH_MAX_DIRS watches
+    def _watchDirectories(self, roots):
+        watched = set(self.fWatcher.directories() + self.fWatcher.files())
+        visited = set()
+        pending = deque(roots)
+        paths   = []
+
+        while len(pending) != 0 and len(watched) + len(paths) < PLUGIN_WATCH_MAX_DIRS:
+            path = pending.popleft()
 
-        plugins = []
-        self._pluginLook(self.fLastCheckValue, "{} plugins...".format(PLUG_TEXT))
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
 
-        count = gCarla.utils.get_cached_plugin_count(PLUG_TYPE, PLUG_PATH)
+            key = (stat.st_dev, stat.st_ino)
 
-        if not self.fContinueChecking:
-            return plugins
+            if key in visited:
+                continue
 
-        for i in range(count):
-            descInfo = gCarla.utils.get_cached_plugin_info(PLUG_TYPE, i)
+            visited.add(key)
 
-            percent = ( float(i) / count ) * self.fCurPercentValue
-            self._pluginLook(self.fLastCheckValue + percent, descInfo['label'])
+            if path not in watched:
+                paths.append(path)
 
-            if not descInfo['valid']:
+            try:
+                entries = os.scandir(path)
+            except OSError:
                 continue
 
-            plugins.append(checkPluginCached(descInfo, PLUG_TYPE))
+            with entries:
+                for entry in entries:
+                    try:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                    except OSError:
+                        continue
 
-            if not self.fContinueChecking:
-                break
+                    # bundles are found (and rescanned) through the directory they are in
+                    if entry.name.lower().endswith((".vst", ".vst3", ".lv2")):
+                        for bundlePath in self._getBundlePaths(entry.path):
+                            self.fBundlePaths[bundlePath] = path
 
-        self.fLastCheckValue += self.fCurPercentValue
-        return plugins
+                            if bundlePath not in watched:
+                                paths.append(bundlePath)
+                        continue
 
-    def _checkSfzCached(self):
-        settings  = QSettings("falkTX", "Carla2")
-        PLUG_PATH = splitter.join(toList(settings.value(CARLA_KEY_PATHS_SFZ, CARLA_DEFAULT_SFZ_PATH)))
-        del settings
+                    pending.append(entry.path)
 
-        sfzKits = []
-        self._pluginLook(self.fLastCheckValue, "SFZ kits...")
+        if len(pending) != 0:
+            print("carla-watcher::info::watching only %i plugin directories, "
+                  "deeper ones need a manual refresh" % PLUGIN_WATCH_MAX_DIRS)
 
-        count = gCarla.utils.get_cached_plugin_count(PLUGIN_SFZ, PLUG_PATH)
+        if len(paths) == 0:
+            return
 
-        if not self.fContinueChecking:
-            return sfzKits
+        failed = self.fWatcher.addPaths(paths)
 
-        for i in range(count):
-            descInfo = gCarla.utils.get_cached_plugin_info(PLUGIN_SFZ, i)
+        for path in failed:
+            self.fBundlePaths.pop(path, None)
 
-            percent = ( float(i) / count ) * self.fCurPercentValue
-            self._pluginLook(self.fLastCheckValue + percent, descInfo['label'])
+        if failed:
+            print("carla-watcher::warning::could not watch %i plugin directories, "
+                  "the system limit for watches was probably reached" % len(failed))
 
-            if not descInfo['valid']:
-                continue
+    # The binary directories of a bundle (Contents/ and its direct subdirectories but Resources, like Contents/MacOS
+    # or Contents/x86_64-linux) and the files in them.
+    # Binaries can be replaced in place, which only changes the file and not the directory.
+    def _getBundlePaths(self, bundle):
+        contents = os.path.join(bundle, "Contents")
+        dirs  = [contents]
+        paths = []
 
-            sfzKits.append(checkPluginCached(descInfo, PLUGIN_SFZ))
+        while len(dirs) != 0:
+            path = dirs.pop()
 
-            if not self.fContinueChecking:
-                break
+            try:
+                entries = os.scandir(path)
+            except OSError:
+                continue
 
-        self.fLastCheckValue += self.fCurPercentValue
-        return sfzKits
+            paths.append(path)
 
-    def _pluginLook(self, percent, plugin):
-        self.pluginLook.emit(percent, plugin)
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if path == contents and entry.name.lower() != "resources":
+                                dirs.append(entry.path)
+                        elif entry.is_file():
+                            paths.append(entry.path)
+                    except OSError:
+                        continue
+
+        return paths
 
 # ---------------------------------------------------------------------------------------------------------------------
 # Plugin Refresh Dialog
@@ -1111,6 +2158,7 @@ class PluginRefreshW(QDialog):
         # Load settings
 
         self.loadSettings()
+        self.updateQuarantine()
 
         # -------------------------------------------------------------------------------------------------------------
         # Hide bridges if disabled
@@ -1176,6 +2224,7 @@ class PluginRefreshW(QDialog):
         self.finished.connect(self.slot_saveSettings)
         self.ui.b_start.clicked.connect(self.slot_start)
         self.ui.b_skip.clicked.connect(self.slot_skip)
+        self.ui.b_clear_quarantine.clicked.connect(self.slot_clearQuarantine)
         self.ui.ch_native.clicked.connect(self.slot_checkTools)
         self.ui.ch_posix32.clicked.connect(self.slot_checkTools)
         self.ui.ch_posix64.clicked.connect(self.slot_checkTools)
@@ -1245,6 +2294,10 @@ class PluginRefreshW(QDialog):
         self.ui.ch_win64.setChecked(check)
 
         self.ui.ch_do_checks.setChecked(settings.value("PluginDatabase/DoChecks", False, type=bool))
+        self.ui.sb_jobs.setValue(settings.value("PluginDatabase/DiscoveryJobs", os.cpu_count() or 1, type=int))
+        self.ui.ch_incremental.setChecked(settings.value("PluginDatabase/Incremental", True, type=bool))
+        self.ui.ch_watch.setChecked(settings.value("PluginDatabase/WatchPaths", False, type=bool))
+        self.ui.sb_timeout.setValue(settings.value("PluginDatabase/DiscoveryTimeout", DISCOVERY_DEFAULT_TIMEOUT, type=int))
 
     # -----------------------------------------------------------------------------------------------------------------
 
@@ -1265,6 +2318,10 @@ class PluginRefreshW(QDialog):
         settings.setValue("PluginDatabase/SearchWin32", self.ui.ch_win32.isChecked())
         settings.setValue("PluginDatabase/SearchWin64", self.ui.ch_win64.isChecked())
         settings.setValue("PluginDatabase/DoChecks", self.ui.ch_do_checks.isChecked())
+        settings.setValue("PluginDatabase/DiscoveryJobs", self.ui.sb_jobs.value())
+        settings.setValue("PluginDatabase/Incremental", self.ui.ch_incremental.isChecked())
+        settings.setValue("PluginDatabase/WatchPaths", self.ui.ch_watch.isChecked())
+        settings.setValue("PluginDatabase/DiscoveryTimeout", self.ui.sb_timeout.value())
 
     # -----------------------------------------------------------------------------------------------------------------
 
@@ -1295,6 +2352,10 @@ class PluginRefreshW(QDialog):
 
         self.fThread.setSearchBinaryTypes(native, posix32, posix64, win32, win64)
         self.fThread.setSearchPluginTypes(ladspa, dssi, lv2, vst, vst3, au, sf2, sfz)
+        self.fThread.setSearchJobCount(self.ui.sb_jobs.value())
+        self.fThread.setSearchIncremental(self.ui.ch_incremental.isChecked())
+        self.fThread.setSearchTimeout(self.ui.sb_timeout.value())
+        self.fThread.setSearchProcessingChecks(self.ui.ch_do_checks.isChecked())
         self.fThread.start()
 
     # -----------------------------------------------------------------------------------------------------------------
@@ -1303,6 +2364,30 @@ class PluginRefreshW(QDialog):
     def slot_skip(self):
         killDiscovery()
 
+    @pyqtSlot()
+    def slot_clearQuarantine(self):
+        cache = DiscoveryCache()
+        cache.load()
+        cache.clearQuarantine()
+        cache.save()
+
+        self.updateQuarantine()
+
+    def updateQuarantine(self):
+        cache = DiscoveryCache()
+        cache.load()
+
+        quarantined = cache.getQuarantined()
+        tooltip = [self.tr("These plugins crashed or timed out during a previous scan, "
+                           "they are skipped until they change or the quarantine is cleared.")]
+
+        for filename, reason, timestamp in quarantined:
+            tooltip.append("%s (%s, %s)" % (filename, reason, strftime("%Y-%m-%d %H:%M", localtime(timestamp))))
+
+        self.ui.b_clear_quarantine.setText(self.tr("Clear quarantine (%i)") % len(quarantined))
+        self.ui.b_clear_quarantine.setToolTip("\n".join(tooltip))
+        self.ui.b_clear_quarantine.setEnabled(len(quarantined) != 0)
+
     # -----------------------------------------------------------------------------------------------------------------
 
     @pyqtSlot()
@@ -1338,6 +2423,7 @@ class PluginRefreshW(QDialog):
         self.ui.b_close.setVisible(True)
         self.ui.group_types.setEnabled(True)
         self.ui.group_options.setEnabled(True)
+        self.updateQuarantine()
 
     # -----------------------------------------------------------------------------------------------------------------
 
@@ -1361,6 +2447,299 @@ class PluginRefreshW(QDialog):
         QDialog.done(self, r)
         self.close()
 
+# ---------------------------------------------------------------------------------------------------------------------
+# Plugin Database Model
+
+# plugin keys shown in each column of the database table, None for columns that are not a plain value
+PLUGIN_DATABASE_COLUMN_KEYS = ('name', 'label', 'maker', 'uniqueId',
+                               'audio.ins', 'audio.outs', 'parameters.ins', 'parameters.outs',
+                               None, None, None, None, None, 'filename')
+
+# columns sorted by number instead of by text
+PLUGIN_DATABASE_NUMERIC_COLUMNS = (3, 4, 5, 6, 7)
+
+# Category and feature flags of each plugin, used for filtering
+PLUGIN_DATABASE_EFFECT       = 1 << 0
+PLUGIN_DATABASE_SYNTH        = 1 << 1
+PLUGIN_DATABASE_MIDI         = 1 << 2
+PLUGIN_DATABASE_KIT          = 1 << 3
+PLUGIN_DATABASE_OTHER        = 1 << 4
+PLUGIN_DATABASE_INTERNAL     = 1 << 5
+PLUGIN_DATABASE_LADSPA       = 1 << 6
+PLUGIN_DATABASE_DSSI         = 1 << 7
+PLUGIN_DATABASE_LV2          = 1 << 8
+PLUGIN_DATABASE_VST2         = 1 << 9
+PLUGIN_DATABASE_VST3         = 1 << 10
+PLUGIN_DATABASE_AU           = 1 << 11
+PLUGIN_DATABASE_NATIVE       = 1 << 12
+PLUGIN_DATABASE_BRIDGED      = 1 << 13
+PLUGIN_DATABASE_BRIDGED_WINE = 1 << 14
+PLUGIN_DATABASE_RTSAFE       = 1 << 15
+PLUGIN_DATABASE_GUI          = 1 << 16
+PLUGIN_DATABASE_STEREO       = 1 << 17
+PLUGIN_DATABASE_REPLACED     = 1 << 18 # never shown, see PluginDatabaseModel.setBinaryPlugins()
+
+# plugin type names with a flag, other types are internal
+PLUGIN_DATABASE_TYPE_FLAGS = {
+    "LADSPA": PLUGIN_DATABASE_LADSPA,
+    "DSSI":   PLUGIN_DATABASE_DSSI,
+    "LV2":    PLUGIN_DATABASE_LV2,
+    "VST2":   PLUGIN_DATABASE_VST2,
+    "VST3":   PLUGIN_DATABASE_VST3,
+    "AU":     PLUGIN_DATABASE_AU,
+    "SF2":    PLUGIN_DATABASE_KIT,
+    "SFZ":    PLUGIN_DATABASE_KIT,
+}
+
+# Table model for the plugin database dialog.
+# Plugins are kept in plain lists, text is only made for the rows being shown.
+# Sorting and filtering work on a list of plugin indexes (the rows), instead of going through a proxy model.
+class PluginDatabaseModel(QAbstractTableModel):
+    def __init__(self, parent):
+        QAbstractTableModel.__init__(self, parent)
+
+        self.fHeaders = (self.tr("Name"), self.tr("Label/URI"), self.tr("Maker"), self.tr("ID"),
+                         self.tr("Audio Ins"), self.tr("Audio Outs"), self.tr("Param Ins"), self.tr("Param Outs"),
+                         self.tr("Programs"), self.tr("Has GUI"), self.tr("Is Synth"), self.tr("Is Bridged"),
+                         self.tr("Type"), self.tr("Binary"))
+
+        self.fPlugins    = [] # plugin dicts
+        self.fTypes      = [] # plugin type names, as shown
+        self.fFlags      = [] # PLUGIN_DATABASE_* flags of each plugin
+        self.fSearchKeys = [] # lowercase text searched in, for each plugin
+        self.fRows       = [] # indexes of the plugins shown, in display order
+        self.fSortKeys   = {} # column -> sort key of each plugin, made when first sorting by that column
+        self.fBinaries   = {} # (index source, binary) -> indexes of its plugins
+
+        self.fSortColumn = 0
+        self.fSortOrder  = Qt.AscendingOrder
+
+        if HAIKU or LINUX or MACOS:
+            self.fNativeBins = (BINARY_POSIX32, BINARY_POSIX64)
+            self.fWineBins   = (BINARY_WIN32, BINARY_WIN64)
+        elif WINDOWS:
+            self.fNativeBins = (BINARY_WIN32, BINARY_WIN64)
+            self.fWineBins   = ()
+        else:
+            self.fNativeBins = ()
+            self.fWineBins   = ()
+
+    # -----------------------------------------------------------------------------------------------------------------
+
+    def clear(self):
+        self.beginResetModel()
+        self.fPlugins    = []
+        self.fTypes      = []
+        self.fFlags      = []
+        self.fSearchKeys = []
+        self.fRows       = []
+        self.fSortKeys   = {}
+        self.fBinaries   = {}
+        self.endResetModel()
+
+    # new plugins are not shown until the next setFilter()
+    def addPlugins(self, plugins, ptype):
+        typeFlag = PLUGIN_DATABASE_TYPE_FLAGS.get(ptype, PLUGIN_DATABASE_INTERNAL)
+
+        self.fPlugins    += plugins
+        self.fTypes      += [ptype] * len(plugins)
+        self.fFlags      += [self._getFlags(plugin, typeFlag) for plugin in plugins]
+        self.fSearchKeys += ["\n".join((str(plugin['name']), str(plugin['label']), str(plugin['maker']),
+                                        str(plugin['uniqueId']), str(plugin['filename']))).lower()
+                             for plugin in plugins]
+
+    # Adds plugins of whole binaries, replacing those previously added for the same binaries and source.
+    # Replaced plugins keep their index (so rows stay valid) but are never shown again.
+    # binaryPlugins is a list of (binary, plugins), changes are not shown until the next setFilter()
+    def setBinaryPlugins(self, ptype, source, binaryPlugins):
+        for binary, plugins in binaryPlugins:
+            for index in self.fBinaries.pop((source, binary), ()):
+                self.fFlags[index] = PLUGIN_DATABASE_REPLACED
+
+            if len(plugins) == 0:
+                continue
+
+            start = len(self.fPlugins)
+            self.addPlugins(plugins, ptype)
+            self.fBinaries[(source, binary)] = range(start, len(self.fPlugins))
+
+    def getPlugin(self, row):
+        return self.fPlugins[self.fRows[row]]
+
+    # index of the plugin shown at row
+    def getPluginIndex(self, row):
+        return self.fRows[row]
+
+    # row of the plugin at index, or -1 if not shown
+    def getPluginRow(self, index):
+        try:
+            return self.fRows.index(index)
+        except ValueError:
+            return -1
+
+    # Only shows plugins without any of hiddenFlags, with all of requiredFlags, and matching text (in lowercase).
+    # The current sorting is kept.
+    def setFilter(self, hiddenFlags, requiredFlags, text):
+        hiddenFlags |= PLUGIN_DATABASE_REPLACED
+
+        if text:
+            rows = [index for index, (flags, searchKey) in enumerate(zip(self.fFlags, self.fSearchKeys))
+                    if not flags & hiddenFlags and flags & requiredFlags == requiredFlags and text in searchKey]
+        else:
+            rows = [index for index, flags in enumerate(self.fFlags)
+                    if not flags & hiddenFlags and flags & requiredFlags == requiredFlags]
+
+        self.beginResetModel()
+        self.fRows = rows
+        self._sortRows()
+        self.endResetModel()
+
+    # -----------------------------------------------------------------------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.fRows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.fHeaders)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.fHeaders[section]
+
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+
+        return self._getText(self.fRows[index.row()], index.column())
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.fSortColumn = column
+        self.fSortOrder  = order
+
+        if len(self.fRows) == 0:
+            return
+
+        self.layoutAboutToBeChanged.emit()
+
+        # keep the selection on the same plugins
+        persistentIndexes = self.persistentIndexList()
+        persistentPlugins = [self.fRows[index.row()] for index in persistentIndexes]
+
+        self._sortRows()
+
+        if len(persistentIndexes) != 0:
+            rows = dict((plugin, row) for row, plugin in enumerate(self.fRows))
+            self.changePersistentIndexList(persistentIndexes,
+                                           [self.index(rows[plugin], index.column())
+                                            for plugin, index in zip(persistentPlugins, persistentIndexes)])
+
+        self.layoutChanged.emit()
+
+    # -----------------------------------------------------------------------------------------------------------------
+
+    def _getText(self, index, column):
+        plugin = self.fPlugins[index]
+        key    = PLUGIN_DATABASE_COLUMN_KEYS[column]
+
+        if key is not None:
+            return str(plugin[key])
+
+        if column == 9:
+            return self.tr("Yes") if (plugin['hints'] & PLUGIN_HAS_CUSTOM_UI) else self.tr("No")
+
+        if column == 10:
+            return self.tr("Yes") if (plugin['hints'] & PLUGIN_IS_SYNTH) else self.tr("No")
+
+        if column == 11:
+            return self._getBridgeText(plugin['build'])
+
+        if column == 12:
+            return self.fTypes[index]
+
+        return ""
+
+    def _getFlags(self, plugin, typeFlag):
+        aIns  = plugin['audio.ins']
+        aOuts = plugin['audio.outs']
+        mIns  = plugin['midi.ins']
+        mOuts = plugin['midi.outs']
+        hints = plugin['hints']
+        build = plugin['build']
+        flags = typeFlag
+
+        isSynth = bool(hints & PLUGIN_IS_SYNTH)
+
+        if isSynth:
+            flags |= PLUGIN_DATABASE_SYNTH
+        if aIns > 0 < aOuts and not isSynth:
+            flags |= PLUGIN_DATABASE_EFFECT
+        if aIns == 0 and aOuts == 0 and mIns > 0 < mOuts:
+            flags |= PLUGIN_DATABASE_MIDI
+        if not flags & (PLUGIN_DATABASE_EFFECT|PLUGIN_DATABASE_SYNTH|PLUGIN_DATABASE_MIDI|PLUGIN_DATABASE_KIT):
+            flags |= PLUGIN_DATABASE_OTHER
+
+        if build == BINARY_NATIVE:
+            flags |= PLUGIN_DATABASE_NATIVE
+        elif build in self.fNativeBins:
+            flags |= PLUGIN_DATABASE_BRIDGED
+        elif build in self.fWineBins:
+            flags |= PLUGIN_DATABASE_BRIDGED_WINE
+
+        if hints & PLUGIN_IS_RTSAFE:
+            flags |= PLUGIN_DATABASE_RTSAFE
+        if hints & PLUGIN_HAS_CUSTOM_UI:
+            flags |= PLUGIN_DATABASE_GUI
+        if (aIns == 2 and aOuts == 2) or (isSynth and aOuts == 2):
+            flags |= PLUGIN_DATABASE_STEREO
+
+        return flags
+
+    def _getBridgeText(self, build):
+        if build == BINARY_NATIVE:
+            return self.tr("No")
+
+        if WINDOWS:
+            if build == BINARY_WIN32:
+                typeText = "32bit"
+            elif build == BINARY_WIN64:
+                typeText = "64bit"
+            else:
+                typeText = self.tr("Unknown")
+        else:
+            if build == BINARY_POSIX32:
+                typeText = "32bit"
+            elif build == BINARY_POSIX64:
+                typeText = "64bit"
+            elif build == BINARY_WIN32:
+                typeText = "Windows 32bit"
+            elif build == BINARY_WIN64:
+                typeText = "Windows 64bit"
+            else:
+                typeText = self.tr("Unknown")
+
+        return self.tr("Yes (%s)" % typeText)
+
+    # numbers for numeric columns, lowercase text for the others
+    def _getSortKeys(self, column):
+        keys = self.fSortKeys.setdefault(column, [])
+
+        if len(keys) == len(self.fPlugins):
+            return keys
+
+        if column in PLUGIN_DATABASE_NUMERIC_COLUMNS:
+            key = PLUGIN_DATABASE_COLUMN_KEYS[column]
+            keys += [plugin[key] for plugin in self.fPlugins[len(keys):]]
+        else:
+            keys += [self._getText(index, column).lower() for index in range(len(keys), len(self.fPlugins))]
+
+        return keys
+
+    def _sortRows(self):
+        keys = self._getSortKeys(self.fSortColumn)
+        self.fRows.sort(key=keys.__getitem__, reverse=(self.fSortOrder == Qt.DescendingOrder))
+
 # ---------------------------------------------------------------------------------------------------------------------
 # Plugin Database Dialog
 
@@ -1379,14 +2758,23 @@ class PluginDatabaseW(QDialog):
         # ----------------------------------------------------------------------------------------------------
         # Internal stuff
 
-        self.fLastTableIndex = 0
+        self.fModel      = PluginDatabaseModel(self)
         self.fRetPlugin  = None
         self.fRealParent = parent
 
+        # plugin path watcher with a rescan that is still finishing, see waitForRescan()
+        self.fRescanWatcher = None
+
+        # wait for typing to pause before searching
+        self.fFilterTimer = QTimer(self)
+        self.fFilterTimer.setInterval(150)
+        self.fFilterTimer.setSingleShot(True)
+
         # ----------------------------------------------------------------------------------------------------
         # Set-up GUI
 
         self.ui.b_add.setEnabled(False)
+        self.ui.tableView.setModel(self.fModel)
 
         if BINARY_NATIVE in (BINARY_POSIX32, BINARY_WIN32):
             self.ui.ch_bridged.setText(self.tr("Bridged (64bit)"))
@@ -1438,9 +2826,10 @@ class PluginDatabaseW(QDialog):
         self.ui.b_cancel.clicked.connect(self.reject)
         self.ui.b_refresh.clicked.connect(self.slot_refreshPlugins)
         self.ui.tb_filters.clicked.connect(self.slot_maybeShowFilters)
-        self.ui.lineEdit.textChanged.connect(self.slot_checkFilters)
-        self.ui.tableWidget.currentCellChanged.connect(self.slot_checkPlugin)
-        self.ui.tableWidget.cellDoubleClicked.connect(self.slot_addPlugin)
+        self.ui.lineEdit.textChanged.connect(self.slot_delayCheckFilters)
+        self.fFilterTimer.timeout.connect(self.slot_checkFilters)
+        self.ui.tableView.selectionModel().currentRowChanged.connect(self.slot_checkPlugin)
+        self.ui.tableView.doubleClicked.connect(self.slot_addPlugin)
 
         self.ui.ch_effects.clicked.connect(self.slot_checkFilters)
         self.ui.ch_instruments.clicked.connect(self.slot_checkFilters)
@@ -1470,27 +2859,63 @@ class PluginDatabaseW(QDialog):
 
     @pyqtSlot()
     def slot_addPlugin(self):
-        if self.ui.tableWidget.currentRow() >= 0:
-            self.fRetPlugin = self.ui.tableWidget.item(self.ui.tableWidget.currentRow(), 0).data(Qt.UserRole)
+        index = self.ui.tableView.currentIndex()
+
+        if index.isValid():
+            self.fRetPlugin = self.fModel.getPlugin(index.row())
             self.accept()
         else:
             self.reject()
 
-    @pyqtSlot(int)
-    def slot_checkPlugin(self, row):
-        self.ui.b_add.setEnabled(row >= 0)
+    @pyqtSlot(QModelIndex)
+    def slot_checkPlugin(self, index):
+        self.ui.b_add.setEnabled(index.isValid())
 
     @pyqtSlot()
     def slot_checkFilters(self):
         self._checkFilters()
 
+    @pyqtSlot()
+    def slot_delayCheckFilters(self):
+        self.fFilterTimer.start()
+
     @pyqtSlot()
     def slot_maybeShowFilters(self):
         self._showFilters(not self.ui.frame.isVisible())
 
+    # a background rescan of the plugin path watcher is still finishing,
+    # refreshing is only possible after it is done, and the list is loaded again then
+    def waitForRescan(self, watcher):
+        if not watcher.isRescanning():
+            return
+
+        self.fRescanWatcher = watcher
+        self.ui.b_refresh.setEnabled(False)
+
+        watcher.rescanFinished.connect(self.slot_rescanFinished)
+        self.finished.connect(self.slot_stopWaitingForRescan)
+
+    @pyqtSlot()
+    def slot_rescanFinished(self):
+        self.slot_stopWaitingForRescan()
+        self.ui.b_refresh.setEnabled(True)
+        self._reAddPlugins()
+
+    @pyqtSlot()
+    def slot_stopWaitingForRescan(self):
+        if self.fRescanWatcher is None:
+            return
+
+        self.fRescanWatcher.rescanFinished.disconnect(self.slot_rescanFinished)
+        self.finished.disconnect(self.slot_stopWaitingForRescan)
+        self.fRescanWatcher = None
+
     @pyqtSlot()
     def slot_refreshPlugins(self):
-        if PluginRefreshW(self, self.host).exec_():
+        refreshW = PluginRefreshW(self, self.host)
+        refreshW.fThread.pluginsFound.connect(self.slot_handlePluginsFound)
+
+        if refreshW.exec_():
             self._reAddPlugins()
 
             if self.fRealParent:
@@ -1498,11 +2923,22 @@ class PluginDatabaseW(QDialog):
 
     # --------------------------------------------------------------------------------------------------------
 
+    # new or changed binaries while a refresh is running, the full list is loaded again once it finishes
+    @pyqtSlot(str, str, list)
+    def slot_handlePluginsFound(self, ptype, source, binaryPlugins):
+        if len(binaryPlugins) == 0:
+            return
+
+        self._setBinaryPluginsInTable(ptype, source, binaryPlugins)
+        self._checkFilters()
+
+    # --------------------------------------------------------------------------------------------------------
+
     @pyqtSlot()
     def slot_saveSettings(self):
         settings = QSettings("falkTX", "CarlaDatabase2")
         settings.setValue("PluginDatabase/Geometry", self.saveGeometry())
-        settings.setValue("PluginDatabase/TableGeometry_5", self.ui.tableWidget.horizontalHeader().saveState())
+        settings.setValue("PluginDatabase/TableGeometry_5", self.ui.tableView.horizontalHeader().saveState())
         settings.setValue("PluginDatabase/ShowFilters", (self.ui.tb_filters.arrowType() == Qt.UpArrow))
         settings.setValue("PluginDatabase/ShowEffects", self.ui.ch_effects.isChecked())
         settings.setValue("PluginDatabase/ShowInstruments", self.ui.ch_instruments.isChecked())
@@ -1550,117 +2986,61 @@ class PluginDatabaseW(QDialog):
         self.ui.lineEdit.setText(settings.value("PluginDatabase/SearchText", "", type=str))
 
         tableGeometry = settings.value("PluginDatabase/TableGeometry_5")
+        horizontalHeader = self.ui.tableView.horizontalHeader()
         if tableGeometry:
-            self.ui.tableWidget.horizontalHeader().restoreState(tableGeometry)
+            horizontalHeader.restoreState(tableGeometry)
+            self.ui.tableView.sortByColumn(horizontalHeader.sortIndicatorSection(), horizontalHeader.sortIndicatorOrder())
         else:
-            self.ui.tableWidget.sortByColumn(0, Qt.AscendingOrder)
+            self.ui.tableView.sortByColumn(0, Qt.AscendingOrder)
 
         self._showFilters(settings.value("PluginDatabase/ShowFilters", False, type=bool))
 
     # --------------------------------------------------------------------------------------------------------
 
     def _checkFilters(self):
-        text = self.ui.lineEdit.text().lower()
-
-        hideEffects     = not self.ui.ch_effects.isChecked()
-        hideInstruments = not self.ui.ch_instruments.isChecked()
-        hideMidi        = not self.ui.ch_midi.isChecked()
-        hideOther       = not self.ui.ch_other.isChecked()
+        self.fFilterTimer.stop()
 
-        hideInternal = not self.ui.ch_internal.isChecked()
-        hideLadspa   = not self.ui.ch_ladspa.isChecked()
-        hideDssi     = not self.ui.ch_dssi.isChecked()
-        hideLV2      = not self.ui.ch_lv2.isChecked()
-        hideVST2     = not self.ui.ch_vst.isChecked()
-        hideVST3     = not self.ui.ch_vst3.isChecked()
-        hideAU       = not self.ui.ch_au.isChecked()
-        hideKits     = not self.ui.ch_kits.isChecked()
-
-        hideNative  = not self.ui.ch_native.isChecked()
-        hideBridged = not self.ui.ch_bridged.isChecked()
-        hideBridgedWine = not self.ui.ch_bridged_wine.isChecked()
+        text = self.ui.lineEdit.text().lower()
 
-        hideNonRtSafe = self.ui.ch_rtsafe.isChecked()
-        hideNonGui    = self.ui.ch_gui.isChecked()
-        hideNonStereo = self.ui.ch_stereo.isChecked()
+        hiddenFlags   = 0
+        requiredFlags = 0
+
+        for checkBox, flag in ((self.ui.ch_effects,      PLUGIN_DATABASE_EFFECT),
+                               (self.ui.ch_instruments,  PLUGIN_DATABASE_SYNTH),
+                               (self.ui.ch_midi,         PLUGIN_DATABASE_MIDI),
+                               (self.ui.ch_other,        PLUGIN_DATABASE_OTHER),
+                               (self.ui.ch_kits,         PLUGIN_DATABASE_KIT),
+                               (self.ui.ch_internal,     PLUGIN_DATABASE_INTERNAL),
+                               (self.ui.ch_ladspa,       PLUGIN_DATABASE_LADSPA),
+                               (self.ui.ch_dssi,         PLUGIN_DATABASE_DSSI),
+                               (self.ui.ch_lv2,          PLUGIN_DATABASE_LV2),
+                               (self.ui.ch_vst,          PLUGIN_DATABASE_VST2),
+                               (self.ui.ch_vst3,         PLUGIN_DATABASE_VST3),
+                               (self.ui.ch_au,           PLUGIN_DATABASE_AU),
+                               (self.ui.ch_native,       PLUGIN_DATABASE_NATIVE),
+                               (self.ui.ch_bridged,      PLUGIN_DATABASE_BRIDGED),
+                               (self.ui.ch_bridged_wine, PLUGIN_DATABASE_BRIDGED_WINE)):
+            if not checkBox.isChecked():
+                hiddenFlags |= flag
+
+        for checkBox, flag in ((self.ui.ch_rtsafe, PLUGIN_DATABASE_RTSAFE),
+                               (self.ui.ch_gui,    PLUGIN_DATABASE_GUI),
+                               (self.ui.ch_stereo, PLUGIN_DATABASE_STEREO)):
+            if checkBox.isChecked():
+                requiredFlags |= flag
+
+        # keep the current plugin selected, if still shown
+        current = self.ui.tableView.currentIndex()
+        currentPlugin = self.fModel.getPluginIndex(current.row()) if current.isValid() else -1
+
+        self.fModel.setFilter(hiddenFlags, requiredFlags, text)
+
+        row = self.fModel.getPluginRow(currentPlugin) if currentPlugin >= 0 else -1
+
+        if row >= 0:
+            self.ui.tableView.setCurrentIndex(self.fModel.index(row, 0))
 
-        if HAIKU or LINUX or MACOS:
-            nativeBins = [BINARY_POSIX32, BINARY_POSIX64]
-            wineBins   = [BINARY_WIN32, BINARY_WIN64]
-        elif WINDOWS:
-            nativeBins = [BINARY_WIN32, BINARY_WIN64]
-            wineBins   = []
-        else:
-            nativeBins = []
-            wineBins   = []
-
-        rowCount = self.ui.tableWidget.rowCount()
-
-        for i in range(self.fLastTableIndex):
-            plugin = self.ui.tableWidget.item(i, 0).data(Qt.UserRole)
-            aIns   = plugin['audio.ins']
-            aOuts  = plugin['audio.outs']
-            mIns   = plugin['midi.ins']
-            mOuts  = plugin['midi.outs']
-            ptype  = self.ui.tableWidget.item(i, 12).text()
-            isSynth  = bool(plugin['hints'] & PLUGIN_IS_SYNTH)
-            isEffect = bool(aIns > 0 < aOuts and not isSynth)
-            isMidi   = bool(aIns == 0 and aOuts == 0 and mIns > 0 < mOuts)
-            isKit    = bool(ptype in ("SF2", "SFZ"))
-            isOther  = bool(not (isEffect or isSynth or isMidi or isKit))
-            isNative = bool(plugin['build'] == BINARY_NATIVE)
-            isRtSafe = bool(plugin['hints'] & PLUGIN_IS_RTSAFE)
-            isStereo = bool(aIns == 2 and aOuts == 2) or (isSynth and aOuts == 2)
-            hasGui   = bool(plugin['hints'] & PLUGIN_HAS_CUSTOM_UI)
-
-            isBridged = bool(not isNative and plugin['build'] in nativeBins)
-            isBridgedWine = bool(not isNative and plugin['build'] in wineBins)
-
-            if hideEffects and isEffect:
-                self.ui.tableWidget.hideRow(i)
-            elif hideInstruments and isSynth:
-                self.ui.tableWidget.hideRow(i)
-            elif hideMidi and isMidi:
-                self.ui.tableWidget.hideRow(i)
-            elif hideOther and isOther:
-                self.ui.tableWidget.hideRow(i)
-            elif hideKits and isKit:
-                self.ui.tableWidget.hideRow(i)
-            elif hideInternal and ptype == self.tr("Internal"):
-                self.ui.tableWidget.hideRow(i)
-            elif hideLadspa and ptype == "LADSPA":
-                self.ui.tableWidget.hideRow(i)
-            elif hideDssi and ptype == "DSSI":
-                self.ui.tableWidget.hideRow(i)
-            elif hideLV2 and ptype == "LV2":
-                self.ui.tableWidget.hideRow(i)
-            elif hideVST2 and ptype == "VST2":
-                self.ui.tableWidget.hideRow(i)
-            elif hideVST3 and ptype == "VST3":
-                self.ui.tableWidget.hideRow(i)
-            elif hideAU and ptype == "AU":
-                self.ui.tableWidget.hideRow(i)
-            elif hideNative and isNative:
-                self.ui.tableWidget.hideRow(i)
-            elif hideBridged and isBridged:
-                self.ui.tableWidget.hideRow(i)
-            elif hideBridgedWine and isBridgedWine:
-                self.ui.tableWidget.hideRow(i)
-            elif hideNonRtSafe and not isRtSafe:
-                self.ui.tableWidget.hideRow(i)
-            elif hideNonGui and not hasGui:
-                self.ui.tableWidget.hideRow(i)
-            elif hideNonStereo and not isStereo:
-                self.ui.tableWidget.hideRow(i)
-            elif (text and not (
-                  text in self.ui.tableWidget.item(i, 0).text().lower() or
-                  text in self.ui.tableWidget.item(i, 1).text().lower() or
-                  text in self.ui.tableWidget.item(i, 2).text().lower() or
-                  text in self.ui.tableWidget.item(i, 3).text().lower() or
-                  text in self.ui.tableWidget.item(i, 13).text().lower())):
-                self.ui.tableWidget.hideRow(i)
-            else:
-                self.ui.tableWidget.showRow(i)
+        self.ui.b_add.setEnabled(row >= 0)
 
     # --------------------------------------------------------------------------------------------------------
 
@@ -1670,60 +3050,27 @@ class PluginDatabaseW(QDialog):
 
     # --------------------------------------------------------------------------------------------------------
 
-    def _addPluginToTable(self, plugin, ptype):
-        if plugin['API'] != PLUGIN_QUERY_API_VERSION and ptype == self.tr("Internal"):
-            return
+    def _addPluginsToTable(self, plugins, ptype):
+        self.fModel.addPlugins(self._fixPlugins(plugins, ptype), ptype)
 
-        if ptype in (self.tr("Internal"), "LV2", "SF2", "SFZ"):
-            plugin['build'] = BINARY_NATIVE
+    # plugins of binaries found by a discovery, replacing those already in the table
+    def _setBinaryPluginsInTable(self, ptype, source, binaryPlugins):
+        self.fModel.setBinaryPlugins(ptype, source, [(binary, self._fixPlugins(plugins, ptype))
+                                                     for binary, plugins in binaryPlugins])
 
-        index = self.fLastTableIndex
+    def _fixPlugins(self, plugins, ptype):
+        if ptype == self.tr("Internal"):
+            plugins = [plugin for plugin in plugins if plugin['API'] == PLUGIN_QUERY_API_VERSION]
 
-        if plugin['build'] == BINARY_NATIVE:
-            bridgeText = self.tr("No")
+        if ptype in (self.tr("Internal"), "LV2", "SF2", "SFZ"):
+            for plugin in plugins:
+                plugin['build'] = BINARY_NATIVE
 
-        else:
-            if WINDOWS:
-                if plugin['build'] == BINARY_WIN32:
-                    typeText = "32bit"
-                elif plugin['build'] == BINARY_WIN64:
-                    typeText = "64bit"
-                else:
-                    typeText = self.tr("Unknown")
-            else:
-                if plugin['build'] == BINARY_POSIX32:
-                    typeText = "32bit"
-                elif plugin['build'] == BINARY_POSIX64:
-                    typeText = "64bit"
-                elif plugin['build'] == BINARY_WIN32:
-                    typeText = "Windows 32bit"
-                elif plugin['build'] == BINARY_WIN64:
-                    typeText = "Windows 64bit"
-                else:
-                    typeText = self.tr("Unknown")
-
-            bridgeText = self.tr("Yes (%s)" % typeText)
-
-        self.ui.tableWidget.setItem(index, 0, QTableWidgetItem(str(plugin['name'])))
-        self.ui.tableWidget.setItem(index, 1, QTableWidgetItem(str(plugin['label'])))
-        self.ui.tableWidget.setItem(index, 2, QTableWidgetItem(str(plugin['maker'])))
-        self.ui.tableWidget.setItem(index, 3, QTableWidgetItem(str(plugin['uniqueId'])))
-        self.ui.tableWidget.setItem(index, 4, QTableWidgetItem(str(plugin['audio.ins'])))
-        self.ui.tableWidget.setItem(index, 5, QTableWidgetItem(str(plugin['audio.outs'])))
-        self.ui.tableWidget.setItem(index, 6, QTableWidgetItem(str(plugin['parameters.ins'])))
-        self.ui.tableWidget.setItem(index, 7, QTableWidgetItem(str(plugin['parameters.outs'])))
-        self.ui.tableWidget.setItem(index, 9, QTableWidgetItem(self.tr("Yes") if (plugin['hints'] & PLUGIN_HAS_CUSTOM_UI) else self.tr("No")))
-        self.ui.tableWidget.setItem(index, 10, QTableWidgetItem(self.tr("Yes") if (plugin['hints'] & PLUGIN_IS_SYNTH) else self.tr("No")))
-        self.ui.tableWidget.setItem(index, 11, QTableWidgetItem(bridgeText))
-        self.ui.tableWidget.setItem(index, 12, QTableWidgetItem(ptype))
-        self.ui.tableWidget.setItem(index, 13, QTableWidgetItem(str(plugin['filename'])))
-        self.ui.tableWidget.item(index, 0).setData(Qt.UserRole, plugin)
-
-        self.fLastTableIndex += 1
+        return plugins
 
     # --------------------------------------------------------------------------------------------------------
 
-    def _reAddInternalHelper(self, settingsDB, ptype, path):
+    def _reAddInternalHelper(self, pluginIndex, ptype, path):
         if ptype == PLUGIN_INTERNAL:
             ptypeStr   = "Internal"
             ptypeStrTr = self.tr("Internal")
@@ -1739,8 +3086,8 @@ class PluginDatabaseW(QDialog):
         else:
             return 0
 
-        plugins     = toList(settingsDB.value("Plugins/" + ptypeStr, []))
-        pluginCount = settingsDB.value("PluginCount/" + ptypeStr, 0, type=int)
+        plugins     = pluginIndex.getPlugins((ptypeStr,))
+        pluginCount = pluginIndex.getValue("PluginCount/" + ptypeStr, 0)
 
         pluginCountNew = gCarla.utils.get_cached_plugin_count(ptype, path)
 
@@ -1763,25 +3110,17 @@ class PluginDatabaseW(QDialog):
                 if i % 50 == 0:
                     QApplication.processEvents(QEventLoop.ExcludeUserInputEvents, 50)
 
-            settingsDB.setValue("Plugins/" + ptypeStr, plugins)
-            settingsDB.setValue("PluginCount/" + ptypeStr, pluginCount)
+            pluginIndex.setPlugins(ptypeStr, plugins)
+            pluginIndex.setValue("PluginCount/" + ptypeStr, pluginCount)
 
-        # prepare rows in advance
-        self.ui.tableWidget.setRowCount(self.fLastTableIndex + len(plugins))
-
-        for plugin in plugins:
-            self._addPluginToTable(plugin, ptypeStrTr)
+        self._addPluginsToTable(plugins, ptypeStrTr)
 
         return pluginCount
 
     def _reAddPlugins(self):
-        settingsDB = QSettings("falkTX", "CarlaPlugins4")
-
-        for x in range(self.ui.tableWidget.rowCount()):
-            self.ui.tableWidget.removeRow(0)
+        pluginIndex = PluginIndex()
 
-        self.fLastTableIndex = 0
-        self.ui.tableWidget.setSortingEnabled(False)
+        self.fModel.clear()
 
         settings = QSettings("falkTX", "Carla2")
         LV2_PATH = splitter.join(toList(settings.value(CARLA_KEY_PATHS_LV2, CARLA_DEFAULT_LV2_PATH)))
@@ -1790,92 +3129,45 @@ class PluginDatabaseW(QDialog):
         # ----------------------------------------------------------------------------------------------------
         # plugins handled through backend
 
-        internalCount = self._reAddInternalHelper(settingsDB, PLUGIN_INTERNAL, "")
-        lv2Count      = self._reAddInternalHelper(settingsDB, PLUGIN_LV2, LV2_PATH)
-        auCount       = self._reAddInternalHelper(settingsDB, PLUGIN_AU, "") if MACOS else 0
-
-        # ----------------------------------------------------------------------------------------------------
-        # LADSPA
-
-        ladspaPlugins  = []
-        ladspaPlugins += toList(settingsDB.value("Plugins/LADSPA_native", []))
-        ladspaPlugins += toList(settingsDB.value("Plugins/LADSPA_posix32", []))
-        ladspaPlugins += toList(settingsDB.value("Plugins/LADSPA_posix64", []))
-        ladspaPlugins += toList(settingsDB.value("Plugins/LADSPA_win32", []))
-        ladspaPlugins += toList(settingsDB.value("Plugins/LADSPA_win64", []))
-
-        # ----------------------------------------------------------------------------------------------------
-        # DSSI
-
-        dssiPlugins  = []
-        dssiPlugins += toList(settingsDB.value("Plugins/DSSI_native", []))
-        dssiPlugins += toList(settingsDB.value("Plugins/DSSI_posix32", []))
-        dssiPlugins += toList(settingsDB.value("Plugins/DSSI_posix64", []))
-        dssiPlugins += toList(settingsDB.value("Plugins/DSSI_win32", []))
-        dssiPlugins += toList(settingsDB.value("Plugins/DSSI_win64", []))
-
-        # ----------------------------------------------------------------------------------------------------
-        # VST2
-
-        vst2Plugins  = []
-        vst2Plugins += toList(settingsDB.value("Plugins/VST2_native", []))
-        vst2Plugins += toList(settingsDB.value("Plugins/VST2_posix32", []))
-        vst2Plugins += toList(settingsDB.value("Plugins/VST2_posix64", []))
-        vst2Plugins += toList(settingsDB.value("Plugins/VST2_win32", []))
-        vst2Plugins += toList(settingsDB.value("Plugins/VST2_win64", []))
+        internalCount = self._reAddInternalHelper(pluginIndex, PLUGIN_INTERNAL, "")
+        lv2Count      = self._reAddInternalHelper(pluginIndex, PLUGIN_LV2, LV2_PATH)
+        auCount       = self._reAddInternalHelper(pluginIndex, PLUGIN_AU, "") if MACOS else 0
 
         # ----------------------------------------------------------------------------------------------------
-        # VST3
+        # external plugins and kits
 
-        vst3Plugins  = []
-        vst3Plugins += toList(settingsDB.value("Plugins/VST3_native", []))
-        vst3Plugins += toList(settingsDB.value("Plugins/VST3_posix32", []))
-        vst3Plugins += toList(settingsDB.value("Plugins/VST3_posix64", []))
-        vst3Plugins += toList(settingsDB.value("Plugins/VST3_win32", []))
-        vst3Plugins += toList(settingsDB.value("Plugins/VST3_win64", []))
+        # added per source and binary, so a running refresh can replace them
+        binaryPlugins = []
+        counts = {}
 
-        # ----------------------------------------------------------------------------------------------------
-        # AU (extra non-cached)
+        for ptype, sources in (("LADSPA", PLUGIN_INDEX_SOURCES_LADSPA),
+                               ("DSSI",   PLUGIN_INDEX_SOURCES_DSSI),
+                               ("VST2",   PLUGIN_INDEX_SOURCES_VST2),
+                               ("VST3",   PLUGIN_INDEX_SOURCES_VST3),
+                               ("SF2",    ("SF2",))):
+            counts[ptype] = 0
 
-        auPlugins32 = toList(settingsDB.value("Plugins/AU_posix32", [])) if MACOS else []
+            for source in sources:
+                binaries = pluginIndex.getBinaryPlugins(source)
+                binaryPlugins.append((ptype, source, binaries))
+                counts[ptype] += sum(len(plugins) for _, plugins in binaries)
 
-        # ----------------------------------------------------------------------------------------------------
-        # Kits
+        auPlugins32 = pluginIndex.getPlugins(("AU_posix32",)) if MACOS else []
+        sfzs        = pluginIndex.getPlugins(("SFZ",))
 
-        sf2s = toList(settingsDB.value("Plugins/SF2", []))
-        sfzs = toList(settingsDB.value("Plugins/SFZ", []))
+        pluginIndex.close()
 
         # ----------------------------------------------------------------------------------------------------
-        # count plugins first, so we can create rows in advance
-
-        ladspaCount = 0
-        dssiCount   = 0
-        vstCount    = 0
-        vst3Count   = 0
-        au32Count   = 0
-        sf2Count    = 0
+        # count plugins
+
+        ladspaCount = counts["LADSPA"]
+        dssiCount   = counts["DSSI"]
+        vstCount    = counts["VST2"]
+        vst3Count   = counts["VST3"]
+        au32Count   = len(auPlugins32)
+        sf2Count    = counts["SF2"]
         sfzCount    = len(sfzs)
 
-        for plugins in ladspaPlugins:
-            ladspaCount += len(plugins)
-
-        for plugins in dssiPlugins:
-            dssiCount += len(plugins)
-
-        for plugins in vst2Plugins:
-            vstCount += len(plugins)
-
-        for plugins in vst3Plugins:
-            vst3Count += len(plugins)
-
-        for plugins in auPlugins32:
-            au32Count += len(plugins)
-
-        for plugins in sf2s:
-            sf2Count += len(plugins)
-
-        self.ui.tableWidget.setRowCount(self.fLastTableIndex+ladspaCount+dssiCount+vstCount+vst3Count+au32Count+sf2Count+sfzCount)
-
         if MACOS:
             self.ui.label.setText(self.tr("Have %i Internal, %i LADSPA, %i DSSI, %i LV2, %i VST2, %i VST3 and %i AudioUnit plugins, plus %i Sound Kits" % (
                                           internalCount, ladspaCount, dssiCount, lv2Count, vstCount, vst3Count, auCount+au32Count, sf2Count+sfzCount)))
@@ -1886,36 +3178,14 @@ class PluginDatabaseW(QDialog):
         # ----------------------------------------------------------------------------------------------------
         # now add all plugins to the table
 
-        for plugins in ladspaPlugins:
-            for plugin in plugins:
-                self._addPluginToTable(plugin, "LADSPA")
-
-        for plugins in dssiPlugins:
-            for plugin in plugins:
-                self._addPluginToTable(plugin, "DSSI")
-
-        for plugins in vst2Plugins:
-            for plugin in plugins:
-                self._addPluginToTable(plugin, "VST2")
-
-        for plugins in vst3Plugins:
-            for plugin in plugins:
-                self._addPluginToTable(plugin, "VST3")
-
-        for plugins in auPlugins32:
-            for plugin in plugins:
-                self._addPluginToTable(plugin, "AU")
-
-        for sf2 in sf2s:
-            for sf2_i in sf2:
-                self._addPluginToTable(sf2_i, "SF2")
+        for ptype, source, binaries in binaryPlugins:
+            self._setBinaryPluginsInTable(ptype, source, binaries)
 
-        for sfz in sfzs:
-            self._addPluginToTable(sfz, "SFZ")
+        self._addPluginsToTable(auPlugins32, "AU")
+        self._addPluginsToTable(sfzs, "SFZ")
 
         # ----------------------------------------------------------------------------------------------------
 
-        self.ui.tableWidget.setSortingEnabled(True)
         self._checkFilters()
 
     # --------------------------------------------------------------------------------------------------------
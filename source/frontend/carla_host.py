@@ -134,6 +134,8 @@ class HostWindow(QMainWindow):
         self.fLadspaRdfNeedsUpdate = True
         self.fLadspaRdfList = []
 
+        self.fPluginPathWatcher = None
+
         self.fPluginCount = 0
         self.fPluginList  = []
 
@@ -395,6 +397,13 @@ class HostWindow(QMainWindow):
 
         self.loadSettings(True)
 
+        # ----------------------------------------------------------------------------------------------------
+        # Watch plugin paths (if enabled in the refresh dialog)
+
+        if not (host.isControl or host.isPlugin):
+            self.fPluginPathWatcher = PluginPathWatcher(self, host.pathBinaries)
+            self.fPluginPathWatcher.reload()
+
         # ----------------------------------------------------------------------------------------------------
         # Set-up Canvas
 
@@ -1048,9 +1057,21 @@ class HostWindow(QMainWindow):
     # Plugins (menu actions)
 
     def showAddPluginDialog(self):
+        # the dialog can do a full refresh, and change what is watched
+        if self.fPluginPathWatcher is not None:
+            self.fPluginPathWatcher.stop()
+
         dialog = PluginDatabaseW(self.fParentOrSelf, self.host)
 
-        if not dialog.exec_():
+        if self.fPluginPathWatcher is not None:
+            dialog.waitForRescan(self.fPluginPathWatcher)
+
+        accepted = dialog.exec_()
+
+        if self.fPluginPathWatcher is not None:
+            self.fPluginPathWatcher.reload()
+
+        if not accepted:
             return
 
         if not self.host.is_engine_running():
@@ -1761,6 +1782,9 @@ class HostWindow(QMainWindow):
 
         self.loadSettings(False)
 
+        if self.fPluginPathWatcher is not None:
+            self.fPluginPathWatcher.reload()
+
         patchcanvas.clear()
 
         self.setupCanvas()
@@ -2522,6 +2546,9 @@ class HostWindow(QMainWindow):
                 event.ignore()
                 return
 
+        if self.fPluginPathWatcher is not None:
+            self.fPluginPathWatcher.stop(True)
+
         QMainWindow.closeEvent(self, event)
 
 # ------------------------------------------------------------------------------------------------
@@ -614,6 +614,8 @@ def handleInitialCommandLineArguments(file):
             print("")
             print("    --gdb    \t Run Carla inside gdb.")
             print(" -n,--no-gui \t Run Carla headless, don't show UI.")
+            print("    --fleet=HOST[:TCP[:UDP]],...")
+            print("             \t Carla-Control only, monitor several remote engines at once.")
             print("")
             print(" -h,--help   \t Print this help text and exit.")
             print(" -v,--version\t Print version information and exit.")
@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Warm process for pipe based Python UIs
+# Copyright (C) 2019 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ------------------------------------------------------------------------------------------------------------
+# The zygote is a long-lived python process with PyQt5 and the carla modules already imported.
+# Each UI script calls runUiFromZygote() before its own imports, which sends its pipe and stdio file descriptors
+# to the zygote and waits for the forked UI process to finish. The script is still what the host started,
+# so the host keeps tracking and killing the same pid as before.
+# If the zygote is not running or cannot be used the script carries on as a regular UI, starting a zygote
+# in the background for the next time.
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+
+from array import array
+from hashlib import sha1
+from select import select
+from subprocess import DEVNULL, Popen
+from time import monotonic
+
+# ------------------------------------------------------------------------------------------------------------
+# Constants
+
+# set to 1 to always start UIs with a fresh interpreter
+ZYGOTE_DISABLE_ENV = "CARLA_UI_NO_ZYGOTE"
+
+# seconds without UIs running before the zygote quits
+ZYGOTE_IDLE_TIMEOUT = 10 * 60
+
+# heaviest imports shared by the UI scripts, in import order
+ZYGOTE_PRELOAD_MODULES = (
+    "PyQt5.QtCore",
+    "PyQt5.QtGui",
+    "PyQt5.QtWidgets",
+    "PyQt5.QtSvg",
+    "carla_shared",
+    "carla_utils",
+    "carla_backend",
+    "carla_backend_qt",
+    "carla_app",
+    "externalui",
+    "carla_host",
+    "resources_rc",
+    "widgets.digitalpeakmeter",
+    "widgets.paramspinbox",
+    "widgets.pianoroll",
+    "ui_midipattern",
+)
+
+# environment read by the preloaded modules at import time, UIs started with different values run directly
+ZYGOTE_IMPORT_ENV = (
+    "HOME", "PATH", "TMP", "PYTHONPATH", "PYTHONHOME",
+    "LADSPA_PATH", "DSSI_PATH", "LV2_PATH", "VST_PATH", "VST3_PATH", "SF2_PATH", "SFZ_PATH",
+    "CARLA_CLIENT_NAME", "LADISH_APP_NAME", "NSM_URL",
+)
+
+# stdin, stdout, stderr and the 4 pipe file descriptors
+ZYGOTE_MAX_FDS = 7
+
+# requests are a single packet, this only needs to fit the environment
+ZYGOTE_MAX_REQUEST_SIZE = 256 * 1024
+
+# pid, uid, gid
+ZYGOTE_PEERCRED = struct.Struct("=iII")
+
+# ------------------------------------------------------------------------------------------------------------
+# Set when running inside a forked UI process
+
+gIsZygoteChild = False
+
+# ------------------------------------------------------------------------------------------------------------
+# Common
+
+def _getResourcesDir():
+    return os.path.realpath(sys.path[0] or os.path.dirname(sys.argv[0]))
+
+def _getSocketPath(resourcesDir):
+    runtimeDir = os.getenv("XDG_RUNTIME_DIR")
+
+    if not runtimeDir or not os.path.isdir(runtimeDir):
+        runtimeDir = os.path.join("/tmp", "carla-%i" % os.getuid())
+
+        try:
+            os.mkdir(runtimeDir, 0o700)
+        except FileExistsError:
+            pass
+
+        stat = os.lstat(runtimeDir)
+        if stat.st_uid != os.getuid() or (stat.st_mode & 0o077) != 0:
+            return None
+
+    # one zygote per carla install and python version
+    key = "%s:%s:%s" % (resourcesDir, sys.executable, sys.version)
+    return os.path.join(runtimeDir, "carla-ui-zygote-%s" % sha1(key.encode("utf-8")).hexdigest()[:16])
+
+def _isUsable():
+    return (sys.platform.startswith("linux") and
+            not getattr(sys, "frozen", False) and
+            os.getenv(ZYGOTE_DISABLE_ENV, "0") in ("", "0"))
+
+# ------------------------------------------------------------------------------------------------------------
+# UI side
+
+def _startZygote(resourcesDir):
+    # CWD in carla_shared comes from sys.path[0], keep it pointing to the resources dir
+    code = "import sys; sys.path.insert(0, %r); import carla_ui_zygote; carla_ui_zygote.runZygote()" % resourcesDir
+
+    try:
+        Popen([sys.executable, "-c", code],
+              cwd=resourcesDir, stdin=DEVNULL, stdout=DEVNULL, stderr=DEVNULL,
+              close_fds=True, start_new_session=True)
+    except OSError as e:
+        print("Failed to start UI zygote:", e)
+
+# Returns False if the UI needs to be run by the calling script, does not return otherwise.
+def runUiFromZygote():
+    if gIsZygoteChild or not _isUsable():
+        return False
+
+    # only pipe based UIs
+    if len(sys.argv) != 7:
+        return False
+
+    try:
+        pipeFds = [int(arg) for arg in sys.argv[3:7]]
+    except ValueError:
+        return False
+
+    resourcesDir = _getResourcesDir()
+    socketPath   = _getSocketPath(resourcesDir)
+
+    if socketPath is None:
+        return False
+
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+
+    try:
+        conn.connect(socketPath)
+    except OSError:
+        conn.close()
+        _startZygote(resourcesDir)
+        return False
+
+    request = json.dumps({
+        'script': os.path.abspath(sys.argv[0]),
+        'argv': sys.argv,
+        'cwd': os.getcwd(),
+        'env': dict(os.environ),
+    }).encode("utf-8")
+
+    fds = array("i", [0, 1, 2] + pipeFds)
+
+    try:
+        conn.sendmsg([request], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds)])
+        reply = conn.recv(64).decode("utf-8").split(" ", 1)
+    except OSError:
+        reply = [""]
+
+    # nothing was started, carry on as a regular UI
+    if reply[0] != "ok":
+        conn.close()
+        if reply[0] == "stale":
+            _startZygote(resourcesDir)
+        return False
+
+    childPid = int(reply[1])
+
+    for fd in pipeFds:
+        os.close(fd)
+
+    def forwardSignal(sig, frame):
+        try:
+            os.kill(childPid, sig)
+        except OSError:
+            pass
+
+    signal.signal(signal.SIGINT, forwardSignal)
+    signal.signal(signal.SIGTERM, forwardSignal)
+
+    # the zygote sends the exit code once the UI is gone, EOF means the zygote itself died
+    while True:
+        try:
+            reply = conn.recv(64).decode("utf-8").split(" ", 1)
+            break
+        except InterruptedError:
+            pass
+        except OSError:
+            reply = [""]
+            break
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    if reply[0] == "exit":
+        os._exit(int(reply[1]))
+
+    os._exit(1)
+
+# ------------------------------------------------------------------------------------------------------------
+# Zygote side
+
+class CarlaUiZygote(object):
+    def __init__(self, resourcesDir, socketPath):
+        object.__init__(self)
+
+        self.fResourcesDir = resourcesDir
+        self.fSocketPath   = socketPath
+        self.fServer       = None
+        self.fLockFile     = None
+        self.fChildren     = {}
+        self.fModuleTimes  = {}
+        self.fWakeupFds    = ()
+        self.fImportEnv    = dict((name, os.getenv(name)) for name in ZYGOTE_IMPORT_ENV)
+
+    def lock(self):
+        import fcntl
+
+        self.fLockFile = open(self.fSocketPath + ".lock", "w")
+
+        try:
+            fcntl.flock(self.fLockFile, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+
+        return True
+
+    def preload(self):
+        from importlib import import_module
+
+        for name in ZYGOTE_PRELOAD_MODULES:
+            try:
+                module = import_module(name)
+            except Exception as e:
+                print("UI zygote failed to preload", name, e)
+                continue
+
+            filename = getattr(module, "__file__", None)
+
+            if filename and not name.startswith("PyQt5"):
+                self.fModuleTimes[filename] = os.stat(filename).st_mtime_ns
+
+    def listen(self):
+        # only reached while holding the lock, any socket left here is stale
+        try:
+            os.unlink(self.fSocketPath)
+        except FileNotFoundError:
+            pass
+
+        self.fServer = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self.fServer.bind(self.fSocketPath)
+        os.chmod(self.fSocketPath, 0o600)
+        self.fServer.listen(8)
+
+    def close(self):
+        if self.fServer is not None:
+            self.fServer.close()
+            self.fServer = None
+
+            try:
+                os.unlink(self.fSocketPath)
+            except OSError:
+                pass
+
+        if self.fLockFile is not None:
+            self.fLockFile.close()
+            self.fLockFile = None
+
+    def isStale(self):
+        for filename, mtime in self.fModuleTimes.items():
+            try:
+                if os.stat(filename).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+
+        return False
+
+    def exec_(self):
+        # wake up as soon as a UI exits, its exit code is what the host is waiting for
+        wakeupRecv, wakeupSend = os.pipe()
+        os.set_blocking(wakeupRecv, False)
+        os.set_blocking(wakeupSend, False)
+        self.fWakeupFds = (wakeupRecv, wakeupSend)
+
+        signal.signal(signal.SIGCHLD, lambda sig, frame: None)
+        signal.signal(signal.SIGTERM, lambda sig, frame: sys.exit(0))
+        signal.set_wakeup_fd(wakeupSend)
+
+        lastActivity = monotonic()
+
+        while self.fServer is not None:
+            readable, _, _ = select([self.fServer, wakeupRecv], [], [], 1.0)
+
+            if wakeupRecv in readable:
+                try:
+                    os.read(wakeupRecv, 512)
+                except BlockingIOError:
+                    pass
+
+            if self.fServer in readable:
+                conn, _ = self.fServer.accept()
+
+                try:
+                    self.handleRequest(conn)
+                except Exception as e:
+                    print("UI zygote request failed:", e)
+                    conn.close()
+
+            self.reapChildren()
+
+            if len(self.fChildren) != 0 or len(readable) != 0:
+                lastActivity = monotonic()
+            elif monotonic() - lastActivity >= ZYGOTE_IDLE_TIMEOUT:
+                break
+
+    def handleRequest(self, conn):
+        creds = ZYGOTE_PEERCRED.unpack(conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, ZYGOTE_PEERCRED.size))
+
+        if creds[1] != os.getuid():
+            conn.close()
+            return
+
+        fds = array("i")
+        msg, ancdata, flags, _ = conn.recvmsg(ZYGOTE_MAX_REQUEST_SIZE, socket.CMSG_LEN(ZYGOTE_MAX_FDS * fds.itemsize))
+
+        for level, type_, data in ancdata:
+            if level == socket.SOL_SOCKET and type_ == socket.SCM_RIGHTS:
+                fds.frombytes(data[:len(data) - (len(data) % fds.itemsize)])
+
+        try:
+            if len(fds) != ZYGOTE_MAX_FDS or flags & (socket.MSG_TRUNC | socket.MSG_CTRUNC):
+                conn.send(b"error request")
+                conn.close()
+                return
+
+            if self.isStale():
+                # code changed on disk, let the next UI start a new zygote
+                conn.send(b"stale")
+                conn.close()
+                self.close()
+                return
+
+            request = json.loads(msg.decode("utf-8"))
+            script  = request['script']
+            env     = request['env']
+
+            if os.path.dirname(os.path.realpath(script)) != self.fResourcesDir:
+                conn.send(b"error script")
+                conn.close()
+                return
+
+            if any(env.get(name) != value for name, value in self.fImportEnv.items()):
+                conn.send(b"error env")
+                conn.close()
+                return
+
+            sys.stdout.flush()
+            sys.stderr.flush()
+
+            pid = os.fork()
+
+            if pid == 0:
+                self.runChild(conn, fds, request)
+                # not reached
+
+            self.fChildren[pid] = conn
+            conn.send(("ok %i" % pid).encode("utf-8"))
+
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+    def runChild(self, conn, fds, request):
+        global gIsZygoteChild
+        gIsZygoteChild = True
+
+        exitCode = 1
+
+        try:
+            self.fServer.close()
+
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+            for fd in self.fWakeupFds:
+                os.close(fd)
+
+            for otherConn in self.fChildren.values():
+                otherConn.close()
+
+            for fd in (0, 1, 2):
+                os.dup2(fds[fd], fd)
+
+            for fd in fds[0:3]:
+                if fd > 2:
+                    os.close(fd)
+
+            argv = request['argv']
+            argv[3:7] = [str(fd) for fd in fds[3:7]]
+
+            os.environ.clear()
+            os.environ.update(request['env'])
+            os.chdir(request['cwd'])
+
+            # modules imported in the zygote keep a reference to the original list
+            sys.argv[:] = argv
+
+            # exit as soon as the process waiting on us goes away
+            def lifeline():
+                try:
+                    while conn.recv(64):
+                        pass
+                except OSError:
+                    pass
+                os._exit(1)
+
+            from threading import Thread
+            Thread(target=lifeline, daemon=True).start()
+
+            from runpy import run_path
+            run_path(request['script'], run_name="__main__")
+            exitCode = 0
+
+        except SystemExit as e:
+            if e.code is None:
+                exitCode = 0
+            elif isinstance(e.code, int):
+                exitCode = e.code
+            else:
+                print(e.code, file=sys.stderr)
+
+        except:
+            import traceback
+            traceback.print_exc()
+
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(exitCode)
+
+    def reapChildren(self):
+        while len(self.fChildren) > 0:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+
+            if pid == 0:
+                break
+
+            conn = self.fChildren.pop(pid, None)
+
+            if conn is None:
+                continue
+
+            if os.WIFEXITED(status):
+                exitCode = os.WEXITSTATUS(status)
+            else:
+                exitCode = 128 + os.WTERMSIG(status)
+
+            try:
+                conn.send(("exit %i" % exitCode).encode("utf-8"))
+            except OSError:
+                pass
+
+            conn.close()
+
+def runZygote():
+    if not _isUsable():
+        return
+
+    resourcesDir = _getResourcesDir()
+    socketPath   = _getSocketPath(resourcesDir)
+
+    if socketPath is None:
+        return
+
+    zygote = CarlaUiZygote(resourcesDir, socketPath)
+
+    # another zygote is already running or starting
+    if not zygote.lock():
+        return
+
+    try:
+        zygote.preload()
+        zygote.listen()
+        zygote.exec_()
+    finally:
+        zygote.close()
+
+# ------------------------------------------------------------------------------------------------------------
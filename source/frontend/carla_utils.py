@@ -208,6 +208,12 @@ class CarlaUtils(object):
         self.lib.carla_pipe_client_is_running.argtypes = [CarlaPipeClientHandle]
         self.lib.carla_pipe_client_is_running.restype = c_bool
 
+        self.lib.carla_pipe_client_idle_for.argtypes = [CarlaPipeClientHandle, c_uint]
+        self.lib.carla_pipe_client_idle_for.restype = c_uint
+
+        self.lib.carla_pipe_client_get_read_fd.argtypes = [CarlaPipeClientHandle]
+        self.lib.carla_pipe_client_get_read_fd.restype = c_int
+
         self.lib.carla_pipe_client_lock.argtypes = [CarlaPipeClientHandle]
         self.lib.carla_pipe_client_lock.restype = None
 
@@ -229,6 +235,9 @@ class CarlaUtils(object):
         self.lib.carla_pipe_client_flush_and_unlock.argtypes = [CarlaPipeClientHandle]
         self.lib.carla_pipe_client_flush_and_unlock.restype = c_bool
 
+        self.lib.carla_pipe_client_send_msg.argtypes = [CarlaPipeClientHandle, c_char_p]
+        self.lib.carla_pipe_client_send_msg.restype = c_bool
+
         self.lib.carla_pipe_client_destroy.argtypes = [CarlaPipeClientHandle]
         self.lib.carla_pipe_client_destroy.restype = None
 
@@ -330,6 +339,12 @@ class CarlaUtils(object):
     def pipe_client_is_running(self, handle):
         return bool(self.lib.carla_pipe_client_is_running(handle))
 
+    def pipe_client_idle_for(self, handle, timeLimit):
+        return int(self.lib.carla_pipe_client_idle_for(handle, timeLimit))
+
+    def pipe_client_get_read_fd(self, handle):
+        return int(self.lib.carla_pipe_client_get_read_fd(handle))
+
     def pipe_client_lock(self, handle):
         self.lib.carla_pipe_client_lock(handle)
 
@@ -339,6 +354,10 @@ class CarlaUtils(object):
     def pipe_client_readlineblock(self, handle, timeout):
         return charPtrToString(self.lib.carla_pipe_client_readlineblock(handle, timeout))
 
+    # same as pipe_client_readlineblock, but returns the bytes as read, without decoding them
+    def pipe_client_readlineblock_bytes(self, handle, timeout):
+        return self.lib.carla_pipe_client_readlineblock(handle, timeout) or b""
+
     def pipe_client_write_msg(self, handle, msg):
         return bool(self.lib.carla_pipe_client_write_msg(handle, msg.encode("utf-8")))
 
@@ -351,6 +370,9 @@ class CarlaUtils(object):
     def pipe_client_flush_and_unlock(self, handle):
         return bool(self.lib.carla_pipe_client_flush_and_unlock(handle))
 
+    def pipe_client_send_msg(self, handle, msg):
+        return bool(self.lib.carla_pipe_client_send_msg(handle, msg.encode("utf-8")))
+
     def pipe_client_destroy(self, handle):
         self.lib.carla_pipe_client_destroy(handle)
 
@@ -16,11 +16,26 @@
 #
 # For a full copy of the GNU General Public License see the doc/GPL.txt file.
 
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+from PyQt5.QtCore import QSocketNotifier, QTimer
+
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Custom Stuff)
 
 from carla_shared import *
 
+# ------------------------------------------------------------------------------------------------------------
+# Maximum time in ms spent handling messages each time the pipe becomes readable
+
+EXTERNAL_UI_PIPE_TIME_LIMIT = 10
+
+# ------------------------------------------------------------------------------------------------------------
+# How much slower the idle timer runs while the pipe notifier handles reads, see startIdleTimer()
+
+EXTERNAL_UI_NOTIFIER_IDLE_SLOWDOWN = 4
+
 # ------------------------------------------------------------------------------------------------------------
 # External UI
 
@@ -39,6 +54,37 @@ class ExternalUI(object):
             self.fUiName     = "TestUI"
             self.fPipeClient = None
 
+        # message handlers, looked up by the first line of each message
+        self.fMsgHandlers = {
+            "control":   self._msgControl,
+            "program":   self._msgProgram,
+            "configure": self._msgConfigure,
+            "note":      self._msgNote,
+            "show":      self.uiShow,
+            "focus":     self.uiFocus,
+            "hide":      self.uiHide,
+            "quit":      self._msgQuit,
+            "uiTitle":   self._msgUiTitle,
+        }
+
+        # control values waiting to be sent, only the last value per index is kept
+        self.fPendingControls = {}
+        self.fControlsFlushScheduled = False
+
+        # idle timer of the UI, see startIdleTimer()
+        self.fIdleTimer    = 0
+        self.fIdleInterval = 0
+
+        # the pipe is read when it has data instead of polling it, if the platform allows
+        self.fPipeNotifier = None
+
+        if self.fPipeClient is not None:
+            pipeReadFd = gCarla.utils.pipe_client_get_read_fd(self.fPipeClient)
+
+            if pipeReadFd >= 0:
+                self.fPipeNotifier = QSocketNotifier(pipeReadFd, QSocketNotifier.Read)
+                self.fPipeNotifier.activated.connect(self.pipeReadable)
+
     # -------------------------------------------------------------------
     # Public methods
 
@@ -52,18 +98,57 @@ class ExternalUI(object):
             return gCarla.utils.pipe_client_is_running(self.fPipeClient)
         return False
 
+    # Starts the idle timer (UIs are also QObjects), subclasses call idleExternalUI() from timerEvent().
+    # It runs slower while the pipe notifier handles reads, idle has little left to do then.
+    def startIdleTimer(self, interval):
+        self.fIdleInterval = interval
+
+        if self.fPipeNotifier is not None:
+            interval *= EXTERNAL_UI_NOTIFIER_IDLE_SLOWDOWN
+
+        self.fIdleTimer = self.startTimer(interval)
+
     def idleExternalUI(self):
         if self.fPipeClient is not None:
-            gCarla.utils.pipe_client_idle(self.fPipeClient)
+            self.flushControls()
+
+            if self.fPipeNotifier is None:
+                gCarla.utils.pipe_client_idle(self.fPipeClient)
+
+    def pipeReadable(self, fd):
+        if self.fPipeClient is None:
+            return
+
+        self.flushControls()
+
+        # readable without any message means the host closed the pipe, go back to polling
+        if gCarla.utils.pipe_client_idle_for(self.fPipeClient, EXTERNAL_UI_PIPE_TIME_LIMIT) == 0:
+            self.removePipeNotifier()
+
+    def removePipeNotifier(self):
+        if self.fPipeNotifier is None:
+            return
+
+        self.fPipeNotifier.setEnabled(False)
+        self.fPipeNotifier = None
+
+        # back to polling, at the normal rate
+        if self.fIdleTimer != 0:
+            self.killTimer(self.fIdleTimer)
+            self.fIdleTimer = self.startTimer(self.fIdleInterval)
 
     def closeExternalUI(self):
         if self.fPipeClient is None:
             return
 
+        # last control changes go out before the pipe is gone, even if the host asked us to quit
+        self.flushControls()
+
         # FIXME
         if not self.fQuitReceived:
             self.send(["exiting"])
 
+        self.removePipeNotifier()
         gCarla.utils.pipe_client_destroy(self.fPipeClient)
         self.fPipeClient = None
 
@@ -73,8 +158,31 @@ class ExternalUI(object):
     def getSampleRate(self):
         return self.fSampleRate
 
+    # queued, sent on the next idle or before any other message
     def sendControl(self, index, value):
-        self.send(["control", index, value])
+        self.fPendingControls[index] = value
+
+        # the idle timer is slowed down while the notifier handles reads, do not wait for it
+        if self.fPipeNotifier is not None and self.fIdleTimer != 0 and not self.fControlsFlushScheduled:
+            self.fControlsFlushScheduled = True
+            QTimer.singleShot(self.fIdleInterval, self._flushScheduledControls)
+
+    def _flushScheduledControls(self):
+        self.fControlsFlushScheduled = False
+
+        if self.fPipeClient is not None:
+            self.flushControls()
+
+    def flushControls(self):
+        if len(self.fPendingControls) == 0:
+            return True
+
+        lines = []
+        for index, value in self.fPendingControls.items():
+            lines += ["control", index, value]
+
+        self.fPendingControls = {}
+        return self.sendLines(lines)
 
     def sendProgram(self, channel, bank, program):
         self.send(["program", channel, bank, program])
@@ -127,48 +235,44 @@ class ExternalUI(object):
         #if not msg:
             #return
 
-        if msg == "control":
-            index = int(self.readlineblock())
-            value = float(self.readlineblock())
-            self.dspParameterChanged(index, value)
-
-        elif msg == "program":
-            channel = int(self.readlineblock())
-            bank    = int(self.readlineblock())
-            program = int(self.readlineblock())
-            self.dspProgramChanged(channel, bank, program)
-
-        elif msg == "configure":
-            key   = self.readlineblock() #.replace("\r", "\n")
-            value = self.readlineblock() #.replace("\r", "\n")
-            self.dspStateChanged(key, value)
-
-        elif msg == "note":
-            onOff    = bool(self.readlineblock() == "true")
-            channel  = int(self.readlineblock())
-            note     = int(self.readlineblock())
-            velocity = int(self.readlineblock())
-            self.dspNoteReceived(onOff, channel, note, velocity)
-
-        elif msg == "show":
-            self.uiShow()
+        handler = self.fMsgHandlers.get(msg, None)
 
-        elif msg == "focus":
-            self.uiFocus()
+        if handler is None:
+            print("unknown message: \"" + msg + "\"")
+            return
 
-        elif msg == "hide":
-            self.uiHide()
+        handler()
 
-        elif msg == "quit":
-            self.fQuitReceived = True
-            self.uiQuit()
+    def _msgControl(self):
+        index = int(self.readlineblock())
+        value = float(self.readlineblock())
+        self.dspParameterChanged(index, value)
 
-        elif msg == "uiTitle":
-            uiTitle = self.readlineblock() #.replace("\r", "\n")
-            self.uiTitleChanged(uiTitle)
+    def _msgProgram(self):
+        channel = int(self.readlineblock())
+        bank    = int(self.readlineblock())
+        program = int(self.readlineblock())
+        self.dspProgramChanged(channel, bank, program)
 
-        else:
-            print("unknown message: \"" + msg + "\"")
+    def _msgConfigure(self):
+        key   = self.readlineblock() #.replace("\r", "\n")
+        value = self.readlineblock() #.replace("\r", "\n")
+        self.dspStateChanged(key, value)
+
+    def _msgNote(self):
+        onOff    = bool(self.readlineblock() == "true")
+        channel  = int(self.readlineblock())
+        note     = int(self.readlineblock())
+        velocity = int(self.readlineblock())
+        self.dspNoteReceived(onOff, channel, note, velocity)
+
+    def _msgQuit(self):
+        self.fQuitReceived = True
+        self.uiQuit()
+
+    def _msgUiTitle(self):
+        uiTitle = self.readlineblock() #.replace("\r", "\n")
+        self.uiTitleChanged(uiTitle)
 
     # -------------------------------------------------------------------
     # Internal stuff
@@ -179,33 +283,43 @@ class ExternalUI(object):
 
         return gCarla.utils.pipe_client_readlineblock(self.fPipeClient, 5000)
 
+    def readlineblockBytes(self):
+        if self.fPipeClient is None:
+            return b""
+
+        return gCarla.utils.pipe_client_readlineblock_bytes(self.fPipeClient, 5000)
+
     def send(self, lines):
         if self.fPipeClient is None or len(lines) == 0:
             return False
 
-        hasError = False
-        gCarla.utils.pipe_client_lock(self.fPipeClient)
-
-        try:
-            for line in lines:
-                if line is None:
-                    line2 = "(null)"
-                elif isinstance(line, str):
-                    line2 = line.replace("\n", "\r")
-                elif isinstance(line, bool):
-                    line2 = "true" if line else "false"
-                elif isinstance(line, int):
-                    line2 = "%i" % line
-                elif isinstance(line, float):
-                    line2 = "%.10f" % line
-                else:
-                    print("unknown data type to send:", type(line))
-                    hasError = True
-                    break
-
-                if not gCarla.utils.pipe_client_write_msg(self.fPipeClient, line2 + "\n"):
-                    hasError = True
-                    break
-
-        finally:
-            return gCarla.utils.pipe_client_flush_and_unlock(self.fPipeClient) and not hasError
+        # keep message order, pending controls go first
+        if not self.flushControls():
+            return False
+
+        return self.sendLines(lines)
+
+    # write all lines as a single buffer, one call into the pipe
+    def sendLines(self, lines):
+        if self.fPipeClient is None:
+            return False
+
+        msg = []
+
+        for line in lines:
+            if line is None:
+                msg.append("(null)")
+            elif isinstance(line, str):
+                msg.append(line.replace("\n", "\r"))
+            elif isinstance(line, bool):
+                msg.append("true" if line else "false")
+            elif isinstance(line, int):
+                msg.append("%i" % line)
+            elif isinstance(line, float):
+                msg.append("%.10f" % line)
+            else:
+                print("unknown data type to send:", type(line))
+                return False
+
+        msg.append("")
+        return gCarla.utils.pipe_client_send_msg(self.fPipeClient, "\n".join(msg))
@@ -19,7 +19,7 @@
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
-from PyQt5.QtCore import pyqtSignal, pyqtSlot, Qt, QPoint, QSize, QUrl
+from PyQt5.QtCore import pyqtSignal, pyqtSlot, Qt, QPoint, QSize, QSocketNotifier, QTimer, QUrl
 from PyQt5.QtGui import QImage, QPainter, QPalette
 from PyQt5.QtWidgets import QApplication, QMainWindow
 from PyQt5.QtWebKit import QWebSettings
@@ -31,6 +31,7 @@ import sys
 # Imports (Custom)
 
 from carla_host import charPtrToString, gCarla
+from externalui import EXTERNAL_UI_PIPE_TIME_LIMIT
 from .webserver import WebServerThread, PORT
 
 # ------------------------------------------------------------------------------------------------------------
@@ -38,6 +39,11 @@ from .webserver import WebServerThread, PORT
 
 from mod.utils import get_plugin_info, init as lv2_init
 
+# ------------------------------------------------------------------------------------------------------------
+# Interval of the idle timer in ms, it stops once the GUI is set up if the pipe notifier handles reads
+
+MODGUI_IDLE_INTERVAL = 30
+
 # ------------------------------------------------------------------------------------------------------------
 # Host Window
 
@@ -64,6 +70,7 @@ class HostWindow(QMainWindow):
         self.fSizeSetup    = False
         self.fQuitReceived = False
         self.fWasRepainted = False
+        self.fRepaintCheckScheduled = False
 
         lv2_init()
 
@@ -88,6 +95,16 @@ class HostWindow(QMainWindow):
         else:
             self.fPipeClient = None
 
+        # read the pipe when it has data instead of polling it, if the platform allows
+        self.fPipeNotifier = None
+
+        if self.fPipeClient is not None:
+            pipeReadFd = gCarla.utils.pipe_client_get_read_fd(self.fPipeClient)
+
+            if pipeReadFd >= 0:
+                self.fPipeNotifier = QSocketNotifier(pipeReadFd, QSocketNotifier.Read, self)
+                self.fPipeNotifier.activated.connect(self.slot_pipeReadable)
+
         # ----------------------------------------------------------------------------------------------------
         # Init Web server
 
@@ -133,7 +150,7 @@ class HostWindow(QMainWindow):
         # ----------------------------------------------------------------------------------------------------
         # Final setup
 
-        self.fIdleTimer = self.startTimer(30)
+        self.fIdleTimer = self.startTimer(MODGUI_IDLE_INTERVAL)
 
         if self.fPipeClient is None:
             # testing, show UI only
@@ -151,12 +168,14 @@ class HostWindow(QMainWindow):
         if not self.fQuitReceived:
             self.send(["exiting"])
 
+        self.removePipeNotifier()
         gCarla.utils.pipe_client_destroy(self.fPipeClient)
         self.fPipeClient = None
 
     def idleStuff(self):
         if self.fPipeClient is not None:
-            gCarla.utils.pipe_client_idle(self.fPipeClient)
+            if self.fPipeNotifier is None:
+                gCarla.utils.pipe_client_idle(self.fPipeClient)
             self.checkForRepaintChanges()
 
         if self.fSizeSetup:
@@ -219,6 +238,9 @@ class HostWindow(QMainWindow):
         # set initial values
         self.fCurrentFrame.evaluateJavaScript("icongui.setPortValue(':bypass', 0, null)")
 
+        # all changed controls go out together in a single write
+        lines = []
+
         for index in self.fPortValues.keys():
             symbol, isOutput = self.fPortSymbols[index]
             value            = self.fPortValues[index]
@@ -232,6 +254,11 @@ class HostWindow(QMainWindow):
         self.fSizeSetup    = True
         self.fDocElemement = None
 
+        # the notifier handles reads, and changes are checked when the page repaints
+        if self.fPipeNotifier is not None:
+            self.killTimer(self.fIdleTimer)
+            self.fIdleTimer = 0
+
         if self.fNeedsShow:
             self.show()
 
@@ -255,10 +282,35 @@ class HostWindow(QMainWindow):
 
             if oldValue != newValue:
                 self.fPortValues[index] = newValue
-                self.send(["control", index, newValue])
+                lines += ["control", index, newValue]
+
+        self.send(lines)
+
+    # --------------------------------------------------------------------------------------------------------
+
+    def removePipeNotifier(self):
+        if self.fPipeNotifier is None:
+            return
+
+        self.fPipeNotifier.setEnabled(False)
+        self.fPipeNotifier = None
+
+        # back to polling
+        if self.fIdleTimer == 0:
+            self.fIdleTimer = self.startTimer(MODGUI_IDLE_INTERVAL)
 
     # --------------------------------------------------------------------------------------------------------
 
+    @pyqtSlot(int)
+    def slot_pipeReadable(self, fd):
+        if self.fPipeClient is None:
+            return
+
+        # handle messages for a limited time, the notifier fires again if more are waiting
+        # readable without any message means the host closed the pipe, go back to polling
+        if gCarla.utils.pipe_client_idle_for(self.fPipeClient, EXTERNAL_UI_PIPE_TIME_LIMIT) == 0:
+            self.removePipeNotifier()
+
     @pyqtSlot(bool)
     def slot_webviewLoadFinished(self, ok):
         page = self.fWebview.page()
@@ -268,8 +320,22 @@ class HostWindow(QMainWindow):
         self.fDocElemement = self.fCurrentFrame.documentElement()
 
     def slot_repaintRequested(self):
-        if self.fCanSetValues:
-            self.fWasRepainted = True
+        if not self.fCanSetValues:
+            return
+
+        self.fWasRepainted = True
+
+        # without idle timer, check once repaints settle like the timer would
+        if self.fIdleTimer == 0 and not self.fRepaintCheckScheduled:
+            self.fRepaintCheckScheduled = True
+            QTimer.singleShot(MODGUI_IDLE_INTERVAL, self.slot_checkForRepaintChanges)
+
+    @pyqtSlot()
+    def slot_checkForRepaintChanges(self):
+        self.fRepaintCheckScheduled = False
+
+        if self.fPipeClient is not None:
+            self.checkForRepaintChanges()
 
     # --------------------------------------------------------------------------------------------------------
     # Callback
@@ -433,27 +499,23 @@ class HostWindow(QMainWindow):
         if self.fPipeClient is None or len(lines) == 0:
             return
 
-        gCarla.utils.pipe_client_lock(self.fPipeClient)
-
-        # this must never fail, we need to unlock at the end
-        try:
-            for line in lines:
-                if line is None:
-                    line2 = "(null)"
-                elif isinstance(line, str):
-                    line2 = line.replace("\n", "\r")
-                elif isinstance(line, bool):
-                    line2 = "true" if line else "false"
-                elif isinstance(line, int):
-                    line2 = "%i" % line
-                elif isinstance(line, float):
-                    line2 = "%.10f" % line
-                else:
-                    print("unknown data type to send:", type(line))
-                    return
-
-                gCarla.utils.pipe_client_write_msg(self.fPipeClient, line2 + "\n")
-        except:
-            pass
-
-        gCarla.utils.pipe_client_flush_and_unlock(self.fPipeClient)
+        msg = []
+
+        for line in lines:
+            if line is None:
+                msg.append("(null)")
+            elif isinstance(line, str):
+                msg.append(line.replace("\n", "\r"))
+            elif isinstance(line, bool):
+                msg.append("true" if line else "false")
+            elif isinstance(line, int):
+                msg.append("%i" % line)
+            elif isinstance(line, float):
+                msg.append("%.10f" % line)
+            else:
+                print("unknown data type to send:", type(line))
+                return
+
+        # single write, the pipe is locked and flushed on the C side
+        msg.append("")
+        gCarla.utils.pipe_client_send_msg(self.fPipeClient, "\n".join(msg))
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Benchmark for the carla-control OSC client.
+# A separate process emulates the engine side of the /ctrl/* protocol on loopback,
+# while this process drives CarlaHostOSC and its TCP/UDP control servers the same way carla-control does.
+
+# --------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "frontend"))
+
+from argparse import ArgumentParser
+from multiprocessing import Pipe, Process
+from select import select
+from time import monotonic, perf_counter, process_time, sleep
+
+from liblo import Address, Server, send as lo_send, TCP as LO_TCP, UDP as LO_UDP
+
+from carla_control import *
+
+# --------------------------------------------------------------------------------------------------------
+# Engine side, runs in its own process
+
+class FakeEngine(object):
+    def __init__(self, conn):
+        self.conn = conn
+        self.serverTCP = Server(proto=LO_TCP)
+        self.serverUDP = Server(proto=LO_UDP)
+        self.serverTCP.add_method("/register", None, self.registerTCP)
+        self.serverUDP.add_method("/register", None, self.registerUDP)
+        self.serverTCP.add_method(None, None, self.ignore)
+        self.serverUDP.add_method(None, None, self.ignore)
+        self.targetTCP = None
+        self.targetUDP = None
+
+    def registerTCP(self, path, args):
+        self.targetTCP = Address(args[0])
+
+    def registerUDP(self, path, args):
+        self.targetUDP = Address(args[0])
+
+    def ignore(self, path, args):
+        pass
+
+    def run(self):
+        self.conn.send((self.serverTCP.get_url() + "Carla", self.serverUDP.get_url() + "Carla"))
+
+        while self.targetTCP is None or self.targetUDP is None:
+            self.serverTCP.recv(10)
+            self.serverUDP.recv(10)
+
+        while True:
+            cmd = self.conn.recv()
+
+            if cmd[0] == "quit":
+                break
+
+            sendTimes = getattr(self, "scenario_" + cmd[0])(*cmd[1:])
+            self.conn.send(sendTimes)
+
+    # a plugin with all its info and parameters, returns the number of messages sent
+    def addPlugin(self, target, pluginId, paramCount):
+        lo_send(target, "/ctrl/cb", ENGINE_CALLBACK_PLUGIN_ADDED, pluginId, 0, 0, 0, 0.0, "Plugin %i" % pluginId)
+        lo_send(target, "/ctrl/info",
+                pluginId, PLUGIN_LV2, PLUGIN_CATEGORY_NONE, 0, ("h", 0), 0, 0,
+                "Plugin %i" % pluginId, "", "", "Plugin %i" % pluginId, "urn:bench", "Carla", "GPL")
+        lo_send(target, "/ctrl/ports", pluginId, 2, 2, 1, 1, paramCount, paramCount, paramCount * 2)
+
+        for paramId in range(paramCount * 2):
+            lo_send(target, "/ctrl/param",
+                    pluginId, paramId, PARAMETER_INPUT if paramId < paramCount else PARAMETER_OUTPUT, 0, 0, -1,
+                    "Param %i" % paramId, "", 0.0, 0.0, 1.0, 0.01, 0.0001, 0.1, 0.0)
+
+        return 3 + paramCount * 2
+
+    # plugins added one by one with all their info and parameters.
+    # they are kept, the other scenarios update these plugins.
+    def scenario_storm(self, pluginCount, paramCount):
+        target = self.targetTCP
+        start = monotonic()
+        sent = 1
+
+        lo_send(target, "/ctrl/cb", ENGINE_CALLBACK_ENGINE_STARTED, pluginCount, 0, 0, 512, 48000.0, "Dummy")
+
+        for pluginId in range(pluginCount):
+            sent += self.addPlugin(target, pluginId, paramCount)
+
+        # single sample, the time the whole storm was started
+        return (sent, { None: start })
+
+    # all plugins removed and added again, several times.
+    # ends with the same plugins as before, so the scenarios after this one still have them.
+    def scenario_churn(self, pluginCount, paramCount, rounds):
+        target = self.targetTCP
+        start = monotonic()
+        sent = 0
+
+        for _ in range(rounds):
+            for pluginId in reversed(range(pluginCount)):
+                lo_send(target, "/ctrl/cb", ENGINE_CALLBACK_PLUGIN_REMOVED, pluginId, 0, 0, 0, 0.0, "")
+                sent += 1
+
+            for pluginId in range(pluginCount):
+                sent += self.addPlugin(target, pluginId, paramCount)
+
+        # single sample, the time the first removal was sent
+        return (sent, { None: start })
+
+    # output parameter values for every plugin, as fast as possible
+    def scenario_params(self, pluginCount, paramCount, rounds, interval):
+        target = self.targetUDP
+        sendTimes = {}
+        seq = 0
+
+        for value in range(1, rounds + 1):
+            for pluginId in range(pluginCount):
+                for paramId in range(paramCount, paramCount * 2):
+                    seq += 1
+                    sendTimes[(pluginId, paramId, float(value))] = monotonic()
+                    lo_send(target, "/ctrl/param", pluginId, paramId, float(value), ("h", seq))
+
+            if interval > 0:
+                sleep(interval)
+
+        return (seq, sendTimes)
+
+    # peaks and runtime info at the engine thread rate
+    def scenario_peaks(self, pluginCount, paramCount, rounds, interval):
+        target = self.targetUDP
+        sendTimes = {}
+        seq = 0
+
+        for value in range(1, rounds + 1):
+            for pluginId in range(pluginCount):
+                seq += 1
+                sendTimes[(pluginId, -1, float(value))] = monotonic()
+                lo_send(target, "/ctrl/peaks", pluginId, float(value), 0.5, 0.5, 0.5, ("h", seq))
+
+            seq += 1
+            lo_send(target, "/ctrl/runtime", 0.5, value, 1, ("h", value * 512), 1, 1, 0, 120.0, ("h", seq))
+
+            if interval > 0:
+                sleep(interval)
+
+        return (seq, sendTimes)
+
+def runFakeEngine(conn):
+    FakeEngine(conn).run()
+
+# --------------------------------------------------------------------------------------------------------
+# Client side, records when each value reaches the host
+
+class BenchmarkHost(CarlaHostOSC):
+    def __init__(self):
+        CarlaHostOSC.__init__(self)
+        self.fAppliedTimes = {}
+
+    def _set_parameterValue(self, pluginId, paramIndex, value):
+        self.fAppliedTimes[(pluginId, paramIndex, value)] = monotonic()
+        CarlaHostOSC._set_parameterValue(self, pluginId, paramIndex, value)
+
+    def _set_peaks(self, pluginId, in1, in2, out1, out2):
+        self.fAppliedTimes[(pluginId, -1, in1)] = monotonic()
+        CarlaHostOSC._set_peaks(self, pluginId, in1, in2, out1, out2)
+
+class BenchmarkClient(object):
+    def __init__(self, host):
+        self.host = host
+        self.guiTime = 0.0
+        self.received = 0
+        self.lastReceivedTime = 0.0
+
+    # one iteration of the GUI event loop, UDP when readable and TCP on every tick, like HostWindowOSC
+    def idle(self, timeout):
+        readable, _, _ = select([self.host.lo_server_udp.fileno()], [], [], timeout)
+
+        start = perf_counter()
+
+        if readable:
+            self.received += self.host.lo_server_udp.idle()
+
+        self.received += self.host.lo_server_tcp.idle()
+
+        self.guiTime += perf_counter() - start
+
+    def drain(self, conn, quietTime):
+        lastReceived = monotonic()
+        result = None
+
+        while result is None or monotonic() - lastReceived < quietTime:
+            received = self.received
+            self.idle(0.001)
+
+            if self.received != received:
+                lastReceived = self.lastReceivedTime = monotonic()
+
+            if result is None and conn.poll():
+                result = conn.recv()
+
+        return result
+
+def percentile(values, pct):
+    if len(values) == 0:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * pct / 100.0))]
+
+def runScenario(conn, client, name, args, quietTime):
+    host = client.host
+    host.fAppliedTimes = {}
+    client.guiTime = 0.0
+    client.received = 0
+
+    cpuStart = process_time()
+    wallStart = monotonic()
+
+    conn.send((name,) + args)
+    sent, sendTimes = client.drain(conn, quietTime)
+
+    wallTime = monotonic() - wallStart - quietTime
+    cpuTime = process_time() - cpuStart
+
+    # no per-message samples, use the time until the last message was handled
+    if None in sendTimes:
+        latencies = [client.lastReceivedTime - sendTimes[None]]
+    else:
+        latencies = sorted(applied - sendTimes[key]
+                           for key, applied in host.fAppliedTimes.items()
+                           if key in sendTimes)
+
+    print("%s:" % name)
+    print("  messages       %i sent, %i received (%.1f%% lost)" % (sent,
+                                                                    client.received,
+                                                                    100.0 * (sent - client.received) / max(1, sent)))
+    print("  throughput     %.0f msgs/s" % (client.received / max(wallTime, 1e-9)))
+    print("  latency (ms)   p50 %.3f, p90 %.3f, p99 %.3f, max %.3f (%i samples)" % (percentile(latencies, 50) * 1000,
+                                                                                   percentile(latencies, 90) * 1000,
+                                                                                   percentile(latencies, 99) * 1000,
+                                                                                   percentile(latencies, 100) * 1000,
+                                                                                   len(latencies)))
+    print("  GUI thread     %.3f ms handling messages, %.3f us per message, %.3f s process CPU" % (
+          client.guiTime * 1000, client.guiTime * 1000000 / max(1, client.received), cpuTime))
+
+# --------------------------------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="carla-control OSC throughput and latency benchmark")
+    parser.add_argument("--plugins", type=int, default=200)
+    parser.add_argument("--params", type=int, default=8, help="input and output parameters per plugin")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=25.0, help="ms between peak rounds, like the engine thread")
+    parser.add_argument("--churn-rounds", type=int, default=3, help="times all plugins are removed and added again")
+    parser.add_argument("--scenario", choices=("all", "storm", "churn", "params", "peaks"), default="all")
+    parser.add_argument("--quiet-time", type=float, default=0.25, help="s without messages before a scenario ends")
+    args = parser.parse_args()
+
+    conn, engineConn = Pipe()
+    engine = Process(target=runFakeEngine, args=(engineConn,))
+    engine.start()
+
+    urlTCP, urlUDP = conn.recv()
+
+    host = BenchmarkHost()
+    host.lo_server_tcp = CarlaControlServerTCP(host, "")
+    host.lo_server_udp = CarlaControlServerUDP(host, "")
+    host.lo_target_tcp = Address(urlTCP)
+    host.lo_target_udp = Address(urlUDP)
+    host.lo_target_tcp_name = urlTCP.rsplit("/", 1)[-1]
+    host.lo_target_udp_name = urlUDP.rsplit("/", 1)[-1]
+
+    host.registerTCP(host.lo_target_tcp, host.lo_server_tcp)
+    lo_send(host.lo_target_udp, "/register", host.lo_server_udp.getFullURL())
+
+    client = BenchmarkClient(host)
+
+    # the storm also sets up the plugins and parameters used by the other scenarios
+    runScenario(conn, client, "storm", (args.plugins, args.params), args.quiet_time)
+
+    if args.scenario in ("all", "churn"):
+        runScenario(conn, client, "churn", (args.plugins, args.params, args.churn_rounds), args.quiet_time)
+
+    if args.scenario in ("all", "params"):
+        runScenario(conn, client, "params", (args.plugins, args.params, args.rounds, 0.0), args.quiet_time)
+
+    if args.scenario in ("all", "peaks"):
+        runScenario(conn, client, "peaks", (args.plugins, args.params, args.rounds, args.interval / 1000.0),
+                    args.quiet_time)
+
+    conn.send(("quit",))
+    engine.join()
+
+# --------------------------------------------------------------------------------------------------------
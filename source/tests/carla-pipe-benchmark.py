@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Throughput benchmark for the host <-> UI pipe protocol.
+# A forked stub server plays the engine side of a real pipe pair (the same fds and arguments CarlaPipeServer uses),
+# while this process reads it through CarlaUtils pipe_client_* with ExternalUI and the carla-plugin message handlers.
+# The stub sends pre-encoded data with one write per engine flush, so its numbers are the I/O part of the engine side.
+
+# --------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+
+sourceDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(sourceDir, "frontend"))
+
+from argparse import ArgumentParser
+from importlib.machinery import SourceFileLoader
+from importlib.util import module_from_spec, spec_from_loader
+from multiprocessing import Pipe
+from select import select
+from time import monotonic, perf_counter, process_time
+
+from PyQt5.QtCore import QCoreApplication
+
+from carla_backend import *
+from carla_shared import *
+from carla_utils import *
+from externalui import ExternalUI
+
+# --------------------------------------------------------------------------------------------------------
+# Engine side, runs in a forked process
+
+# number of lines following each message tag the UI can send
+UI_MESSAGE_ARGS = {
+    "control": 2,
+    "set_parameter_value": 3,
+    "enable_shm_table": 0,
+    "exiting": 0,
+    "bench-done": 0,
+}
+
+class StubServer(object):
+    def __init__(self, recvFd, sendFd, conn, args):
+        self.fRecvFd = recvFd
+        self.fSendFd = sendFd
+        self.fConn   = conn
+        self.fArgs   = args
+        self.fBuffer = b""
+        self.fBytesRead = 0
+
+    def run(self):
+        # first message from the client is an empty line
+        self.readLine()
+
+        while True:
+            cmd = self.fConn.recv()
+
+            if cmd[0] == "quit":
+                break
+
+            if cmd[0] == "recv":
+                self.fConn.send(self.receiveUntilDone())
+            else:
+                self.fConn.send(self.sendScenario(getattr(self, "encode_" + cmd[0])()))
+
+    def readLine(self):
+        while True:
+            pos = self.fBuffer.find(b"\n")
+
+            if pos >= 0:
+                line = self.fBuffer[:pos]
+                self.fBuffer = self.fBuffer[pos+1:]
+                return line
+
+            data = os.read(self.fRecvFd, 65536)
+
+            if not data:
+                raise EOFError("client closed the pipe")
+
+            self.fBytesRead += len(data)
+            self.fBuffer += data
+
+    def waitForDone(self):
+        while True:
+            tag = self.readLine().decode("utf-8")
+
+            if tag == "bench-done":
+                return
+
+            for _ in range(UI_MESSAGE_ARGS.get(tag, 0)):
+                self.readLine()
+
+    # chunks are written one by one, like the engine flushing after each message or message group
+    def sendScenario(self, scenario):
+        messages, chunks = scenario
+
+        cpuStart  = process_time()
+        wallStart = monotonic()
+
+        for chunk in chunks:
+            os.write(self.fSendFd, chunk)
+
+        os.write(self.fSendFd, b"bench-done\n")
+        self.waitForDone()
+
+        return {
+            'messages': messages,
+            'bytes': sum(len(chunk) for chunk in chunks),
+            'wall': monotonic() - wallStart,
+            'cpu': process_time() - cpuStart,
+        }
+
+    # parse messages like CarlaEngineNative does, reading all lines and converting values
+    def receiveUntilDone(self):
+        messages = 0
+        bytesStart = self.fBytesRead - len(self.fBuffer)
+
+        cpuStart  = process_time()
+        wallStart = None
+
+        while True:
+            tag = self.readLine().decode("utf-8")
+
+            if wallStart is None:
+                wallStart = monotonic()
+
+            if tag == "bench-done":
+                break
+
+            messages += 1
+
+            for _ in range(UI_MESSAGE_ARGS.get(tag, 0)):
+                float(self.readLine())
+
+        wallEnd = monotonic()
+        os.write(self.fSendFd, b"bench-done\n")
+
+        return {
+            'messages': messages,
+            'bytes': self.fBytesRead - len(self.fBuffer) - bytesStart,
+            'wall': wallEnd - wallStart,
+            'cpu': process_time() - cpuStart,
+        }
+
+    # -------------------------------------------------------------------
+    # Host to UI traffic, formatted like CarlaEngineNative
+
+    # control changes sent to a native plugin UI
+    def encode_controls(self):
+        args = self.fArgs
+        chunks = []
+
+        for value in range(args.rounds):
+            for index in range(args.params):
+                chunks.append(("control\n%i\n%.10f\n" % (index, value / args.rounds)).encode("utf-8"))
+
+        return (len(chunks), chunks)
+
+    # everything sent for each plugin when carla-plugin is shown
+    def encode_dump(self):
+        args = self.fArgs
+        chunks = []
+        messages = 0
+
+        for _ in range(args.rounds):
+            chunks.append(("ENGINE_CALLBACK_%i\n%u\n%i\n%i\n%i\n%f\n%s\n" % (ENGINE_CALLBACK_ENGINE_STARTED,
+                                                                            args.plugins,
+                                                                            ENGINE_PROCESS_MODE_CONTINUOUS_RACK,
+                                                                            0, 512, 48000.0, "Plugin")).encode("utf-8"))
+            messages += 1
+
+            for pluginId in range(args.plugins):
+                payload = self.encodePluginData(pluginId).encode("utf-8")
+                chunks.append(("PLUGIN_DATA_%i:%i\n" % (pluginId, len(payload))).encode("utf-8") + payload + b"\n")
+                chunks.append(("CUSTOM_DATA_COUNT_%i:0\n" % pluginId).encode("utf-8"))
+                chunks.append(("ENGINE_CALLBACK_%i\n%u\n%i\n%i\n%i\n%f\n%s\n" % (ENGINE_CALLBACK_PLUGIN_ADDED,
+                                                                                pluginId, 0, 0, 0, 0.0,
+                                                                                "Plugin %i" % pluginId)).encode("utf-8"))
+                messages += 3
+
+        return (messages, chunks)
+
+    def encodePluginData(self, pluginId):
+        args = self.fArgs
+        outs = args.params // 4
+        ins  = args.params - outs
+
+        info = "%i\x1f%i\x1f%i\x1f%i\x1f%i\x1f%i\x1f" % (PLUGIN_LV2, PLUGIN_CATEGORY_NONE, PLUGIN_IS_RTSAFE, 0,
+                                                        PLUGIN_OPTION_USE_CHUNKS, 0)
+        info += "\x1f".join(("/usr/lib/lv2/bench.lv2/bench.so",
+                             "Plugin %i" % pluginId,
+                             "plugin",
+                             "Benchmark Plugin",
+                             "urn:carla:bench",
+                             "falkTX",
+                             "GPL"))
+        info += "\x1f%i\x1f%i\x1f%i\x1f%i" % (2, 2, 1, 1)
+
+        internal = "\x1f".join("%f" % 1.0 for _ in range(PARAMETER_ACTIVE, PARAMETER_MAX, -1))
+
+        records = [info, internal, "%i\x1f%i\x1f%i" % (ins, outs, args.params)]
+
+        for paramId in range(args.params):
+            paramType = PARAMETER_INPUT if paramId < ins else PARAMETER_OUTPUT
+            records.append("%i\x1f%i\x1f%i\x1f%i\x1f%s\x1f%s\x1f%f\x1f%f\x1f%f\x1f%f\x1f%f\x1f%f\x1f%f" % (
+                           paramType, PARAMETER_IS_ENABLED|PARAMETER_IS_AUTOMABLE, 0, -1,
+                           "Parameter %i" % paramId, "dB", 0.5, 0.0, 1.0, 0.01, 0.0001, 0.1, 0.5))
+
+        records.append("\x1f".join(["%i" % args.programs, "0"] + ["Program %i" % i for i in range(args.programs)]))
+        records.append("0\x1f-1")
+
+        return "\x1e".join(records)
+
+    # engine idle while carla-plugin is visible, without the shared table
+    def encode_peaks(self):
+        args = self.fArgs
+        outs = args.params // 4
+        ins  = args.params - outs
+        chunks = []
+        messages = 0
+
+        for value in range(args.rounds):
+            chunks.append(("runtime-info\n%f:0\n" % 12.5).encode("utf-8"))
+            chunks.append(("transport\ntrue\n%i:1:1:0\n%f\n" % (value * 512, 120.0)).encode("utf-8"))
+            messages += 2
+
+            for pluginId in range(args.plugins):
+                chunks.append(("PEAKS_%i\n%f:%f:%f:%f\n" % (pluginId, 0.5, 0.5, 0.25, 0.25)).encode("utf-8"))
+                messages += 1
+
+                for paramId in range(ins, args.params):
+                    chunks.append(("PARAMVAL_%i:%i\n%f\n" % (pluginId, paramId, value / args.rounds)).encode("utf-8"))
+                    messages += 1
+
+        return (messages, chunks)
+
+    # all parameters of all plugins changing, like automation or a preset load
+    def encode_params(self):
+        args = self.fArgs
+        chunks = []
+
+        for value in range(args.rounds):
+            for pluginId in range(args.plugins):
+                for paramId in range(args.params):
+                    chunks.append(("PARAMVAL_%i:%i\n%f\n" % (pluginId, paramId, value / args.rounds)).encode("utf-8"))
+
+        return (len(chunks), chunks)
+
+def startStubServer(args):
+    # same layout as CarlaPipeServer::startPipeServer
+    pipe1 = os.pipe()
+    pipe2 = os.pipe()
+
+    clientRecv, serverSend = pipe1
+    serverRecv, clientSend = pipe2
+
+    conn, serverConn = Pipe()
+
+    pid = os.fork()
+
+    if pid == 0:
+        os.close(clientRecv)
+        os.close(clientSend)
+
+        try:
+            StubServer(serverRecv, serverSend, serverConn, args).run()
+        finally:
+            os._exit(0)
+
+    os.set_blocking(clientRecv, False)
+
+    # carla_utils keeps a reference to this list, pipe_client_new reads the fds from it
+    sys.argv[:] = [sys.argv[0], "48000.0", "Benchmark",
+                   "%i" % clientRecv, "%i" % clientSend, "%i" % serverRecv, "%i" % serverSend]
+
+    return (pid, conn)
+
+# --------------------------------------------------------------------------------------------------------
+# UI side
+
+class BenchmarkUI(ExternalUI):
+    def __init__(self):
+        ExternalUI.__init__(self)
+        self.fDone = False
+        self.fHandlingTime = 0.0
+        self.fParameterValues = {}
+        self.addBenchmarkHandler()
+
+    def addBenchmarkHandler(self):
+        self.fMsgHandlers["bench-done"] = self._msgBenchDone
+
+    def dspParameterChanged(self, index, value):
+        self.fParameterValues[index] = value
+
+    def _msgBenchDone(self):
+        self.fDone = True
+
+    # the same calls the socket notifier and idle timer make, until the stub says it is done
+    def waitForDone(self, timeout):
+        fd = gCarla.utils.pipe_client_get_read_fd(self.fPipeClient)
+        deadline = monotonic() + timeout
+
+        self.fDone = False
+        self.fHandlingTime = 0.0
+
+        while not self.fDone:
+            if monotonic() > deadline:
+                raise TimeoutError("no reply from the stub server")
+
+            readable, _, _ = select([fd], [], [], 0.01)
+
+            start = perf_counter()
+
+            if readable and self.fPipeNotifier is not None:
+                self.pipeReadable(fd)
+            else:
+                self.idleExternalUI()
+
+            self.fHandlingTime += perf_counter() - start
+
+def loadCarlaPlugin():
+    filename = os.path.join(sourceDir, "native-plugins", "resources", "carla-plugin")
+    loader = SourceFileLoader("carla_plugin", filename)
+    module = module_from_spec(spec_from_loader("carla_plugin", loader))
+    loader.exec_module(module)
+    return module
+
+# CarlaMiniW is a full main window, only its message handling methods are used here
+def createPluginUI(carlaPlugin, host):
+    methods = {}
+
+    for name, value in vars(carlaPlugin.CarlaMiniW).items():
+        if callable(value) and name.startswith("_msg"):
+            methods[name] = value
+
+    for name in ("msgCallback", "msgCallback2", "setupMsgHandlers", "setPluginData"):
+        methods[name] = vars(carlaPlugin.CarlaMiniW)[name]
+
+    ui = type("PluginUI", (BenchmarkUI,), methods)()
+    ui.host = host
+    ui.fFirstInit = False
+    ui.setupMsgHandlers()
+    ui.addBenchmarkHandler()
+
+    host.setExternalUI(ui)
+    return ui
+
+# --------------------------------------------------------------------------------------------------------
+
+def printResult(name, stats, clientCpu, clientHandling, wall):
+    messages = max(1, stats['messages'])
+
+    print("%s:" % name)
+    print("  traffic        %i msgs, %.1f KiB" % (stats['messages'], stats['bytes'] / 1024.0))
+    print("  throughput     %.0f msgs/s, %.2f MiB/s" % (stats['messages'] / max(wall, 1e-9),
+                                                       stats['bytes'] / max(wall, 1e-9) / 1048576.0))
+    print("  UI side        %.3f us CPU per msg, %.3f us handling per msg" % (clientCpu * 1000000 / messages,
+                                                                              clientHandling * 1000000 / messages))
+    print("  stub server    %.3f us CPU per msg" % (stats['cpu'] * 1000000 / messages))
+
+# host to UI, the stub writes everything and the UI reads until the end marker
+def runSendScenario(conn, ui, name, args):
+    cpuStart = process_time()
+
+    conn.send((name,))
+    ui.waitForDone(args.timeout)
+
+    clientCpu = process_time() - cpuStart
+
+    # let the stub know we got everything
+    ui.send(["bench-done"])
+
+    stats = conn.recv()
+    printResult(name, stats, clientCpu, ui.fHandlingTime, stats['wall'])
+
+# UI to host, the UI writes everything and waits for the stub to have read it all
+def runRecvScenario(conn, ui, name, args, sendAll):
+    conn.send(("recv",))
+
+    cpuStart  = process_time()
+    wallStart = monotonic()
+
+    sendStart = perf_counter()
+    sendAll()
+    ui.send(["bench-done"])
+    sendTime = perf_counter() - sendStart
+
+    ui.waitForDone(args.timeout)
+
+    wall = monotonic() - wallStart
+    clientCpu = process_time() - cpuStart
+
+    stats = conn.recv()
+    printResult(name, stats, clientCpu, sendTime + ui.fHandlingTime, wall)
+
+def stopStubServer(pid, conn, ui):
+    ui.closeExternalUI()
+    conn.send(("quit",))
+    os.waitpid(pid, 0)
+
+def benchmarkExternalUI(args):
+    pid, conn = startStubServer(args)
+    ui = BenchmarkUI()
+
+    runSendScenario(conn, ui, "controls", args)
+
+    def sendControls():
+        # controls are coalesced and flushed once per idle
+        for value in range(args.rounds):
+            for index in range(args.params):
+                ui.sendControl(index, value / args.rounds)
+            ui.flushControls()
+
+    runRecvScenario(conn, ui, "ui-controls", args, sendControls)
+
+    stopStubServer(pid, conn, ui)
+
+def benchmarkCarlaPlugin(args):
+    carlaPlugin = loadCarlaPlugin()
+
+    pid, conn = startStubServer(args)
+
+    host = carlaPlugin.PluginHost()
+    ui   = createPluginUI(carlaPlugin, host)
+
+    runSendScenario(conn, ui, "dump", args)
+    runSendScenario(conn, ui, "peaks", args)
+    runSendScenario(conn, ui, "params", args)
+
+    def sendParameters():
+        # one message per change, as done when moving knobs in carla-plugin
+        for value in range(args.rounds):
+            for pluginId in range(args.plugins):
+                for paramId in range(args.params - args.params // 4):
+                    host.set_parameter_value(pluginId, paramId, value / args.rounds)
+
+    runRecvScenario(conn, ui, "ui-params", args, sendParameters)
+
+    stopStubServer(pid, conn, ui)
+
+# --------------------------------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Host to UI pipe throughput benchmark")
+    parser.add_argument("--plugins", type=int, default=16)
+    parser.add_argument("--params", type=int, default=32, help="parameters per plugin, a quarter of them outputs")
+    parser.add_argument("--programs", type=int, default=16, help="programs per plugin")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=60.0, help="s to wait for each scenario")
+    parser.add_argument("--ui", choices=("all", "externalui", "carla-plugin"), default="all")
+    args = parser.parse_args()
+
+    pathBinaries, pathResources = getPaths()
+    gCarla.utils = CarlaUtils(os.path.join(pathBinaries, "libcarla_utils." + DLL_EXTENSION))
+
+    # needed for the socket notifiers, the event loop itself is never run
+    app = QCoreApplication(sys.argv[:1])
+
+    if args.ui in ("all", "externalui"):
+        benchmarkExternalUI(args)
+
+    if args.ui in ("all", "carla-plugin"):
+        benchmarkCarlaPlugin(args)
+
+# --------------------------------------------------------------------------------------------------------
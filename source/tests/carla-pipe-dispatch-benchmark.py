@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Micro-benchmark for the message dispatch of pipe based Python UIs.
+# Messages are fed directly to the callbacks with an in-memory readlineblock, so only parsing and dispatch is measured.
+
+# --------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+
+sourceDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(sourceDir, "frontend"))
+
+# no pipe arguments, ExternalUI runs without a pipe client
+sys.argv = sys.argv[:1]
+
+from argparse import ArgumentParser
+from collections import deque
+from importlib.machinery import SourceFileLoader
+from importlib.util import module_from_spec, spec_from_loader
+from time import perf_counter
+
+from externalui import ExternalUI
+
+# --------------------------------------------------------------------------------------------------------
+
+def loadCarlaPlugin():
+    filename = os.path.join(sourceDir, "native-plugins", "resources", "carla-plugin")
+    loader = SourceFileLoader("carla_plugin", filename)
+    module = module_from_spec(spec_from_loader("carla_plugin", loader))
+    loader.exec_module(module)
+    return module
+
+# CarlaMiniW is a full main window, only its message handling methods are used here
+def createPluginDispatcher(carlaPlugin, host):
+    methods = {}
+
+    for cls in (ExternalUI, carlaPlugin.CarlaMiniW):
+        for name, value in vars(cls).items():
+            if callable(value) and (name.startswith("_msg") or name.startswith("ui")):
+                methods[name] = value
+
+    methods["msgCallback2"]     = carlaPlugin.CarlaMiniW.msgCallback2
+    methods["setupMsgHandlers"] = carlaPlugin.CarlaMiniW.setupMsgHandlers
+    methods["setPluginData"]    = carlaPlugin.CarlaMiniW.setPluginData
+
+    dispatcher = type("PluginDispatcher", (object,), methods)()
+    dispatcher.host = host
+    dispatcher.fFirstInit = False
+    dispatcher.setupMsgHandlers()
+    return dispatcher
+
+class BenchmarkUI(ExternalUI):
+    def __init__(self):
+        ExternalUI.__init__(self)
+        self.fParameterValues = {}
+
+    def dspParameterChanged(self, index, value):
+        self.fParameterValues[index] = value
+
+# --------------------------------------------------------------------------------------------------------
+
+def run(name, callback, target, messages, lines, repeat):
+    pending = deque()
+    target.readlineblock = pending.popleft
+
+    best = None
+
+    for _ in range(repeat):
+        pending.extend(lines)
+
+        start = perf_counter()
+        for msg in messages:
+            callback(msg)
+        elapsed = perf_counter() - start
+
+        assert len(pending) == 0, "messages did not consume all their lines"
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    print("%-32s %9i msgs in %8.3f ms, %10.0f msgs/s" % (name, len(messages), best * 1000, len(messages) / best))
+
+def benchmarkExternalUI(args):
+    ui = BenchmarkUI()
+    messages, lines = [], []
+
+    for value in range(args.rounds):
+        for index in range(args.params):
+            messages.append("control")
+            lines.append("%i" % index)
+            lines.append("%.10f" % (value / args.rounds))
+
+    run("ExternalUI control", ui.msgCallback, ui, messages, lines, args.repeat)
+
+def benchmarkCarlaPlugin(args):
+    carlaPlugin = loadCarlaPlugin()
+
+    host = carlaPlugin.PluginHost()
+    host._allocateAsNeeded(args.plugins - 1)
+
+    for pluginId in range(args.plugins):
+        host._set_parameterCountInfo(pluginId, args.params, {'ins': args.params, 'outs': 0})
+
+    dispatcher = createPluginDispatcher(carlaPlugin, host)
+
+    # what the engine sends continuously while the UI is visible
+    messages, lines = [], []
+
+    for value in range(args.rounds):
+        messages.append("runtime-info")
+        lines.append("12.5:0")
+
+        for pluginId in range(args.plugins):
+            messages.append("PEAKS_%i" % pluginId)
+            lines.append("0.5:0.5:0.25:0.25")
+
+            for paramId in range(args.params):
+                messages.append("PARAMVAL_%i:%i" % (pluginId, paramId))
+                lines.append("%f" % (value / args.rounds))
+
+    run("carla-plugin peaks and params", dispatcher.msgCallback2, dispatcher, messages, lines, args.repeat)
+
+# --------------------------------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Pipe UI message dispatch micro-benchmark")
+    parser.add_argument("--plugins", type=int, default=32)
+    parser.add_argument("--params", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    benchmarkExternalUI(args)
+    benchmarkCarlaPlugin(args)
+
+# --------------------------------------------------------------------------------------------------------
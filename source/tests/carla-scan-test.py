@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Test for the plugin path walker of the plugin database (scanPluginPaths).
+# Builds a temporary tree with several files and subdirectories, and checks every binary is found once.
+# The walk is also run with directory entries that have no inodes, like os.DirEntry.stat() gives on Windows.
+
+# --------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "frontend"))
+
+from tempfile import TemporaryDirectory
+
+import carla_database
+from carla_database import scanPluginPaths
+
+_scandir = os.scandir
+
+# --------------------------------------------------------------------------------------------------------
+# Directory entries without inodes
+
+class NoInodeStat(object):
+    def __init__(self, stat):
+        self.st_dev  = 0
+        self.st_ino  = 0
+        self.st_size = stat.st_size
+
+class NoInodeEntry(object):
+    def __init__(self, entry):
+        self.fEntry = entry
+        self.name   = entry.name
+        self.path   = entry.path
+
+    def is_dir(self):
+        return self.fEntry.is_dir()
+
+    def is_file(self):
+        return self.fEntry.is_file()
+
+    def is_symlink(self):
+        return self.fEntry.is_symlink()
+
+    def stat(self):
+        return NoInodeStat(self.fEntry.stat())
+
+class NoInodeScandir(object):
+    def __init__(self, path):
+        self.fIter = _scandir(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fIter.close()
+
+    def __iter__(self):
+        return (NoInodeEntry(entry) for entry in self.fIter)
+
+# --------------------------------------------------------------------------------------------------------
+
+def makeTree(root):
+    expected = []
+
+    for subdir in ("", "a", "a/b", "c", "c/d/e"):
+        os.makedirs(os.path.join(root, subdir), exist_ok=True)
+
+        for name in ("one.so", "two.so"):
+            path = os.path.join(root, subdir, name) if subdir else os.path.join(root, name)
+            open(path, "w").close()
+            expected.append(path)
+
+        open(os.path.join(root, subdir, "readme.txt"), "w").close()
+
+    # the same files again through a symlink, must not be found twice
+    if hasattr(os, "symlink"):
+        try:
+            os.symlink(os.path.join(root, "a"), os.path.join(root, "link"))
+        except OSError:
+            pass
+
+    return sorted(expected)
+
+def check(name, root, expected):
+    # files inside a linked directory can be found through either path, but only once
+    found = sorted(os.path.realpath(path) for path in scanPluginPaths([root], fileExtensions=(".so",),
+                                                                     followLinks=True))
+
+    if found != expected:
+        print("%s: FAILED, found %i of %i binaries" % (name, len(found), len(expected)))
+        for path in sorted(set(expected) - set(found)):
+            print("  missing", path)
+        for path in sorted(set(found) - set(expected)):
+            print("  unexpected", path)
+        return False
+
+    print("%s: ok, %i binaries" % (name, len(found)))
+    return True
+
+if __name__ == '__main__':
+    with TemporaryDirectory() as root:
+        root = os.path.realpath(root)
+        expected = makeTree(root)
+
+        ok = check("inodes", root, expected)
+
+        carla_database.os.scandir = NoInodeScandir
+        try:
+            ok = check("no inodes", root, expected) and ok
+        finally:
+            carla_database.os.scandir = _scandir
+
+    sys.exit(0 if ok else 1)
+
+# --------------------------------------------------------------------------------------------------------
@@ -648,6 +648,15 @@ CarlaPipeCommon::~CarlaPipeCommon() /*noexcept*/
 
 // -------------------------------------------------------------------
 
+int CarlaPipeCommon::getReadFileDescriptor() const noexcept
+{
+#ifdef CARLA_OS_WIN
+    return -1;
+#else
+    return pData->pipeRecv;
+#endif
+}
+
 bool CarlaPipeCommon::isPipeRunning() const noexcept
 {
     return (pData->pipeRecv != INVALID_PIPE_VALUE && pData->pipeSend != INVALID_PIPE_VALUE && ! pData->pipeClosed);
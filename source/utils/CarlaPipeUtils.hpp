@@ -71,6 +71,12 @@ public:
      */
     void idlePipe(const bool onlyOnce = false) noexcept;
 
+    /*!
+     * Get the file descriptor used for reading, so the pipe can be watched by an event loop.
+     * Returns -1 on Windows or if the pipe is not open.
+     */
+    int getReadFileDescriptor() const noexcept;
+
     // -------------------------------------------------------------------
     // write lock
 